@@ -3,26 +3,23 @@ import requests
 import logging
 from datetime import datetime, timedelta
 import time
+from contextlib import contextmanager
 from sqlalchemy.orm import Session
+from app.core.events import publish_post
+from app.core.author_stats import post_published
+from app.core.metrics import REGISTRY
+from app.core.related import schedule_related_refresh
+from app.core.timeline import fan_out_post
+from app.core.tts import request_post_audio, schedule_post_audio
 from app.database import SessionLocal
 from app.models.post import Post
 from app.models.user import User
 import re
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()  # Log to console
-    ]
-)
-
 logger = logging.getLogger(__name__)
 
 # AI Bot User ID (create this user first)
@@ -30,8 +27,17 @@ AI_BOT_USER_ID = 1  # AI Content Bot user
 
 # Gemini API Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")  # Set this in your environment
-logger.info(f"Gemini API Key loaded: {'Yes' if GEMINI_API_KEY else 'No'}")
-genai.configure(api_key=GEMINI_API_KEY)
+logger.info("Gemini API Key loaded: %s", 'Yes' if GEMINI_API_KEY else 'No')
+_genai = None
+
+def get_genai():
+    """Import and configure the Gemini SDK on first use (it is slow to import)"""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        genai.configure(api_key=GEMINI_API_KEY)
+        _genai = genai
+    return _genai
 
 # News API Configuration
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")  # Get free key from newsapi.org
@@ -47,6 +53,28 @@ USED_ARTICLES = set()
 # Indian News Sources - prioritize Indian media
 INDIAN_SOURCES = "the-times-of-india,the-hindu,google-news-in"
 
+BOT_STAGE_DURATION = REGISTRY.histogram(
+    "bot_stage_duration_seconds",
+    "Duration of each AI bot stage",
+    ["stage"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+BOT_RUN_DURATION = REGISTRY.histogram(
+    "bot_run_duration_seconds",
+    "Duration of a full AI bot run",
+    buckets=(1, 5, 10, 20, 30, 60, 120, 300),
+)
+
+@contextmanager
+def timed_stage(stage, timings):
+    """Record a stage duration in the metrics registry and in ``timings``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - start
+        BOT_STAGE_DURATION.observe(timings[stage], stage=stage)
+
 def get_recent_news_newsdata():
     """Fetch recent news using NewsData.io API (more reliable alternative)"""
     logger.info("Fetching news using NewsData.io API")
@@ -84,14 +112,14 @@ def get_recent_news_newsdata():
                     formatted_articles.append(formatted_article)
 
             if formatted_articles:
-                logger.info(f"Found {len(formatted_articles)} articles from NewsData.io")
+                logger.info("Found %s articles from NewsData.io", len(formatted_articles))
                 return formatted_articles[:5]
 
         else:
-            logger.error(f"NewsData.io API error: {response.status_code} - {response.text}")
+            logger.error("NewsData.io API error: %s - %s", response.status_code, response.text)
 
     except Exception as e:
-        logger.error(f"Error fetching from NewsData.io: {str(e)}")
+        logger.error("Error fetching from NewsData.io: %s", e)
 
     return []
 
@@ -116,7 +144,7 @@ def get_recent_news():
         # Single attempt with rate limiting protection
         selected_category = 'general'  # Use general instead of random to reduce API calls
 
-        logger.info(f"Fetching {selected_category} news from India...")
+        logger.info("Fetching %s news from India...", selected_category)
 
         params = {
             'apiKey': NEWS_API_KEY,
@@ -129,12 +157,12 @@ def get_recent_news():
 
         if response.status_code == 200:
             articles = response.json().get('articles', [])
-            logger.info(f"News API returned {len(articles)} articles")
+            logger.info("News API returned %s articles", len(articles))
             # Filter out already used articles
             new_articles = [a for a in articles if a.get('url') not in USED_ARTICLES]
 
             if new_articles:
-                logger.info(f"Found {len(new_articles)} new Indian articles")
+                logger.info("Found %s new Indian articles", len(new_articles))
                 return new_articles[:5]
 
         elif response.status_code == 429:
@@ -147,16 +175,16 @@ def get_recent_news():
                 articles = response.json().get('articles', [])
                 new_articles = [a for a in articles if a.get('url') not in USED_ARTICLES]
                 if new_articles:
-                    logger.info(f"After rate limit reset: Found {len(new_articles)} articles")
+                    logger.info("After rate limit reset: Found %s articles", len(new_articles))
                     return new_articles[:5]
 
             logger.error("Still rate limited after waiting")
 
         else:
-            logger.error(f"News API error: {response.status_code} - {response.text[:100]}...")
+            logger.error("News API error: %s - %s...", response.status_code, response.text[:100])
 
     except Exception as e:
-        logger.error(f"Error fetching news: {str(e)}")
+        logger.error("Error fetching news: %s", e)
 
     # Final fallback - hardcoded topics (guaranteed to work)
     logger.warning("All APIs failed, using hardcoded fallback topics...")
@@ -189,12 +217,12 @@ def get_recent_news():
             'source': {'name': 'Fallback Content'}
         })
 
-    logger.info(f"Using {len(formatted_fallbacks)} fallback topics")
+    logger.info("Using %s fallback topics", len(formatted_fallbacks))
     return formatted_fallbacks[:5]
 
 def generate_satirical_content(news_headline, news_description):
     """Generate satirical article using Gemini AI"""
-    logger.info(f"Generating satirical content for headline: {news_headline[:50]}...")
+    logger.info("Generating satirical content for headline: %s...", news_headline[:50])
     
     prompt = f"""You are a friendly, witty Indian friend chatting over chai about current events. Write like you're gossiping with friends - natural, conversational, and funny.
 
@@ -241,6 +269,7 @@ CONTENT: [Full article written in natural, conversational style. Mix Hindi द
 
     try:
         logger.info("Calling Gemini AI for content generation")
+        genai = get_genai()
         model = genai.GenerativeModel('gemini-2.5-flash')
         response = model.generate_content(
             prompt,
@@ -251,7 +280,7 @@ CONTENT: [Full article written in natural, conversational style. Mix Hindi द
         )
         
         text = response.text
-        logger.info(f"AI generated content of length: {len(text)} characters")
+        logger.info("AI generated content of length: %s characters", len(text))
         
         # Parse the response
         title_match = re.search(r'TITLE:\s*(.+?)(?:\n|$)', text)
@@ -276,7 +305,7 @@ CONTENT: [Full article written in natural, conversational style. Mix Hindi द
             content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)  # Remove excessive newlines
             content = content.strip()
         
-        logger.info(f"Parsed AI response - Title: '{title[:50]}...', Subtitle: '{subtitle[:50]}...', Content length: {len(content)}")
+        logger.info("Parsed AI response - Title: '%s...', Subtitle: '%s...', Content length: %s", title[:50], subtitle[:50], len(content))
         
         return {
             'title': title,
@@ -285,8 +314,8 @@ CONTENT: [Full article written in natural, conversational style. Mix Hindi द
         }
         
     except Exception as e:
-        logger.error(f"Gemini API error in generate_satirical_content: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
+        logger.error("Gemini API error in generate_satirical_content: %s", e)
+        logger.error("Error type: %s", type(e).__name__)
         return None
 
 def generate_slug(title: str) -> str:
@@ -296,23 +325,27 @@ def generate_slug(title: str) -> str:
     slug = re.sub(r'[-\s]+', '-', slug)
     return slug[:100]
 
-def create_satirical_post(db: Session, article_data):
-    """Create and save a satirical post to database"""
+def create_satirical_post(db: Session, article_data, publish_at=None):
+    """Create and save a satirical post to database.
+
+    With publish_at (naive UTC) the post is saved as a draft and released by
+    the publisher (app.core.publisher) at that time.
+    """
     try:
         logger.info("Creating satirical post in database")
         
         # Check if bot user exists
         bot_user = db.query(User).filter(User.id == AI_BOT_USER_ID).first()
         if not bot_user:
-            logger.error(f"Bot user with ID {AI_BOT_USER_ID} not found!")
+            logger.error("Bot user with ID %s not found!", AI_BOT_USER_ID)
             # Try querying all users to debug
             all_users = db.query(User).all()
-            logger.info(f"Debug: Found {len(all_users)} users in database")
+            logger.info("Debug: Found %s users in database", len(all_users))
             for u in all_users:
-                logger.info(f"  User {u.id}: {u.username}")
+                logger.info("  User %s: %s", u.id, u.username)
             return False
         
-        logger.info(f"Bot user found: {bot_user.username}")
+        logger.info("Bot user found: %s", bot_user.username)
         
         # Generate unique slug
         base_slug = generate_slug(article_data['title'])
@@ -323,7 +356,7 @@ def create_satirical_post(db: Session, article_data):
             slug = f"{base_slug}-{counter}"
             counter += 1
         
-        logger.info(f"Generated slug: {slug}")
+        logger.info("Generated slug: %s", slug)
         
         # Create post
         new_post = Post(
@@ -332,30 +365,55 @@ def create_satirical_post(db: Session, article_data):
             content=article_data['content'],
             slug=slug,
             author_id=AI_BOT_USER_ID,
-            published=1,  # Automatically publish
+            published=0 if publish_at else 1,  # Automatically publish
+            publish_at=publish_at,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
         
         db.add(new_post)
+        if publish_at:
+            # Timelines, stats, audio and the live feed follow on release
+            db.commit()
+            logger.info("🗓️  Scheduled post %s for %s", new_post.id, publish_at)
+            return True
+        db.flush()
+        # Followers' timelines (skipped once the bot has too many followers,
+        # its posts are then merged in when feeds are read)
+        fan_out_post(db, new_post)
+        post_published(db, new_post)
+        audio = request_post_audio(new_post)
         db.commit()
         db.refresh(new_post)
+        # Reaches live feed clients when the bot runs inside the API process
+        publish_post(new_post)
+        schedule_related_refresh(new_post.id)
+        if audio:
+            # Standalone runs wait for this at interpreter exit
+            schedule_post_audio(new_post.id)
         
-        logger.info(f"✅ Created post: {new_post.title}")
-        logger.info(f"   Slug: {new_post.slug}")
-        logger.info(f"   Post ID: {new_post.id}")
+        logger.info("✅ Created post: %s", new_post.title)
+        logger.info("   Slug: %s", new_post.slug)
+        logger.info("   Post ID: %s", new_post.id)
         return True
         
     except Exception as e:
-        logger.error(f"Error creating satirical post: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
+        logger.error("Error creating satirical post: %s", e)
+        logger.error("Error type: %s", type(e).__name__)
         db.rollback()
         return False
 
-def run_ai_content_generator():
-    """Main function to generate and post satirical content"""
-    logger.info(f"🤖 AI Content Generator started at {datetime.now()}")
+def run_ai_content_generator(publish_at=None):
+    """Main function to generate and post satirical content.
+
+    Returns a summary dict: whether a post was published (or, with
+    publish_at, scheduled), its title and the per-stage timings.
+    """
+    logger.info("🤖 AI Content Generator started at %s", datetime.now())
     logger.info("=" * 60)
+    run_started = time.perf_counter()
+    timings = {}
+    result = {"published": False, "scheduled": False, "publish_at": publish_at, "title": None, "timings": timings}
     
     # Check if News API key is available
     if not NEWS_API_KEY:
@@ -374,11 +432,12 @@ def run_ai_content_generator():
         import random
         topic = random.choice(fallback_topics)
         news_articles = fallback_topics
-        logger.info(f"Using fallback topic: {topic['title']}")
+        logger.info("Using fallback topic: %s", topic['title'])
     else:
         # Fetch real news
         logger.info("Fetching real news articles...")
-        news_articles = get_recent_news()
+        with timed_stage("news_fetch", timings):
+            news_articles = get_recent_news()
         
         # If news fetch failed, use fallback topics
         if not news_articles:
@@ -406,9 +465,9 @@ def run_ai_content_generator():
     
     if not news_articles:
         logger.error("❌ No news articles found")
-        return
+        return result
     
-    logger.info(f"Found {len(news_articles)} news articles to process")
+    logger.info("Found %s news articles to process", len(news_articles))
     
     # Get database session
     db = SessionLocal()
@@ -421,8 +480,8 @@ def run_ai_content_generator():
         description = article.get('description', '') or article.get('content', '')
         article_url = article.get('url', '')
         
-        logger.info(f"Selected article: {headline[:50]}...")
-        logger.info(f"Article URL: {article_url}")
+        logger.info("Selected article: %s...", headline[:50])
+        logger.info("Article URL: %s", article_url)
         
         # Track used article
         if article_url:
@@ -435,33 +494,61 @@ def run_ai_content_generator():
         
         # Generate satirical content
         logger.info("🎭 Generating satirical content with AI...")
-        satirical_content = generate_satirical_content(headline, description)
+        with timed_stage("gemini", timings):
+            satirical_content = generate_satirical_content(headline, description)
         
         if satirical_content:
             logger.info("✍️  Content generated successfully!")
             
             # Create post
             logger.info("📝 Creating satirical post in database...")
-            success = create_satirical_post(db, satirical_content)
+            with timed_stage("db_insert", timings):
+                success = create_satirical_post(db, satirical_content, publish_at)
             
             if success:
+                result["scheduled" if publish_at else "published"] = True
+                result["title"] = satirical_content['title']
                 logger.info("✅ Post published successfully!")
-                logger.info(f"📝 Title: {satirical_content['title']}")
-                logger.info(f"📌 Subtitle: {satirical_content['subtitle']}")
-                logger.info(f"📄 Content length: {len(satirical_content['content'])} characters")
+                logger.info("📝 Title: %s", satirical_content['title'])
+                logger.info("📌 Subtitle: %s", satirical_content['subtitle'])
+                logger.info("📄 Content length: %s characters", len(satirical_content['content']))
             else:
                 logger.error("❌ Failed to publish post")
         else:
             logger.error("❌ Failed to generate content")
             
     except Exception as e:
-        logger.error(f"❌ Error in AI content generator: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
+        logger.error("❌ Error in AI content generator: %s", e)
+        logger.error("Error type: %s", type(e).__name__)
     finally:
         db.close()
+        BOT_RUN_DURATION.observe(time.perf_counter() - run_started)
     
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("⏱️  Stage timings: %s", ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in timings.items()))
     logger.info("=" * 60)
-    logger.info(f"🤖 AI Content Generator finished at {datetime.now()}\n")
+    logger.info("🤖 AI Content Generator finished at %s\n", datetime.now())
+    return result
+
+def queue_posts(count, hours=24):
+    """Generate count posts now, scheduled evenly over the next hours.
+
+    Rather than flooding the feed with a burst of posts, a day's worth can be
+    generated in one go and released one at a time by the publisher.
+    Returns the number of posts scheduled.
+    """
+    if count < 1:
+        raise ValueError(f"count must be at least 1, got {count}")
+    if hours <= 0:
+        raise ValueError(f"hours must be positive, got {hours}")
+    step = timedelta(hours=hours) / count
+    start = datetime.utcnow()
+    scheduled = 0
+    for i in range(count):
+        result = run_ai_content_generator(publish_at=start + step * (i + 1))
+        scheduled += result["scheduled"]
+    logger.info("🗓️  Scheduled %s of %s posts over %s hours", scheduled, count, hours)
+    return scheduled
 
 def setup_bot_user():
     """Create the AI bot user if it doesn't exist"""
@@ -472,13 +559,13 @@ def setup_bot_user():
         
         if not bot_user:
             logger.info("Creating AI bot user...")
-            from app.core.security import get_password_hash
-            
+            from app.core.security import UNUSABLE_PASSWORD
+
             bot_user = User(
                 email="satirical.bot@merikahani.com",
                 username="satirical_bot",
                 full_name="व्यंग्य लेखक",
-                hashed_password=get_password_hash("securepassword123"),
+                hashed_password=UNUSABLE_PASSWORD,  # the bot never signs in
                 bio="दुनिया की खबरों पर व्यंग्यात्मक नज़रिया। सच को मजाकिया अंदाज में पेश करना हमारा काम है! 🎭📰",
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
@@ -487,17 +574,17 @@ def setup_bot_user():
             db.commit()
             db.refresh(bot_user)
             
-            logger.info(f"✅ Bot user created with ID: {bot_user.id}")
-            logger.info(f"   Username: {bot_user.username}")
-            logger.info(f"   Update AI_BOT_USER_ID in this script to: {bot_user.id}")
+            logger.info("✅ Bot user created with ID: %s", bot_user.id)
+            logger.info("   Username: %s", bot_user.username)
+            logger.info("   Update AI_BOT_USER_ID in this script to: %s", bot_user.id)
             return bot_user.id
         else:
-            logger.info(f"✅ Bot user already exists with ID: {bot_user.id}")
+            logger.info("✅ Bot user already exists with ID: %s", bot_user.id)
             return bot_user.id
             
     except Exception as e:
-        logger.error(f"❌ Error setting up bot user: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
+        logger.error("❌ Error setting up bot user: %s", e)
+        logger.error("Error type: %s", type(e).__name__)
         db.rollback()
         return None
     finally:
@@ -505,6 +592,11 @@ def setup_bot_user():
 
 if __name__ == "__main__":
     import sys
+    from app.core.logs import configure_logging
+
+    # Only standalone runs own the process's logging; inside the API the
+    # app has already configured it
+    configure_logging(fmt="text")
     
     if len(sys.argv) > 1 and sys.argv[1] == "setup":
         # Setup bot user
@@ -514,6 +606,12 @@ if __name__ == "__main__":
     elif len(sys.argv) > 1 and sys.argv[1] == "test":
         # Test run (single post)
         run_ai_content_generator()
+    elif len(sys.argv) > 2 and sys.argv[1] == "queue":
+        # Generate N posts now, released evenly over the next 24 hours
+        try:
+            queue_posts(int(sys.argv[2]))
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
     else:
         print("""
 🤖 AI Satirical Content Generator
@@ -522,6 +620,7 @@ if __name__ == "__main__":
 Usage:
   python ai_content_bot.py setup    # Create bot user
   python ai_content_bot.py test     # Generate one test post
+  python ai_content_bot.py queue N  # Generate N posts, released over 24 hours
   
 For scheduled posting, use the scheduler script or cron job.
         """)
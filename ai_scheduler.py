@@ -21,6 +21,13 @@ def job():
     print(f"{'='*60}")
     run_ai_content_generator()
 
+def publish_job():
+    """Release scheduled posts that are due (see app.core.publisher)"""
+    # Imported here: the publisher pulls in the web stack
+    from app.core.publisher import run_publisher_tick
+
+    run_publisher_tick()
+
 def run_scheduler():
     """Run the scheduler"""
     print("""
@@ -40,6 +47,9 @@ def run_scheduler():
     
     # Schedule: Post every 5 minutes
     schedule.every(5).minutes.do(job)
+    # Posts queued with `ai_content_bot.py queue N` are released by this
+    # tick as well as by the API workers' publisher loop
+    schedule.every(1).minutes.do(publish_job)
     
     # Alternative schedules (commented):
     # schedule.every(3).hours.do(job)  # Every 3 hours
@@ -60,6 +70,9 @@ def run_scheduler():
         time.sleep(60)  # Check every minute
 
 if __name__ == "__main__":
+    from app.core.logs import configure_logging
+
+    configure_logging(fmt="text")
     try:
         run_scheduler()
     except KeyboardInterrupt:
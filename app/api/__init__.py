@@ -1,10 +1,19 @@
 from fastapi import APIRouter
+from app.core.config import settings
 
 api_router = APIRouter()
 
-from .endpoints import auth, posts, comments, seo
+from .endpoints import auth, posts, comments, seo, stream, users, feed, uploads
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(posts.router, prefix="/posts", tags=["posts"])
 api_router.include_router(comments.router, prefix="/comments", tags=["comments"])
-api_router.include_router(seo.router, tags=["seo"])
\ No newline at end of file
+api_router.include_router(seo.router, tags=["seo"])
+api_router.include_router(stream.router, prefix="/stream", tags=["stream"])
+api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(feed.router, prefix="/feed", tags=["feed"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
+
+if settings.debug:
+    from .endpoints import debug
+    api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 import requests
 import os
 import logging
@@ -7,44 +8,27 @@ from sqlalchemy.orm import Session
 from datetime import timedelta
 from app.database import get_db
 from app.models.user import User
-from app.core.security import get_password_hash, create_access_token
+from app.core.security import UNUSABLE_PASSWORD, create_access_token
 from app.core.config import settings
 from app.core.dependencies import get_current_user
+from app.core.rate_limit import rate_limit
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/google-login", response_model=Token)
-async def google_login(request: Request, db: Session = Depends(get_db)):
-    logger.info("Google login attempt initiated")
-    try:
-        data = await request.json()
-    except Exception as e:
-        logger.error(f"Failed to parse JSON body for google-login: {e}")
-        raise HTTPException(status_code=400, detail="Invalid or missing JSON body")
-
-    if not isinstance(data, dict):
-        logger.warning("Google login failed: JSON body is not an object")
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
-
-    token = data.get("token")
-    if not token:
-        logger.warning("Google login failed: Missing token in request")
-        raise HTTPException(status_code=400, detail="Missing Google token")
-
+def authenticate_google_token(token: str, db: Session) -> User:
+    """Verify a Google ID token and return the matching user, creating it on first login."""
     # Verify Google token
     google_client_id = settings.GOOGLE_CLIENT_ID
     verify_url = f"https://oauth2.googleapis.com/tokeninfo?id_token={token}"
-    logger.info(f"Verifying Google token with client_id: {google_client_id[:10]}...")
     resp = requests.get(verify_url)
     if resp.status_code != 200:
-        logger.error(f"Google token verification failed: {resp.status_code} {resp.text}")
+        logger.warning("Google token verification failed with status %s", resp.status_code)
         raise HTTPException(status_code=401, detail=f"Invalid Google token: {resp.text}")
     payload = resp.json()
-    logger.info(f"Token payload received: email={payload.get('email')}, aud={payload.get('aud')}")
     if payload.get("aud") != google_client_id:
-        logger.error(f"Audience mismatch: expected {google_client_id}, got {payload.get('aud')}")
+        logger.warning("Google token audience mismatch: got %s", payload.get("aud"))
         raise HTTPException(status_code=401, detail=f"Invalid Google client ID: expected {google_client_id}, got {payload.get('aud')}")
 
     email = payload.get("email")
@@ -57,29 +41,51 @@ async def google_login(request: Request, db: Session = Depends(get_db)):
     # Find or create user
     user = db.query(User).filter(User.email == email).first()
     if not user:
-        logger.info(f"Creating new user for email: {email}")
         from datetime import datetime
         user = User(
             email=email,
             username=email.split('@')[0],
             full_name=full_name,
             avatar_url=avatar_url,
-            hashed_password=get_password_hash(token),  # Not used, but required
+            hashed_password=UNUSABLE_PASSWORD,  # Google-only account, nothing to hash
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
         db.add(user)
         db.commit()
         db.refresh(user)
-        logger.info(f"New user created: id={user.id}, email={email}")
-    else:
-        logger.info(f"Existing user found: id={user.id}, email={email}")
+        logger.info("New user created", extra={"user_id": user.id})
+    elif user.deletion_requested_at is not None:
+        raise HTTPException(status_code=403, detail="This account is being deleted")
+
+    return user
+
+@router.post("/google-login", response_model=Token, dependencies=[Depends(rate_limit("login"))])
+async def google_login(request: Request, db: Session = Depends(get_db)):
+    try:
+        data = await request.json()
+    except Exception as e:
+        logger.warning("Google login failed: invalid JSON body (%s)", e)
+        raise HTTPException(status_code=400, detail="Invalid or missing JSON body")
+
+    if not isinstance(data, dict):
+        logger.warning("Google login failed: JSON body is not an object")
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    token = data.get("token")
+    if not token:
+        logger.warning("Google login failed: Missing token in request")
+        raise HTTPException(status_code=400, detail="Missing Google token")
+
+    # Token verification and the user lookup block (HTTP call, DB pool
+    # checkout), so they run in the threadpool rather than on the event loop
+    user = await run_in_threadpool(authenticate_google_token, token, db)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
     )
-    logger.info(f"Google login successful for user {email}, token expires in {settings.ACCESS_TOKEN_EXPIRE_MINUTES} minutes")
+    logger.info("Google login succeeded", extra={"user_id": user.id})
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -88,6 +94,6 @@ async def google_login(request: Request, db: Session = Depends(get_db)):
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
-    logger.info(f"User info requested for user id={current_user.id}, email={current_user.email}")
+    logger.debug("User info requested", extra={"user_id": current_user.id})
     return current_user
 
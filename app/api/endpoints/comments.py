@@ -1,26 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.comment import Comment
 from app.models.post import Post
 from app.models.user import User
 from app.schemas.comment import CommentCreate, CommentResponse
+from app.core.author_stats import comment_added, comments_removed
 from app.core.dependencies import get_current_user
+from app.core.events import publish_comment
+from app.core.rate_limit import rate_limit
+from app.core.serialization import list_response
 
 router = APIRouter()
 
 @router.get("/post/{post_id}", response_model=List[CommentResponse])
-def get_post_comments(post_id: int, db: Session = Depends(get_db)):
+def get_post_comments(post_id: int, db: Session = Depends(get_read_db)):
     """Get all comments for a specific post"""
     post = db.query(Post).filter(Post.id == post_id).first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
     comments = db.query(Comment).filter(Comment.post_id == post_id).order_by(Comment.created_at.asc()).all()
-    return comments
+    return list_response(CommentResponse, comments)
 
-@router.post("", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=CommentResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("create_comment"))],
+)
 def create_comment(
     comment_data: CommentCreate,
     db: Session = Depends(get_db),
@@ -38,8 +47,10 @@ def create_comment(
         author_id=current_user.id
     )
     db.add(db_comment)
+    comment_added(db, post)
     db.commit()
     db.refresh(db_comment)
+    publish_comment(db_comment)
     return db_comment
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -56,6 +67,7 @@ def delete_comment(
     if comment.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
     
+    comments_removed(db, comment.post.author_id)
     db.delete(comment)
     db.commit()
     return None
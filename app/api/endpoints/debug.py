@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from app.core.profiling import recent_profiles
+
+router = APIRouter()
+
+@router.get("/sql-profiles")
+def get_sql_profiles():
+    """Most recent SQL profiles, newest first (debug builds only)"""
+    return recent_profiles()
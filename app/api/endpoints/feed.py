@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.models.user import User
+from app.schemas.feed import TimelinePage
+from app.core.dependencies import get_current_user
+from app.core.timeline import decode_cursor, read_timeline
+
+router = APIRouter()
+
+@router.get("", response_model=TimelinePage)
+def get_following_feed(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Posts from authors you follow, newest first, cursor-paginated"""
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    posts, next_cursor = read_timeline(db, current_user, limit, position)
+    return TimelinePage.model_validate({"items": posts, "next_cursor": next_cursor}, from_attributes=True)
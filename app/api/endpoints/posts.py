@@ -1,52 +1,170 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 import re
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.models.image import Image
 from app.models.post import Post
+from app.models.related import RelatedPost
+from app.models.revision import PostRevision
 from app.models.user import User
-from app.schemas.post import PostCreate, PostUpdate, PostResponse
-from app.core.dependencies import get_current_user
+from app.schemas.post import PostBatchResponse, PostCreate, PostUpdate, PostResponse, RelatedPostResponse
+from app.schemas.revision import ContentPatch, ContentPatchResponse, RevisionResponse, RevisionSummary
+from app.core.author_stats import post_deleted, post_published, post_unpublished
+from app.core.compression import CompressedArtifact, artifact_cache
+from app.core.dependencies import batch_keys, check_batch_size, get_current_user
+from app.core.events import publish_post
+from app.core.images import original_key
+from app.core.publisher import to_utc_naive
+from app.core.rate_limit import rate_limit
+from app.core.related import schedule_related_refresh
+from app.core.revisions import InvalidDelta, apply_delta, post_text, record_revision, revision_content
+from app.core.storage import storage
+from app.core.timeline import fan_out_post
+from app.core.tts import request_post_audio, schedule_post_audio
+from app.core.serialization import dump_list_json, list_response
+from app.core.singleflight import SingleFlight
 
 router = APIRouter()
 
+# Concurrent identical reads (a shared post's slug, the front page) run one
+# query; writes below call post_reads.forget() so their authors never join
+# a read that started before the change.
+post_reads = SingleFlight("posts")
+
 def generate_slug(title: str) -> str:
     slug = re.sub(r'[^\w\s-]', '', title.lower())
     slug = re.sub(r'[-\s]+', '-', slug)
     return slug[:100]
 
+def post_artifact(post: Post) -> CompressedArtifact:
+    """A single post from the precompressed artifact cache"""
+    key = ("post", post.id)
+    version = (post.updated_at, post.author.updated_at)
+    artifact = artifact_cache.get(key, version)
+    if artifact is None:
+        body = PostResponse.model_validate(post).model_dump_json().encode("utf-8")
+        artifact = CompressedArtifact.build(body, "application/json")
+        artifact_cache.set(key, version, artifact)
+    return artifact
+
+def load_post_artifact(db: Session, criterion) -> Optional[CompressedArtifact]:
+    post = db.query(Post).options(joinedload(Post.author)).filter(criterion).first()
+    return post_artifact(post) if post else None
+
+def load_posts_page(db: Session, published: int, skip: int, limit: int) -> bytes:
+    posts = db.query(Post).options(joinedload(Post.author)).filter(Post.published == published).order_by(
+        Post.created_at.desc()
+    ).offset(skip).limit(limit).all()
+    return dump_list_json(PostResponse, posts)
+
+# The read endpoints below are async so that requests waiting on another
+# request's lookup hold no threadpool thread; the lookup itself runs in the
+# threadpool. Keys include the session's engine, so a reader pinned to the
+# primary never shares a replica's result.
+
 @router.get("", response_model=List[PostResponse])
-def get_posts(
+async def get_posts(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     published: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Post)
-    if published is not None:
-        query = query.filter(Post.published == published)
-    else:
-        query = query.filter(Post.published == 1)  # Only published by default
-    
-    posts = query.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
-    return posts
+    if published is None:
+        published = 1  # Only published by default
+    body = await post_reads.do_async(
+        (db.get_bind(), "page", published, skip, limit), load_posts_page, db, published, skip, limit
+    )
+    return Response(content=body, media_type="application/json")
+
+@router.get("/batch", response_model=PostBatchResponse)
+def get_posts_batch(
+    ids: Optional[List[str]] = Query(None, description="Comma-separated post ids"),
+    slugs: Optional[List[str]] = Query(None, description="Comma-separated slugs"),
+    db: Session = Depends(get_read_db)
+):
+    """Several posts in one query, for lists of linked posts"""
+    ids = batch_keys(ids, "ids", int)
+    slugs = batch_keys(slugs, "slugs")
+    check_batch_size(ids, slugs)
+    posts = []
+    if ids or slugs:
+        posts = db.query(Post).options(joinedload(Post.author)).filter(
+            or_(Post.id.in_(ids), Post.slug.in_(slugs))
+        ).all()
+    by_id = {post.id: post for post in posts}
+    by_slug = {post.slug: post for post in posts}
+    ordered = [by_id[post_id] for post_id in ids if post_id in by_id]
+    ordered += [by_slug[slug] for slug in slugs if slug in by_slug]
+    body = PostBatchResponse.model_validate({
+        "posts": list({post.id: post for post in ordered}.values()),
+        "missing_ids": [post_id for post_id in ids if post_id not in by_id],
+        "missing_slugs": [slug for slug in slugs if slug not in by_slug],
+    }, from_attributes=True)
+    return Response(content=body.model_dump_json(), media_type="application/json")
 
 @router.get("/{post_id}", response_model=PostResponse)
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+async def get_post(post_id: int, request: Request, db: Session = Depends(get_read_db)):
+    artifact = await post_reads.do_async((db.get_bind(), "id", post_id), load_post_artifact, db, Post.id == post_id)
+    if not artifact:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return artifact.response(request)
 
 @router.get("/slug/{slug}", response_model=PostResponse)
-def get_post_by_slug(slug: str, db: Session = Depends(get_db)):
-    post = db.query(Post).filter(Post.slug == slug).first()
-    if not post:
+async def get_post_by_slug(slug: str, request: Request, db: Session = Depends(get_read_db)):
+    artifact = await post_reads.do_async((db.get_bind(), "slug", slug), load_post_artifact, db, Post.slug == slug)
+    if not artifact:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return artifact.response(request)
+
+def apply_cover_image(db: Session, post: Post, image_id: Optional[int]) -> None:
+    """Point the post at an uploaded image, copying its variant URLs if they exist yet."""
+    if image_id is None:
+        post.cover_image_id = None
+        post.cover_images = None
+        return
+    image = db.query(Image).filter(Image.id == image_id).populate_existing().first()
+    if not image:
+        raise HTTPException(status_code=400, detail="Unknown cover image")
+    post.cover_image_id = image.id
+    if image.status == "ready":
+        post.cover_images = image.variants
+        post.cover_image = image.variants["full"]
+    else:
+        # The variant worker fills these in when it finishes
+        post.cover_images = None
+        post.cover_image = storage.url(original_key(image.sha256, image.content_type))
+
+def catch_up_cover_image(db: Session, post: Post) -> None:
+    # The variants may have finished between reading the image and our
+    # commit, in which case the worker's update did not see this post
+    if post.cover_image_id is not None and post.cover_images is None:
+        apply_cover_image(db, post, post.cover_image_id)
+        if post.cover_images is not None:
+            db.commit()
+            db.refresh(post)
 
-@router.post("", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
+def apply_schedule(post: Post) -> None:
+    """Publish a post whose scheduled time has passed; published posts have no schedule"""
+    if post.publish_at is not None and post.publish_at <= datetime.utcnow():
+        post.published = 1
+    if post.published:
+        post.publish_at = None
+
+def check_schedule(post: Post) -> None:
+    if post.published and post.publish_at is not None:
+        raise HTTPException(status_code=400, detail="Only drafts can be scheduled for publishing")
+
+@router.post(
+    "",
+    response_model=PostResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("create_post"))],
+)
 def create_post(post_data: PostCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     slug = generate_slug(post_data.title)
     # Ensure slug is unique
@@ -61,11 +179,30 @@ def create_post(post_data: PostCreate, db: Session = Depends(get_db), current_us
         slug=slug,
         cover_image=post_data.cover_image,
         author_id=current_user.id,
-        published=post_data.published
+        published=post_data.published,
+        publish_at=to_utc_naive(post_data.publish_at)
     )
+    check_schedule(db_post)
+    apply_schedule(db_post)
+    if post_data.cover_image_id is not None:
+        apply_cover_image(db, db_post, post_data.cover_image_id)
     db.add(db_post)
+    record_revision(db, db_post, current_user.id)
+    audio = False
+    if db_post.published:
+        db.flush()
+        fan_out_post(db, db_post)
+        post_published(db, db_post)
+        audio = request_post_audio(db_post)
     db.commit()
+    post_reads.forget()
     db.refresh(db_post)
+    catch_up_cover_image(db, db_post)
+    if db_post.published:
+        publish_post(db_post)
+        schedule_related_refresh(db_post.id)
+    if audio:
+        schedule_post_audio(db_post.id)
     return db_post
 
 @router.put("/{post_id}", response_model=PostResponse)
@@ -89,14 +226,188 @@ def update_post(
         if existing:
             slug = f"{slug}-{datetime.now().timestamp()}"
         update_data["slug"] = slug
+    if "publish_at" in update_data:
+        update_data["publish_at"] = to_utc_naive(update_data["publish_at"])
     
+    was_published = post.published
+    if "cover_image_id" in update_data:
+        apply_cover_image(db, post, update_data.pop("cover_image_id"))
+    previous = post_text(post)
     for field, value in update_data.items():
         setattr(post, field, value)
+    if "publish_at" in update_data:
+        check_schedule(post)
+    apply_schedule(post)
+    text_changed = post_text(post) != previous
+    if text_changed:
+        record_revision(db, post, current_user.id, previous)
+    if post.published and not was_published:
+        fan_out_post(db, post)
+        post_published(db, post)
+    elif was_published and not post.published:
+        post_unpublished(db, post)
+    # Unchanged paragraphs are reused, so re-rendering an edit is cheap
+    audio = bool(post.published) and (not was_published or text_changed) and request_post_audio(post)
     
-    db.commit()
+    commit_edit(db)
+    post_reads.forget()
+    db.refresh(post)
+    catch_up_cover_image(db, post)
+    if post.published and not was_published:
+        publish_post(post)
+    if post.published != was_published or (post.published and text_changed):
+        schedule_related_refresh(post.id)
+    if audio:
+        schedule_post_audio(post.id)
+    return post
+
+def get_own_post(db: Session, post_id: int, user: User) -> Post:
+    post = db.query(Post).filter(Post.id == post_id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if post.author_id != user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to edit this post")
+    return post
+
+def commit_edit(db: Session) -> None:
+    """Commit an edit, turning a lost race for the next revision number into a 409"""
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="The post was changed by another edit, reload it and retry")
+
+def save_text(db: Session, post: Post, user: User, title: str, subtitle: Optional[str], content: str) -> None:
+    """Replace a post's text, recording a revision and re-rendering its audio"""
+    previous = post_text(post)
+    if (title, subtitle, content) == previous:
+        return
+    if title != post.title:
+        slug = generate_slug(title)
+        if db.query(Post).filter(Post.slug == slug, Post.id != post.id).first():
+            slug = f"{slug}-{datetime.now().timestamp()}"
+        post.slug = slug
+    post.title, post.subtitle, post.content = title, subtitle, content
+    record_revision(db, post, user.id, previous)
+    audio = bool(post.published) and request_post_audio(post)
+    commit_edit(db)
+    post_reads.forget()
     db.refresh(post)
+    if post.published:
+        schedule_related_refresh(post.id)
+    if audio:
+        schedule_post_audio(post.id)
+
+@router.patch("/{post_id}/content", response_model=ContentPatchResponse)
+def patch_post_content(
+    post_id: int,
+    patch: ContentPatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply a delta to the content instead of resending the whole body.
+
+    The delta must be based on the post's current revision; otherwise the
+    response is 409 and the client should rebase on the latest content.
+    """
+    post = get_own_post(db, post_id, current_user)
+    if patch.base_revision != post.revision:
+        raise HTTPException(
+            status_code=409, detail=f"Post is at revision {post.revision}, not {patch.base_revision}"
+        )
+    try:
+        content = apply_delta(post.content, patch.delta)
+    except InvalidDelta as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    fields = patch.model_fields_set
+    save_text(
+        db,
+        post,
+        current_user,
+        patch.title if "title" in fields and patch.title is not None else post.title,
+        patch.subtitle if "subtitle" in fields else post.subtitle,
+        content,
+    )
+    return ContentPatchResponse(revision=post.revision, content_length=len(post.content), updated_at=post.updated_at)
+
+@router.get("/{post_id}/revisions", response_model=List[RevisionSummary])
+def list_revisions(
+    post_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The post's revisions, newest first (author only)"""
+    get_own_post(db, post_id, current_user)
+    return db.query(PostRevision).filter(PostRevision.post_id == post_id).order_by(
+        PostRevision.number.desc()
+    ).offset(skip).limit(limit).all()
+
+def _get_revision(db: Session, post_id: int, number: int):
+    revision = db.query(PostRevision).filter(PostRevision.post_id == post_id, PostRevision.number == number).first()
+    content = revision_content(db, post_id, number) if revision else None
+    if content is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return revision, content
+
+@router.get("/{post_id}/revisions/{number}", response_model=RevisionResponse)
+def get_revision(
+    post_id: int,
+    number: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    get_own_post(db, post_id, current_user)
+    revision, content = _get_revision(db, post_id, number)
+    return RevisionResponse(**RevisionSummary.model_validate(revision).model_dump(), content=content)
+
+@router.post("/{post_id}/revisions/{number}/restore", response_model=PostResponse)
+def restore_revision(
+    post_id: int,
+    number: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Make an old revision current again; recorded as a new revision"""
+    post = get_own_post(db, post_id, current_user)
+    revision, content = _get_revision(db, post_id, number)
+    save_text(db, post, current_user, revision.title, revision.subtitle, content)
     return post
 
+@router.get("/{post_id}/audio", responses={202: {"description": "Audio is still rendering"}})
+def get_post_audio(post_id: int, db: Session = Depends(get_read_db)):
+    """Redirect to the post's narration, served from media with range support."""
+    post = db.query(Post).filter(Post.id == post_id, Post.published == 1).first()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if post.audio_url:
+        return RedirectResponse(post.audio_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    if post.audio_status == "pending":
+        return JSONResponse({"status": "pending"}, status_code=status.HTTP_202_ACCEPTED, headers={"Retry-After": "5"})
+    raise HTTPException(status_code=404, detail="Audio not available")
+
+@router.get("/{post_id}/related", response_model=List[RelatedPostResponse])
+def get_related_posts(
+    post_id: int,
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_read_db)
+):
+    """Precomputed similar posts, most similar first (see app.core.related)"""
+    rows = db.query(Post, RelatedPost.score).join(
+        RelatedPost, RelatedPost.related_post_id == Post.id
+    ).options(joinedload(Post.author)).filter(
+        RelatedPost.post_id == post_id, Post.published == 1
+    ).order_by(RelatedPost.rank).limit(limit).all()
+    return [
+        RelatedPostResponse.model_validate(
+            {**{field: getattr(post, field) for field in RelatedPostResponse.model_fields if field != "score"},
+             "score": score},
+            from_attributes=True,
+        )
+        for post, score in rows
+    ]
+
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_post(
     post_id: int,
@@ -110,19 +421,26 @@ def delete_post(
     if post.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this post")
     
+    post_deleted(db, post)
+    # Comments and timeline entries go with it (ON DELETE CASCADE)
     db.delete(post)
     db.commit()
+    post_reads.forget()
     return None
 
 @router.get("/user/{user_id}", response_model=List[PostResponse])
 def get_user_posts(
     user_id: int,
     published: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size; all posts when omitted"),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Post).filter(Post.author_id == user_id)
+    query = db.query(Post).options(joinedload(Post.author)).filter(Post.author_id == user_id)
     if published is not None:
         query = query.filter(Post.published == published)
-    posts = query.order_by(Post.created_at.desc()).all()
-    return posts
+    # Prolific authors (the bot) have years of posts; pages read one range
+    # of ix_posts_author_id_created_at
+    posts = query.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+    return list_response(PostResponse, posts)
 
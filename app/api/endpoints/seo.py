@@ -1,60 +1,114 @@
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
-from app.database import get_db
+from app.core.compression import CompressedArtifact, artifact_cache
+from app.core.config import settings
+from app.database import get_read_db
 from app.models.post import Post
 from app.models.user import User
 
 router = APIRouter()
 
+BASE_URL = "https://kahanighargharki.vercel.app"
+RSS_ITEMS = 50
+
+# The most URLs one sitemap may list. Only the newest posts fit once the
+# archive is larger, and they are one range of ix_posts_published_created_at
+# from the top, so building the sitemap does not grow with the archive.
+SITEMAP_MAX_URLS = 50000
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def sitemap_version(db: Session) -> tuple:
+    """The day and this month's published posts.
+
+    Only this month is aggregated, so the check reads one month of the index
+    rather than every published post. Posts published, edited or unpublished
+    this month show up right away (as does a first post's author); changes to
+    older posts and renamed authors with the next day.
+    """
+    now = datetime.utcnow()
+    posts = db.query(func.count(Post.id), func.max(Post.updated_at)).filter(
+        Post.published == 1, Post.created_at >= month_start(now)
+    ).one()
+    return now.strftime("%Y-%m-%d"), tuple(posts)
+
 @router.get("/sitemap.xml")
-def generate_sitemap(db: Session = Depends(get_db)):
+def generate_sitemap(request: Request, db: Session = Depends(get_read_db)):
     """Generate XML sitemap for SEO"""
-    
-    base_url = "https://kahanighargharki.vercel.app"
-    
-    # Start XML
-    xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
+    version = sitemap_version(db)
+    artifact = artifact_cache.get("sitemap.xml", version)
+    if artifact is None:
+        # At the limit this is megabytes of XML, rebuilt whenever a post is
+        # published: best-ratio brotli would take seconds where the
+        # on-the-fly levels take milliseconds
+        artifact = CompressedArtifact.build(
+            build_sitemap(db, version[0]).encode("utf-8"), "application/xml",
+            gzip_level=settings.GZIP_LEVEL, brotli_quality=settings.BROTLI_QUALITY,
+        )
+        artifact_cache.set("sitemap.xml", version, artifact)
+    return artifact.response(request)
+
+def build_sitemap(db: Session, today: str) -> str:
+    xml = ['<?xml version="1.0" encoding="UTF-8"?>\n']
+    xml.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
     # Homepage
-    xml += '  <url>\n'
-    xml += f'    <loc>{base_url}/</loc>\n'
-    xml += f'    <lastmod>{datetime.utcnow().strftime("%Y-%m-%d")}</lastmod>\n'
-    xml += '    <changefreq>daily</changefreq>\n'
-    xml += '    <priority>1.0</priority>\n'
-    xml += '  </url>\n'
-    
-    # Get all published posts
-    posts = db.query(Post).filter(Post.published == 1).order_by(Post.created_at.desc()).all()
-    
-    for post in posts:
-        xml += '  <url>\n'
-        xml += f'    <loc>{base_url}/post/{post.slug}</loc>\n'
-        xml += f'    <lastmod>{post.updated_at.strftime("%Y-%m-%d")}</lastmod>\n'
-        xml += '    <changefreq>weekly</changefreq>\n'
-        xml += '    <priority>0.8</priority>\n'
-        xml += '  </url>\n'
-    
-    # Get all users with posts
-    users = db.query(User).join(Post).filter(Post.published == 1).distinct().all()
-    
-    for user in users:
-        xml += '  <url>\n'
-        xml += f'    <loc>{base_url}/profile/{user.username}</loc>\n'
-        xml += '    <changefreq>weekly</changefreq>\n'
-        xml += '    <priority>0.6</priority>\n'
-        xml += '  </url>\n'
-    
-    xml += '</urlset>'
-    
-    return Response(content=xml, media_type="application/xml")
+    xml.append('  <url>\n')
+    xml.append(f'    <loc>{BASE_URL}/</loc>\n')
+    xml.append(f'    <lastmod>{today}</lastmod>\n')
+    xml.append('    <changefreq>daily</changefreq>\n')
+    xml.append('    <priority>1.0</priority>\n')
+    xml.append('  </url>\n')
+
+    # Get all users with posts (sorted here: ORDER BY id would read every
+    # row of users instead of the published authors off their index)
+    usernames = sorted(username for (username,) in db.query(User.username).filter(User.published_post_count > 0))
+
+    # The newest published posts that fit, only the columns the URLs need
+    posts = db.query(Post.slug, Post.updated_at).filter(Post.published == 1).order_by(
+        Post.created_at.desc()
+    ).limit(max(SITEMAP_MAX_URLS - 1 - len(usernames), 0)).all()
+
+    for slug, updated_at in posts:
+        xml.append('  <url>\n')
+        xml.append(f'    <loc>{BASE_URL}/post/{slug}</loc>\n')
+        xml.append(f'    <lastmod>{updated_at.strftime("%Y-%m-%d")}</lastmod>\n')
+        xml.append('    <changefreq>weekly</changefreq>\n')
+        xml.append('    <priority>0.8</priority>\n')
+        xml.append('  </url>\n')
+
+    for username in usernames:
+        xml.append('  <url>\n')
+        xml.append(f'    <loc>{BASE_URL}/profile/{username}</loc>\n')
+        xml.append('    <changefreq>weekly</changefreq>\n')
+        xml.append('    <priority>0.6</priority>\n')
+        xml.append('  </url>\n')
+
+    xml.append('</urlset>')
+    return "".join(xml)
 
 @router.get("/rss.xml")
-def generate_rss(db: Session = Depends(get_db)):
+def generate_rss(request: Request, db: Session = Depends(get_read_db)):
     """Generate RSS feed for blog posts"""
-    
-    base_url = "https://kahanighargharki.vercel.app"
+
+    # The ids and edit times of the latest posts: a read of RSS_ITEMS index
+    # entries rather than an aggregate over every published post
+    version = tuple(
+        db.query(Post.id, Post.updated_at).filter(Post.published == 1).order_by(
+            Post.created_at.desc()
+        ).limit(RSS_ITEMS).all()
+    )
+    artifact = artifact_cache.get("rss.xml", version)
+    if artifact is None:
+        artifact = CompressedArtifact.build(build_rss(db).encode("utf-8"), "application/xml")
+        artifact_cache.set("rss.xml", version, artifact)
+    return artifact.response(request)
+
+def build_rss(db: Session) -> str:
+    base_url = BASE_URL
     
     # Start RSS
     rss = '<?xml version="1.0" encoding="UTF-8"?>\n'
@@ -68,7 +122,9 @@ def generate_rss(db: Session = Depends(get_db)):
     rss += f'    <atom:link href="{base_url}/rss.xml" rel="self" type="application/rss+xml"/>\n'
     
     # Get latest 50 published posts
-    posts = db.query(Post).filter(Post.published == 1).order_by(Post.created_at.desc()).limit(50).all()
+    posts = db.query(Post).options(joinedload(Post.author)).filter(Post.published == 1).order_by(
+        Post.created_at.desc()
+    ).limit(RSS_ITEMS).all()
     
     for post in posts:
         rss += '    <item>\n'
@@ -83,4 +139,4 @@ def generate_rss(db: Session = Depends(get_db)):
     rss += '  </channel>\n'
     rss += '</rss>'
     
-    return Response(content=rss, media_type="application/xml")
+    return rss
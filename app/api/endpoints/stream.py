@@ -0,0 +1,36 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.events import FEED_TOPIC, HEARTBEAT, broker, post_topic
+
+router = APIRouter()
+
+@router.get("")
+async def stream(post_id: Optional[int] = None):
+    """Server-sent events: new posts on the global feed, or new comments on one post with ?post_id="""
+    if broker.subscriber_count() >= settings.STREAM_MAX_CLIENTS:
+        raise HTTPException(status_code=503, detail="Too many live connections", headers={"Retry-After": "30"})
+    topics = (post_topic(post_id),) if post_id is not None else (FEED_TOPIC,)
+
+    async def frames():
+        # Subscribed once the response starts streaming, so a client that
+        # goes away before then never holds a slot; the cap above may be
+        # overshot by the requests racing it, which is fine for a soft limit
+        subscription = broker.subscribe(topics, settings.STREAM_CLIENT_BUFFER)
+        try:
+            # Reconnect delay for EventSource clients
+            yield b"retry: 5000\n\n"
+            while True:
+                # Idle clients cost one parked coroutine; the heartbeat keeps
+                # proxies from closing the connection and surfaces disconnects
+                frame = await subscription.next_frame(settings.STREAM_HEARTBEAT_SECONDS)
+                yield HEARTBEAT if frame is None else frame
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.image import Image
+from app.models.user import User
+from app.schemas.image import ImageResponse
+from app.core.config import settings
+from app.core.dependencies import get_current_user
+from app.core.images import UnsupportedImage, UploadTooLarge, spool_upload, store_upload
+
+router = APIRouter()
+
+@router.post("/images", response_model=ImageResponse, status_code=status.HTTP_201_CREATED)
+async def upload_image(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Upload an image as the raw request body (Content-Type: image/*).
+
+    The body is streamed to disk rather than parsed as a multipart form.
+    Re-uploading identical bytes returns the existing image with 200.
+    Variants are generated in the background; poll GET /images/{id}.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    try:
+        path, sha256, content_type, size = await spool_upload(request.stream(), settings.UPLOAD_MAX_BYTES)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="Image too large")
+    except UnsupportedImage:
+        raise HTTPException(status_code=415, detail="Only JPEG, PNG, GIF and WebP images are supported")
+
+    image, created = await run_in_threadpool(store_upload, db, path, sha256, content_type, size, current_user.id)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return image
+
+@router.get("/images/{image_id}", response_model=ImageResponse)
+def get_image(image_id: int, db: Session = Depends(get_db)):
+    image = db.query(Image).filter(Image.id == image_id).first()
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return image
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db, get_read_db
+from app.models import Follow
+from app.models.user import User
+from app.schemas.user import UserBatchResponse, UserProfile
+from app.core.accounts import request_account_deletion
+from app.core.dependencies import batch_keys, check_batch_size, get_current_user
+from app.core.timeline import follow, unfollow
+
+router = APIRouter()
+
+def _get_user_or_404(db: Session, user_id: int) -> User:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+@router.get("/batch", response_model=UserBatchResponse)
+def get_users_batch(
+    ids: Optional[List[str]] = Query(None, description="Comma-separated user ids"),
+    usernames: Optional[List[str]] = Query(None, description="Comma-separated usernames"),
+    db: Session = Depends(get_read_db)
+):
+    """Several author cards in one query"""
+    ids = batch_keys(ids, "ids", int)
+    usernames = batch_keys(usernames, "usernames")
+    check_batch_size(ids, usernames)
+    users = []
+    if ids or usernames:
+        users = db.query(User).filter(
+            or_(User.id.in_(ids), User.username.in_(usernames)), User.deletion_requested_at.is_(None)
+        ).all()
+    by_id = {user.id: user for user in users}
+    by_username = {user.username: user for user in users}
+    ordered = [by_id[user_id] for user_id in ids if user_id in by_id]
+    ordered += [by_username[username] for username in usernames if username in by_username]
+    return UserBatchResponse.model_validate({
+        "users": list({user.id: user for user in ordered}.values()),
+        "missing_ids": [user_id for user_id in ids if user_id not in by_id],
+        "missing_usernames": [username for username in usernames if username not in by_username],
+    }, from_attributes=True)
+
+@router.get("/{username}", response_model=UserProfile)
+def get_user_profile(username: str, db: Session = Depends(get_read_db)):
+    """An author's public profile with post and comment totals (one indexed read)"""
+    user = db.query(User).filter(User.username == username, User.deletion_requested_at.is_(None)).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
+def delete_my_account(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Delete your account with all your posts, comments and follows.
+
+    The account stops working immediately; its data is removed in the
+    background.
+    """
+    request_account_deletion(db, current_user)
+    return {"status": "deleting"}
+
+@router.post("/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+def follow_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Follow an author; their recent posts are added to your feed"""
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot follow yourself")
+    followee = _get_user_or_404(db, user_id)
+    try:
+        if follow(db, current_user, followee):
+            db.commit()
+    except IntegrityError:
+        # A concurrent request (a double click) inserted the same follow
+        # first; anything else is a real error
+        db.rollback()
+        following = db.query(Follow).filter(Follow.follower_id == current_user.id, Follow.followee_id == user_id)
+        if not db.query(following.exists()).scalar():
+            raise
+    return None
+
+@router.delete("/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+def unfollow_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Stop following an author and drop their posts from your feed"""
+    followee = _get_user_or_404(db, user_id)
+    if unfollow(db, current_user, followee):
+        db.commit()
+    return None
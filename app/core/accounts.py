@@ -0,0 +1,205 @@
+"""Account deletion as a chunked background job.
+
+The foreign keys cascade, so deleting the user row alone would remove
+everything, but in one transaction that can run for minutes and hold locks
+on every table for a prolific author. The job instead deletes the account's
+rows in batches of ACCOUNT_DELETION_BATCH_SIZE, committing between batches,
+and removes the user last. Every step deletes by condition, so a job cut
+short (deploy, crash) is simply run again: pending deletions are resumed
+at startup.
+
+Every API worker resumes deletions when it starts, so a job is claimed
+before it runs: one UPDATE ... RETURNING stamps deletion_started_at on the
+pending accounts nobody holds, and each worker runs just the ones it
+stamped. A failed or cancelled job clears its claim for the next startup;
+the claim of a process that died expires after
+ACCOUNT_DELETION_LEASE_MINUTES.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from app.core.author_stats import refresh_author_stats
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import Comment, Follow, Post, PostRevision, TimelineEntry, User
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending: Dict[Future, int] = {}
+
+
+def _delete_batches(db: Session, table, key, condition, batch_size: int) -> int:
+    """Delete rows matching condition, batch_size at a time, committing each batch.
+
+    key identifies rows among those matching condition (the primary key, or
+    the free half of a composite key the condition pins down).
+    """
+    total = 0
+    while True:
+        batch = select(key).where(condition).limit(batch_size).scalar_subquery()
+        deleted = db.execute(
+            delete(table).where(condition, key.in_(batch)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def _unfollow_all(db: Session, user_id: int, batch_size: int) -> int:
+    """Drop the user's follows, keeping the followees' follower counts right."""
+    total = 0
+    while True:
+        followees = db.execute(
+            select(Follow.followee_id).where(Follow.follower_id == user_id).limit(batch_size)
+        ).scalars().all()
+        if not followees:
+            return total
+        db.execute(
+            update(User).where(User.id.in_(followees)).values(
+                follower_count=User.follower_count - 1, updated_at=User.updated_at
+            )
+        )
+        db.execute(delete(Follow).where(Follow.follower_id == user_id, Follow.followee_id.in_(followees)))
+        db.commit()
+        total += len(followees)
+
+
+def delete_account(user_id: int, batch_size: Optional[int] = None) -> None:
+    """Delete a user and everything they own, in short transactions."""
+    batch_size = batch_size or settings.ACCOUNT_DELETION_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        own_posts = select(Post.id).where(Post.author_id == user_id)
+        # Authors whose comments_received_count drops with the user's comments
+        commented_authors = db.execute(
+            select(Post.author_id).distinct().join(Comment, Comment.post_id == Post.id)
+            .where(Comment.author_id == user_id, Post.author_id != user_id)
+        ).scalars().all()
+        deleted = {
+            "comments": _delete_batches(db, Comment, Comment.id, Comment.author_id == user_id, batch_size),
+            # Other people's comments on the user's posts; a popular post
+            # would otherwise be one huge cascade
+            "replies": _delete_batches(db, Comment, Comment.id, Comment.post_id.in_(own_posts), batch_size),
+            "revisions": _delete_batches(
+                db, PostRevision, PostRevision.id, PostRevision.post_id.in_(own_posts), batch_size
+            ),
+            "timeline": _delete_batches(
+                db, TimelineEntry, TimelineEntry.post_id, TimelineEntry.user_id == user_id, batch_size
+            ),
+            "followers": _delete_batches(db, Follow, Follow.follower_id, Follow.followee_id == user_id, batch_size),
+            "following": _unfollow_all(db, user_id, batch_size),
+            # Cascades to the posts' entries in followers' timelines
+            "posts": _delete_batches(db, Post, Post.id, Post.author_id == user_id, batch_size),
+        }
+        for start in range(0, len(commented_authors), batch_size):
+            refresh_author_stats(db, commented_authors[start:start + batch_size])
+            db.commit()
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        logger.info("Deleted account %s: %s", user_id, deleted)
+    finally:
+        db.close()
+
+
+def claim_account_deletions(db: Session, user_ids: Optional[Sequence[int]] = None) -> List[int]:
+    """Claim pending deletions no live worker holds; returns the claimed ids."""
+    now = datetime.utcnow()
+    claimable = User.deletion_requested_at.isnot(None) & (
+        User.deletion_started_at.is_(None)
+        | (User.deletion_started_at < now - timedelta(minutes=settings.ACCOUNT_DELETION_LEASE_MINUTES))
+    )
+    if user_ids is not None:
+        claimable &= User.id.in_(user_ids)
+    claimed = db.execute(
+        update(User).where(claimable).values(deletion_started_at=now, updated_at=User.updated_at)
+        .returning(User.id).execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return claimed
+
+
+def _release(user_id: int) -> None:
+    """Give up a claim, so the next startup retries the deletion."""
+    db = SessionLocal()
+    try:
+        db.execute(update(User).where(User.id == user_id).values(
+            deletion_started_at=None, updated_at=User.updated_at
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run(user_id: int) -> None:
+    try:
+        delete_account(user_id)
+    except Exception:
+        # Left marked for deletion, so the next startup retries it
+        logger.exception("Deleting account %s failed", user_id)
+        _release(user_id)
+
+
+def _finished(future: Future) -> None:
+    user_id = _pending.pop(future, None)
+    if future.cancelled() and user_id is not None:
+        _release(user_id)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # One job at a time: deletions are rare and compete with live traffic
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="account-deletion")
+        return _executor
+
+
+def schedule_account_deletion(user_id: int) -> Future:
+    """Queue a deletion this process has claimed."""
+    future = _get_executor().submit(_run, user_id)
+    _pending[future] = user_id
+    future.add_done_callback(_finished)
+    return future
+
+
+def request_account_deletion(db: Session, user: User) -> None:
+    """Lock the account out and queue its deletion."""
+    if user.deletion_requested_at is None:
+        user.deletion_requested_at = datetime.utcnow()
+        db.commit()
+    # Already claimed when the user asked twice and the first job still runs
+    if claim_account_deletions(db, [user.id]):
+        schedule_account_deletion(user.id)
+
+
+def resume_account_deletions() -> int:
+    """Queue deletions left unfinished by a previous process."""
+    db = SessionLocal()
+    try:
+        user_ids = claim_account_deletions(db)
+    finally:
+        db.close()
+    for user_id in user_ids:
+        schedule_account_deletion(user_id)
+    return len(user_ids)
+
+
+def wait_for_deletions(timeout: Optional[float] = None) -> None:
+    """Block until queued deletions finish (tests, shutdown)."""
+    wait(list(_pending), timeout=timeout)
+
+
+def shutdown_deletion_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            # Unstarted deletions are picked up again at the next startup
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,92 @@
+"""Author profile aggregates kept on the users row.
+
+published_post_count, comments_received_count and last_published_at are
+adjusted with relative UPDATEs in the same transaction as the write that
+changes them, so a profile is a single-row read however prolific the
+author. Bulk operations that bypass the per-write hooks (account deletion,
+backfills) call ``refresh_author_stats`` to recount from scratch.
+
+Every UPDATE sets updated_at to itself. Otherwise the onupdate hook would
+bump it on each comment, and the author's updated_at versions the cached
+artifacts of all their posts.
+"""
+from typing import Iterable
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from app.models import Comment, Post, User
+
+
+def _latest_published(author_id, exclude_post_id=None):
+    query = select(func.max(Post.created_at)).where(Post.author_id == author_id, Post.published == 1)
+    if exclude_post_id is not None:
+        query = query.where(Post.id != exclude_post_id)
+    return query.scalar_subquery()
+
+
+def _stats_update(condition, **values):
+    """An UPDATE of the aggregates that leaves users.updated_at alone."""
+    return update(User).where(condition).values(updated_at=User.updated_at, **values).execution_options(
+        synchronize_session=False
+    )
+
+
+def post_published(db: Session, post: Post) -> None:
+    """Count a post that just became published; call after it is flushed."""
+    db.execute(_stats_update(
+        User.id == post.author_id,
+        published_post_count=User.published_post_count + 1,
+        last_published_at=case(
+            (User.last_published_at.is_(None), post.created_at),
+            (User.last_published_at < post.created_at, post.created_at),
+            else_=User.last_published_at,
+        ),
+    ))
+
+
+def post_unpublished(db: Session, post: Post) -> None:
+    """Uncount a post that is being unpublished or deleted."""
+    db.execute(_stats_update(
+        User.id == post.author_id,
+        published_post_count=User.published_post_count - 1,
+        last_published_at=_latest_published(post.author_id, exclude_post_id=post.id),
+    ))
+
+
+def post_deleted(db: Session, post: Post) -> None:
+    """Uncount a post and, as they cascade with it, its comments."""
+    if post.published:
+        post_unpublished(db, post)
+    comments = db.execute(select(func.count()).where(Comment.post_id == post.id)).scalar()
+    if comments:
+        comments_removed(db, post.author_id, comments)
+
+
+def comment_added(db: Session, post: Post) -> None:
+    db.execute(_stats_update(
+        User.id == post.author_id,
+        comments_received_count=User.comments_received_count + 1,
+    ))
+
+
+def comments_removed(db: Session, author_id: int, count: int = 1) -> None:
+    db.execute(_stats_update(
+        User.id == author_id,
+        comments_received_count=User.comments_received_count - count,
+    ))
+
+
+def refresh_author_stats(db: Session, user_ids: Iterable[int]) -> None:
+    """Recount the aggregates of the given users (each an indexed count)."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    db.execute(_stats_update(
+        User.id.in_(user_ids),
+        published_post_count=select(func.count()).where(
+            Post.author_id == User.id, Post.published == 1
+        ).scalar_subquery(),
+        comments_received_count=select(func.count()).select_from(Comment).join(Post, Comment.post_id == Post.id).where(
+            Post.author_id == User.id
+        ).scalar_subquery(),
+        last_published_at=_latest_published(User.id),
+    ))
@@ -14,12 +14,142 @@ class Settings(BaseSettings):
         f"sqlite:///{os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app.db'))}"
     )
 
+    # Skip running migrations at startup (faster cold starts when they are
+    # applied separately with `alembic upgrade head`)
+    SKIP_SCHEMA_CHECK: bool = False
+
+    # Connection pool
+    # DB_POOL_MODE: "queue" keeps a local pool; "null" opens a connection per
+    # checkout, which is what you want behind PgBouncer in transaction mode.
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 300
+    # DB_PRE_PING: "always" pings on every checkout, "idle" only pings
+    # connections idle for longer than DB_PRE_PING_IDLE_SECONDS, "never"
+    # relies on recycle and disconnect detection.
+    DB_PRE_PING: str = "always"
+    DB_PRE_PING_IDLE_SECONDS: float = 30.0
+
+    # Read replicas - comma-separated URLs, empty means reads go to the primary
+    READ_DATABASE_URL: str = ""
+    # After a user writes, their reads stay on the primary for this long
+    READ_REPLICA_STICKY_SECONDS: float = 5.0
+    # How long an unhealthy replica is skipped before it is probed again
+    READ_REPLICA_RETRY_SECONDS: float = 10.0
+
+    # SQL profiling: SQL_PROFILING profiles every request; in debug builds a
+    # request can also opt in with the X-SQL-Profile header.
+    SQL_PROFILING: bool = False
+    SQL_SLOW_QUERY_MS: float = 500.0  # 0 disables the slow-query log
+    SQL_N_PLUS_ONE_THRESHOLD: int = 3
+
+    # Logging: records go through a bounded queue to a background writer.
+    # LOG_FORMAT "json" or "text"; LOG_SAMPLE_RATES keeps a fraction of
+    # INFO records per logger, e.g. "app.api.endpoints.auth:0.1"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATES: str = ""
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Response compression
+    COMPRESSION_MIN_BYTES: int = 1024
+    GZIP_LEVEL: int = 6  # on-the-fly compression favours speed
+    BROTLI_QUALITY: int = 4
+    ARTIFACT_GZIP_LEVEL: int = 9  # precompressed artifacts are built once
+    ARTIFACT_BROTLI_QUALITY: int = 11
+    ARTIFACT_CACHE_ENTRIES: int = 256
+
+    # Keys accepted per batch lookup (/api/posts/batch, /api/users/batch)
+    BATCH_MAX_ITEMS: int = 100
+
+    # Live feed (/api/stream): events buffered per client before the oldest
+    # are dropped, heartbeat interval, and connections accepted per worker
+    STREAM_CLIENT_BUFFER: int = 100
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+    STREAM_MAX_CLIENTS: int = 10000
+
+    # Following feed: authors with more followers than this are merged in at
+    # read time instead of being copied into every follower's timeline;
+    # following someone backfills their latest FEED_BACKFILL_POSTS posts
+    FEED_FANOUT_MAX_FOLLOWERS: int = 1000
+    FEED_BACKFILL_POSTS: int = 20
+
+    # Uploaded media: local storage root and the URL prefix it is served
+    # under, upload size cap, threads generating image variants and their
+    # WebP quality
+    MEDIA_ROOT: str = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'media'))
+    MEDIA_URL: str = "/media"
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    IMAGE_WORKERS: int = 2
+    IMAGE_WEBP_QUALITY: int = 80
+
+    # Rate limits ("N/period": bursts of N, refilled at N per period).
+    # RATE_LIMIT_BACKEND "memory" is per worker; "redis" shares buckets
+    # between workers through REDIS_URL.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_LOGIN: str = "10/minute"
+    RATE_LIMIT_CREATE_POST: str = "20/hour"
+    RATE_LIMIT_CREATE_COMMENT: str = "10/minute"
+    # External cron triggers the bot every 5 minutes, like ai_scheduler.py
+    RATE_LIMIT_AI_BOT: str = "12/hour"
+
+    # Post revisions: every Nth revision stores the full text, the rest store
+    # deltas, so rebuilding any revision applies at most N - 1 of them
+    REVISION_SNAPSHOT_INTERVAL: int = 10
+
+    # Related posts: neighbours kept per post, hashed n-gram space (2^bits),
+    # n-grams kept per post vector and characters of content considered.
+    # Publishing refreshes the table incrementally when enabled, scoring a
+    # post against the RELATED_REFRESH_WINDOW most recent ones; full
+    # rebuilds run offline with `python -m app.core.related`, which must
+    # have run once before enabling.
+    RELATED_POSTS_ENABLED: bool = False
+    RELATED_REFRESH_WINDOW: int = 5000
+    RELATED_POSTS_K: int = 10
+    RELATED_HASH_BITS: int = 20
+    RELATED_FEATURES_PER_POST: int = 128
+    RELATED_MAX_CHARS: int = 4000
+
+    # Scheduled publishing: how often due posts are released, and at most
+    # how many per UPDATE
+    PUBLISHER_ENABLED: bool = True
+    PUBLISHER_INTERVAL_SECONDS: float = 30.0
+    PUBLISHER_BATCH_SIZE: int = 100
+
+    # Rows deleted per transaction when an account is deleted, and how long
+    # a worker's claim on a deletion holds before another may retry it
+    ACCOUNT_DELETION_BATCH_SIZE: int = 500
+    ACCOUNT_DELETION_LEASE_MINUTES: int = 60
+
+    # Post audio: TTS_PROVIDER "desivocal", "stub" (silent audio, for tests
+    # and local dev) or empty to use DesiVocal when DESIVOCAL_API_KEY is set
+    # and skip audio otherwise. Paragraphs longer than TTS_MAX_CHUNK_CHARS
+    # are split at sentence ends.
+    TTS_PROVIDER: str = ""
+    DESIVOCAL_API_KEY: str = ""
+    DESIVOCAL_API_URL: str = "https://prod-api2.desivocal.com/dv/api/v0/tts_api/generate"
+    DESIVOCAL_VOICE_ID: str = ""
+    TTS_TIMEOUT_SECONDS: float = 60.0
+    TTS_WORKERS: int = 1
+    TTS_MAX_CHUNK_CHARS: int = 1000
+
     # Security
     SECRET_KEY: str = os.getenv(
         "SECRET_KEY",
         "your-secret-key-here-change-in-production"
     )
     ALGORITHM: str = "HS256"
+
+    # Password hashing: bcrypt cost factor (2^rounds iterations; 12 takes
+    # ~250ms per hash, tests and local dev can use 4) and the number of
+    # threads hashing may occupy at once
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
     # Google OAuth
@@ -37,6 +167,10 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
+    @property
+    def read_database_urls(self) -> List[str]:
+        return [url.strip() for url in self.READ_DATABASE_URL.split(",") if url.strip()]
+
     class Config:
         # Ensure we load the backend/.env file regardless of current working directory.
         env_file = str(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
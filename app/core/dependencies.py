@@ -1,7 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Callable, List, Optional
+from app.core.config import settings
+from app.database import get_db, STICKY_KEY
 from app.models.user import User
 from app.core.security import decode_access_token
 from jose.exceptions import ExpiredSignatureError
@@ -32,8 +34,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         user_id = int(user_id_str)
     except (ValueError, TypeError):
         raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.id == user_id, User.deletion_requested_at.is_(None)).first()
     if user is None:
         raise credentials_exception
+    db.info[STICKY_KEY] = user_id_str
     return user
 
+
+def batch_keys(values: Optional[List[str]], name: str, cast: Callable = str) -> list:
+    """Keys from ?name=a,b&name=c, de-duplicated, in request order"""
+    keys = []
+    for value in values or ():
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                keys.append(cast(item))
+            except ValueError:
+                raise HTTPException(status_code=422, detail=f"Invalid value in {name}: {item!r}")
+    return list(dict.fromkeys(keys))
+
+def check_batch_size(*key_lists: list) -> None:
+    total = sum(len(keys) for keys in key_lists)
+    if total > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"At most {settings.BATCH_MAX_ITEMS} items per batch, got {total}")
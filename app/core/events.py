@@ -0,0 +1,169 @@
+"""In-process publish/subscribe behind the live feed (/api/stream).
+
+Writers publish small JSON events once their transaction has committed;
+SSE clients subscribe to topics: ``feed`` for newly published posts and
+``post:<id>`` for new comments on one post. Each event is encoded to an SSE
+frame once and the same bytes are handed to every subscriber.
+
+Publishing never blocks. Every subscriber has a bounded buffer; a client
+that falls behind loses its oldest events and is sent a ``lagged`` event so
+it can refetch over the REST endpoints. Publishers usually run in threadpool
+threads, so delivery is scheduled on the subscribers' event loop.
+
+The broker is per process: with several workers, or the bot running in its
+own process, only clients connected to the publishing process see an event.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+from app.core.metrics import REGISTRY
+
+FEED_TOPIC = "feed"
+HEARTBEAT = b": ping\n\n"
+
+STREAM_EVENTS = REGISTRY.counter("stream_events_published_total", "Events published to the live feed", ["event"])
+STREAM_EVENTS_DROPPED = REGISTRY.counter(
+    "stream_events_dropped_total", "Events dropped because a client's buffer was full"
+)
+STREAM_CLIENTS = REGISTRY.gauge("stream_clients", "Connected live feed clients")
+
+
+def post_topic(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def encode_event(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    frame = f"event: {event}\ndata: {payload}\n\n"
+    if event_id is not None:
+        frame = f"id: {event_id}\n" + frame
+    return frame.encode("utf-8")
+
+
+class Subscription:
+    """One client's view of the broker: a bounded buffer of encoded frames."""
+
+    def __init__(self, broker: "Broker", topics: Iterable[str], buffer_size: int, loop: asyncio.AbstractEventLoop):
+        self.topics = tuple(topics)
+        self.dropped = 0
+        self._broker = broker
+        self._buffer: deque = deque()
+        self._buffer_size = buffer_size
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def _deliver(self, frame: bytes) -> None:
+        # Always runs on the subscriber's event loop
+        if len(self._buffer) >= self._buffer_size:
+            self._buffer.popleft()
+            self.dropped += 1
+            STREAM_EVENTS_DROPPED.inc()
+        self._buffer.append(frame)
+        self._ready.set()
+
+    async def next_frame(self, timeout: float) -> Optional[bytes]:
+        """The next frame to send, or None if nothing arrived within timeout."""
+        if not self._buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return encode_event("lagged", {"dropped": dropped})
+        return self._buffer.popleft()
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+def _deliver_all(subscriptions: List[Subscription], frame: bytes) -> None:
+    for subscription in subscriptions:
+        subscription._deliver(frame)
+
+
+class Broker:
+    def __init__(self):
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics: Iterable[str], buffer_size: int) -> Subscription:
+        """Subscribe the calling event loop's task to topics."""
+        subscription = Subscription(self, topics, buffer_size, asyncio.get_running_loop())
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            removed = False
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers and subscription in subscribers:
+                    subscribers.discard(subscription)
+                    removed = True
+                    if not subscribers:
+                        del self._topics[topic]
+            if removed:
+                self._count -= 1
+
+    def subscriber_count(self) -> int:
+        return self._count
+
+    def publish(self, topic: str, event: str, data: dict) -> int:
+        """Queue an event for every subscriber of topic; returns how many there were."""
+        STREAM_EVENTS.inc(event=event)
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        if not subscribers:
+            return 0
+        frame = encode_event(event, data, next(self._ids))
+        # One wake-up per event loop rather than one per subscriber
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription._loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, group, frame)
+            except RuntimeError:
+                # The loop has shut down; its subscriptions go away with it
+                pass
+        return len(subscribers)
+
+
+broker = Broker()
+STREAM_CLIENTS.set_function(broker.subscriber_count)
+
+
+def publish_post(post) -> None:
+    """Announce a newly published post on the global feed."""
+    broker.publish(FEED_TOPIC, "post", {
+        "id": post.id,
+        "slug": post.slug,
+        "title": post.title,
+        "subtitle": post.subtitle,
+        "author_id": post.author_id,
+        "created_at": post.created_at,
+    })
+
+
+def publish_comment(comment) -> None:
+    """Announce a new comment to clients following its post (same shape as CommentResponse)."""
+    author = comment.author
+    broker.publish(post_topic(comment.post_id), "comment", {
+        "id": comment.id,
+        "post_id": comment.post_id,
+        "content": comment.content,
+        "author_id": comment.author_id,
+        "author": {"id": author.id, "username": author.username, "full_name": author.full_name},
+        "created_at": comment.created_at,
+        "updated_at": comment.updated_at,
+    })
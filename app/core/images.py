@@ -0,0 +1,209 @@
+"""Image uploads: streamed to disk, deduplicated by hash, resized off the request path.
+
+The request handler only spools the body to a temp file while hashing it,
+then either reuses the existing image with that hash or stores the original
+and queues variant generation on a small thread pool (Pillow releases the
+GIL while decoding, resizing and encoding). When the variants are ready,
+posts using the image as their cover get the variant URLs copied onto them.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+import anyio
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.storage import storage
+from app.database import SessionLocal
+from app.models import Image, Post
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes; images are never upscaled
+VARIANTS = {
+    "thumbnail": (320, 320),
+    "card": (800, 800),
+    "full": (1600, 1600),
+}
+EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/gif": "gif", "image/webp": "webp"}
+CHUNK_SIZE = 64 * 1024
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending: Set[Future] = set()
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedImage(Exception):
+    pass
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Content type from the file's magic bytes; the client's header is not trusted."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def image_key(sha256: str, name: str) -> str:
+    return f"images/{sha256[:2]}/{sha256}/{name}"
+
+
+def original_key(sha256: str, content_type: str) -> str:
+    return image_key(sha256, f"original.{EXTENSIONS[content_type]}")
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], max_bytes: int) -> Tuple[str, str, str, int]:
+    """Write an upload to a temp file while hashing it, never holding it in memory.
+
+    Returns (temp path, sha256, content type, size). The caller owns the
+    temp file.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    fd, path = tempfile.mkstemp(dir=storage.temp_dir(), suffix=".upload")
+    os.close(fd)
+    try:
+        async with await anyio.open_file(path, "wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if content_type is None:
+                    content_type = sniff_content_type(chunk[:16])
+                    if content_type is None:
+                        raise UnsupportedImage()
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await f.write(chunk)
+        if content_type is None:
+            raise UnsupportedImage()
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest(), content_type, size
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="image-variants")
+        return _executor
+
+
+def store_upload(db, path: str, sha256: str, content_type: str, size: int, user_id: int) -> Tuple[Image, bool]:
+    """Record a spooled upload, or reuse the image with the same hash.
+
+    Returns (image, created). Consumes the temp file either way.
+    """
+    image = db.query(Image).filter(Image.sha256 == sha256).first()
+    if image is None:
+        key = original_key(sha256, content_type)
+        if storage.exists(key):
+            os.unlink(path)
+        else:
+            storage.put_file(key, path)
+        image = Image(sha256=sha256, content_type=content_type, size_bytes=size, status="pending", uploaded_by=user_id)
+        db.add(image)
+        try:
+            db.commit()
+        except IntegrityError:
+            # The same file uploaded concurrently
+            db.rollback()
+            image = db.query(Image).filter(Image.sha256 == sha256).one()
+            return image, False
+        schedule_variants(image.id)
+        return image, True
+
+    os.unlink(path)
+    if image.status == "failed":
+        image.status = "pending"
+        db.commit()
+        schedule_variants(image.id)
+    return image, False
+
+
+def schedule_variants(image_id: int) -> Future:
+    future = _get_executor().submit(process_image, image_id)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    return future
+
+
+def wait_for_variants(timeout: Optional[float] = None) -> None:
+    """Block until queued variant jobs finish (tests, shutdown)."""
+    wait(list(_pending), timeout=timeout)
+
+
+def shutdown_image_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def render_variants(source_path: str, sha256: str) -> Tuple[int, int, Dict[str, str]]:
+    """Write the WebP variants for an original; returns (width, height, urls)."""
+    from PIL import Image as PILImage, ImageOps  # only the worker threads need Pillow
+
+    urls = {}
+    with PILImage.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        width, height = image.size
+        mode = "RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB"
+        image = image.convert(mode)
+        for name, box in VARIANTS.items():
+            key = image_key(sha256, f"{name}.webp")
+            if not storage.exists(key):
+                variant = image.copy()
+                variant.thumbnail(box, PILImage.LANCZOS)
+                fd, tmp = tempfile.mkstemp(dir=storage.temp_dir(), suffix=".webp")
+                os.close(fd)
+                variant.save(tmp, "WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+                storage.put_file(key, tmp)
+            urls[name] = storage.url(key)
+    return width, height, urls
+
+
+def process_image(image_id: int) -> None:
+    db = SessionLocal()
+    try:
+        image = db.get(Image, image_id)
+        if image is None:
+            return
+        try:
+            width, height, urls = render_variants(
+                storage.local_path(original_key(image.sha256, image.content_type)), image.sha256
+            )
+        except Exception:
+            logger.exception("Generating variants failed for image %s", image_id)
+            image.status = "failed"
+            db.commit()
+            return
+        urls["original"] = storage.url(original_key(image.sha256, image.content_type))
+        image.width, image.height, image.variants, image.status = width, height, urls, "ready"
+        # updated_at changes too, which retires cached post responses
+        db.query(Post).filter(Post.cover_image_id == image_id).update(
+            {Post.cover_images: urls, Post.cover_image: urls["full"], Post.updated_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
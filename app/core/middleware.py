@@ -0,0 +1,241 @@
+"""Pure ASGI middlewares.
+
+These wrap ``send`` directly instead of subclassing BaseHTTPMiddleware, so
+they add no extra task or stream buffering per request.
+"""
+import time
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.compression import StreamCompressor, choose_encoding, is_compressible
+from app.core.config import settings
+from app.core.metrics import REGISTRY, RequestStats, current_request_stats
+from app.core.profiling import QueryProfile, current_profile, finish_profile
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being served")
+RESPONSE_SIZE = REGISTRY.histogram(
+    "http_response_size_bytes",
+    "HTTP response body size",
+    ["route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+REQUEST_DB_STATEMENTS = REGISTRY.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100, 250),
+)
+REQUEST_DB_DURATION = REGISTRY.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per request",
+    ["route"],
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, e.g. ``/api/posts/slug/{slug}``."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        # Unmatched paths are collapsed so scanners can't blow up label cardinality
+        return "<unmatched>"
+    # Included routers may only know their own relative path, so recover the
+    # prefix by rendering the template with the matched params.
+    convertors = getattr(route, "param_convertors", {})
+    try:
+        concrete = template.format(**{
+            name: convertors[name].to_string(value) if name in convertors else value
+            for name, value in scope.get("path_params", {}).items()
+        })
+    except (KeyError, IndexError, ValueError, AssertionError):
+        return template
+    path = scope.get("path", "")
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        body_size = 0
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        REQUESTS_IN_FLIGHT.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            current_request_stats.reset(token)
+            route = route_template(scope)
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, method=scope["method"], route=route, status=str(status_code)
+            )
+            RESPONSE_SIZE.observe(body_size, route=route)
+            REQUEST_DB_STATEMENTS.observe(stats.statements, route=route)
+            REQUEST_DB_DURATION.observe(stats.db_seconds, route=route)
+
+
+class SecurityHeadersMiddleware:
+    """Set our cross-origin response headers on ``http.response.start``.
+
+    - ``Cross-Origin-Opener-Policy: same-origin-allow-popups`` on every
+      response, so the Google sign-in popup can talk back to the opener.
+    - ``Access-Control-Allow-Private-Network: true`` when the browser sent
+      a private-network preflight (``Access-Control-Request-Private-Network``).
+
+    Headers are edited in the start message, so streaming bodies pass
+    through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        private_network = bool(Headers(scope=scope).get("access-control-request-private-network"))
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["Cross-Origin-Opener-Policy"] = "same-origin-allow-popups"
+                if private_network:
+                    headers["Access-Control-Allow-Private-Network"] = "true"
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class SQLProfilingMiddleware:
+    """Profile SQL for a request and report it in ``X-SQL-Profile``.
+
+    Active for every request when ``SQL_PROFILING`` is set, or per request
+    via an ``X-SQL-Profile`` request header on debug builds. The full
+    profile is kept for ``/api/debug/sql-profiles``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _enabled(self, scope: Scope) -> bool:
+        if settings.SQL_PROFILING:
+            return True
+        return settings.debug and "x-sql-profile" in Headers(scope=scope)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(scope["method"], scope["path"])
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-SQL-Profile"] = profile.summary_header()
+                headers.append("Server-Timing", f"db;dur={profile.total_ms}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            finish_profile(profile)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression for responses above a size threshold.
+
+    Responses that already carry a Content-Encoding (precompressed
+    artifacts) are passed through. Streaming responses are compressed
+    chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                # Hold the headers until we see the first body chunk
+                start_message = message
+                return
+            if message_type != "http.response.body" or start_message is None:
+                if compressor is not None and message_type == "http.response.body":
+                    more_body = message.get("more_body", False)
+                    body = compressor.compress(message.get("body", b""))
+                    if not more_body:
+                        body += compressor.flush()
+                    message = {"type": message_type, "body": body, "more_body": more_body}
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if (
+                "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            compressor = StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+            if more_body:
+                del headers["Content-Length"]
+                await send(start)
+                await send({"type": message_type, "body": compressor.compress(body), "more_body": True})
+            else:
+                body = compressor.compress(body) + compressor.flush()
+                compressor = None
+                headers["Content-Length"] = str(len(body))
+                await send(start)
+                await send({"type": message_type, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,66 @@
+"""Run Alembic migrations from the application.
+
+The schema used to come from ``Base.metadata.create_all``. Databases created
+that way have the baseline tables but no ``alembic_version`` table, so they
+are stamped at the baseline revision before upgrading.
+
+Every worker runs the upgrade at startup, so it holds a lock for the whole
+check-and-upgrade: a PostgreSQL advisory lock, or for SQLite a file lock
+next to the database. Workers that wait find the schema current and do
+nothing.
+"""
+import os
+from contextlib import contextmanager
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASELINE_REVISION = "0001"
+# Arbitrary, shared by every process migrating the same database
+MIGRATION_LOCK_ID = 7206413
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    # Keep the application's logging configuration
+    config.attributes["configure_logger"] = False
+    return config
+
+
+@contextmanager
+def migration_lock(connection: Connection):
+    """Serialize migrations across processes (a no-op for in-memory SQLite)."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.rollback()
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+    elif dialect == "sqlite" and connection.engine.url.database not in (None, "", ":memory:"):
+        import fcntl
+
+        with open(connection.engine.url.database + ".migrate.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    else:
+        yield
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    config = alembic_config()
+    with engine.connect() as connection, migration_lock(connection):
+        tables = inspect(connection).get_table_names()
+        connection.commit()
+        config.attributes["connection"] = connection
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
@@ -0,0 +1,96 @@
+"""Per-request SQL profiling.
+
+When profiling is active for a request, the engine hooks in app.database
+record every statement with the shape of its parameters (types only, never
+values) and its duration. At the end of the request statements that ran
+repeatedly are reported as likely N+1 patterns.
+"""
+import logging
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def parameters_shape(parameters: Any) -> str:
+    """Describe bound parameters without leaking their values."""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in sorted(parameters.items())) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany
+            return f"{len(parameters)} x {parameters_shape(parameters[0])}"
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+class QueryProfile:
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.queries: List[Dict[str, Any]] = []
+
+    def record(self, statement: str, parameters: Any, duration: float) -> None:
+        self.queries.append({
+            "statement": statement,
+            "parameters": parameters_shape(parameters),
+            "duration_ms": round(duration * 1000, 3),
+        })
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(q["duration_ms"] for q in self.queries), 3)
+
+    def repeated_statements(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Statements executed at least ``threshold`` times, i.e. likely N+1 loads."""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        counts = Counter(q["statement"] for q in self.queries)
+        return {statement: n for statement, n in counts.items() if n >= threshold}
+
+    def summary_header(self) -> str:
+        return f"statements={len(self.queries)}; total_ms={self.total_ms}; n_plus_one={len(self.repeated_statements())}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "statements": len(self.queries),
+            "total_ms": self.total_ms,
+            "n_plus_one": [
+                {"statement": statement, "count": count}
+                for statement, count in self.repeated_statements().items()
+            ],
+            "queries": self.queries,
+        }
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_profile", default=None)
+
+_recent_profiles: Deque[Dict[str, Any]] = deque(maxlen=50)
+_recent_lock = threading.Lock()
+
+
+def finish_profile(profile: QueryProfile) -> None:
+    """Log N+1 suspects and keep the profile for the debug endpoint."""
+    for statement, count in profile.repeated_statements().items():
+        logger.warning(
+            "Possible N+1 in %s %s: statement ran %d times: %s",
+            profile.method, profile.path, count, statement[:200],
+        )
+    with _recent_lock:
+        _recent_profiles.append(profile.to_dict())
+
+
+def recent_profiles() -> List[Dict[str, Any]]:
+    with _recent_lock:
+        return list(reversed(_recent_profiles))
+
+
+def log_slow_query(statement: str, parameters: Any, duration: float) -> None:
+    logger.warning(
+        "Slow query (%.1f ms, params %s): %s",
+        duration * 1000, parameters_shape(parameters), statement[:500],
+    )
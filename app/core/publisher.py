@@ -0,0 +1,124 @@
+"""Scheduled publishing.
+
+A draft with a ``publish_at`` is released by the publisher once that time
+has passed. Each tick flips every due post in one UPDATE ... RETURNING,
+driven by the partial index on publish_at (only scheduled drafts have
+one), then does what publishing by hand does for exactly those posts:
+followers' timelines, author stats, the live feed, narration and related
+posts. The post's created_at becomes its scheduled time, so it lands at
+the top of the feeds when it is released rather than when it was written.
+
+The loop runs in every API worker (and in ai_scheduler.py). Workers may
+race for the same posts; the UPDATE only flips rows still unpublished and
+each worker handles just the rows it flipped.
+"""
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, joinedload
+from app.core.author_stats import post_published
+from app.core.compression import artifact_cache
+from app.core.config import settings
+from app.core.events import publish_post
+from app.core.metrics import REGISTRY
+from app.core.related import schedule_related_refresh
+from app.core.timeline import fan_out_post
+from app.core.tts import request_post_audio, schedule_post_audio
+from app.database import SessionLocal
+from app.models import Post
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_POSTS_PUBLISHED = REGISTRY.counter("scheduled_posts_published_total", "Scheduled posts released")
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC; convert client-supplied aware ones."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def publish_due_posts(db: Session, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[int]:
+    """Release up to limit posts whose publish_at has passed; returns their ids."""
+    now = now or datetime.utcnow()
+    due = select(Post.id).where(Post.publish_at.isnot(None), Post.publish_at <= now).order_by(
+        Post.publish_at
+    ).limit(limit or settings.PUBLISHER_BATCH_SIZE)
+    post_ids = db.execute(
+        update(Post)
+        .where(Post.id.in_(due.scalar_subquery()), Post.published == 0)
+        .values(published=1, created_at=Post.publish_at, updated_at=now, publish_at=None)
+        .returning(Post.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if not post_ids:
+        db.rollback()
+        return []
+
+    posts = db.query(Post).options(joinedload(Post.author)).filter(Post.id.in_(post_ids)).order_by(Post.created_at).all()
+    audio = []
+    for post in posts:
+        fan_out_post(db, post)
+        post_published(db, post)
+        if request_post_audio(post):
+            audio.append(post.id)
+    db.commit()
+
+    for post in posts:
+        artifact_cache.invalidate(("post", post.id))
+        publish_post(post)
+        schedule_related_refresh(post.id)
+    for post_id in audio:
+        schedule_post_audio(post_id)
+    SCHEDULED_POSTS_PUBLISHED.inc(len(posts))
+    logger.info("Published %s scheduled posts", len(posts), extra={"post_ids": post_ids})
+    return post_ids
+
+
+def run_publisher_tick() -> int:
+    """Release everything due, a batch per transaction; returns the count."""
+    total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            published = len(publish_due_posts(db))
+            total += published
+            if published < settings.PUBLISHER_BATCH_SIZE:
+                return total
+    except Exception:
+        logger.exception("Publishing scheduled posts failed")
+        db.rollback()
+        return total
+    finally:
+        db.close()
+
+
+def _loop() -> None:
+    # Catch up on anything that fell due while no worker was running; in
+    # this thread, so startup doesn't wait on a backlog
+    run_publisher_tick()
+    while not _stop.wait(settings.PUBLISHER_INTERVAL_SECONDS):
+        run_publisher_tick()
+
+
+def start_publisher() -> None:
+    global _thread
+    if not settings.PUBLISHER_ENABLED or _thread is not None:
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="publisher", daemon=True)
+    _thread.start()
+
+
+def stop_publisher() -> None:
+    global _thread
+    if _thread is not None:
+        _stop.set()
+        _thread.join()
+        _thread = None
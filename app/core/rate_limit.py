@@ -0,0 +1,187 @@
+"""Token-bucket rate limiting for write and login endpoints.
+
+Each policy is "N/period": a bucket of N tokens that refills at N per
+period, so a client may burst N requests and then sustains N per period.
+Buckets are keyed by policy and by the caller's user id (from the bearer
+token, without a DB lookup) or IP address; the "global" scope shares one
+bucket between all callers.
+
+Two backends, both O(1) per check:
+
+- ``memory``: per process, fine for a single worker;
+- ``redis``: one atomic Lua script per check, shared by every worker
+  (needs the optional ``redis`` package).
+
+Rejected requests get 429 with Retry-After.
+"""
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+from fastapi import HTTPException, Request
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.security import bearer_token_subject
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # only needed for RATE_LIMIT_BACKEND=redis
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = REGISTRY.counter("rate_limited_requests_total", "Requests rejected with 429", ["policy"])
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Rate(NamedTuple):
+    capacity: float
+    per_second: float
+
+
+@lru_cache(maxsize=None)
+def parse_rate(value: str) -> Rate:
+    """'10/minute' -> Rate(capacity=10, per_second=10 / 60)."""
+    count, _, period = value.partition("/")
+    seconds = PERIODS.get(period.strip().rstrip("s"))
+    if seconds is None or not count.strip().isdigit() or int(count) <= 0:
+        raise ValueError(f"invalid rate {value!r}, expected e.g. '10/minute'")
+    return Rate(float(count), int(count) / seconds)
+
+
+class Backend(ABC):
+    @abstractmethod
+    async def take(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until one is available)."""
+
+
+class MemoryBackend(Backend):
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (rate.capacity, now))
+            tokens = min(rate.capacity, tokens + (now - updated) * rate.per_second)
+            if tokens >= 1:
+                allowed, retry_after = True, 0.0
+                tokens -= 1
+            else:
+                allowed, retry_after = False, (1 - tokens) / rate.per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Least recently seen buckets go first; a forgotten bucket only
+            # means that caller starts again with a full one
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+# KEYS[1] bucket; ARGV capacity, tokens per second. Uses the server clock so
+# workers with skewed clocks agree.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBackend(Backend):
+    def __init__(self, url: str):
+        if redis_asyncio is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the redis package (pip install redis)")
+        self._client = redis_asyncio.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = await self._script(keys=[f"ratelimit:{key}"], args=[rate.capacity, rate.per_second])
+        except Exception:
+            # Fail open: an unavailable limiter must not take the API down
+            logger.warning("Rate limit backend unavailable, allowing request", exc_info=True)
+            return True, 0.0
+        return bool(allowed), float(retry_after)
+
+
+class Policy(NamedTuple):
+    setting: str  # name of the Settings field holding the rate
+    scope: str  # "user" (falls back to IP), "ip" or "global"
+
+
+POLICIES: Dict[str, Policy] = {
+    "login": Policy("RATE_LIMIT_LOGIN", "ip"),
+    "create_post": Policy("RATE_LIMIT_CREATE_POST", "user"),
+    "create_comment": Policy("RATE_LIMIT_CREATE_COMMENT", "user"),
+    "ai_bot": Policy("RATE_LIMIT_AI_BOT", "global"),
+}
+
+_backend: Optional[Backend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> Backend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if settings.RATE_LIMIT_BACKEND == "redis":
+                _backend = RedisBackend(settings.REDIS_URL)
+            else:
+                _backend = MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+        return _backend
+
+
+def client_key(request: Request, scope: str) -> str:
+    if scope == "global":
+        return "global"
+    if scope == "user":
+        subject = bearer_token_subject(request)
+        if subject is not None:
+            return f"user:{subject}"
+    # The caller's address: deployments run uvicorn with --proxy-headers
+    # (render.yaml), which sets request.client from X-Forwarded-For. Without
+    # it every caller behind the proxy would share one bucket.
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limit(name: str) -> Callable:
+    """Dependency enforcing the named policy, e.g. ``Depends(rate_limit("create_comment"))``."""
+    policy = POLICIES[name]
+
+    async def check(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        rate = parse_rate(getattr(settings, policy.setting))
+        allowed, retry_after = await get_backend().take(f"{name}:{client_key(request, policy.scope)}", rate)
+        if not allowed:
+            RATE_LIMITED.inc(policy=name)
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, slow down",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return check
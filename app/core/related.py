@@ -0,0 +1,365 @@
+"""Related posts from precomputed TF-IDF similarity.
+
+Posts are vectorized as TF-IDF over hashed character 3- and 4-grams, which
+needs no tokenizer and works the same for Devanagari, English and the mix
+of both. Each vector keeps only its RELATED_FEATURES_PER_POST heaviest
+n-grams, so the matrix stays sparse and cheap to multiply. The
+RELATED_POSTS_K nearest neighbours of every post are stored in
+``related_posts``, and the endpoint reads them with one indexed query.
+
+``rebuild_related`` recomputes everything (IDF weights included) and only
+runs offline: ``python -m app.core.related``. When a post is published or
+edited, ``schedule_related_refresh`` re-scores just that post with the
+stored IDF weights against the vectors of the RELATED_REFRESH_WINDOW most
+recent posts, and inserts it into the lists of the posts it now ranks for.
+Older posts meet it at the next rebuild. Until a rebuild has stored an
+index, refreshes do nothing. numpy and scipy are only imported by the
+jobs, never at API startup.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import Post, PostVector, RelatedIndex, RelatedPost
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZES = (3, 4)
+# Rows of the similarity matrix computed per sparse product
+BLOCK_ROWS = 1024
+# Posts whose lists are checked when one post is refreshed
+REFRESH_CANDIDATES = 200
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending: Set[Future] = set()
+_queued: Set[int] = set()
+_queued_lock = threading.Lock()
+
+
+def post_document(title: str, subtitle: Optional[str], content: str) -> str:
+    # The title is repeated so it counts for about as much as a paragraph
+    text = " ".join((title, title, subtitle or "", content[:settings.RELATED_MAX_CHARS]))
+    return " " + " ".join(text.lower().split()) + " "
+
+
+def ngram_counts(document: str):
+    """(feature ids, counts) of the hashed character n-grams of a document."""
+    import numpy as np
+
+    codes = np.frombuffer(document.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    hashes = []
+    for n in NGRAM_SIZES:
+        if len(codes) < n:
+            continue
+        h = np.full(len(codes) - n + 1, n, dtype=np.uint64)
+        for i in range(n):
+            h = h * np.uint64(1000003) + codes[i:len(codes) - n + 1 + i]
+        hashes.append(h)
+    if not hashes:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    # Fibonacci hashing: the top bits of a multiplicative hash
+    h = np.concatenate(hashes) * np.uint64(0x9E3779B97F4A7C15)
+    features, counts = np.unique(h >> np.uint64(64 - settings.RELATED_HASH_BITS), return_counts=True)
+    return features.astype(np.int32), counts.astype(np.float32)
+
+
+def weigh(features, counts, idf):
+    """Sublinear TF times IDF, pruned to the heaviest features, L2-normalized."""
+    import numpy as np
+
+    weights = (1 + np.log(counts)) * idf[features]
+    keep = settings.RELATED_FEATURES_PER_POST
+    if len(weights) > keep:
+        top = np.argpartition(weights, -keep)[-keep:]
+        features, weights = features[top], weights[top]
+    order = np.argsort(features)
+    features, weights = features[order], weights[order]
+    norm = np.linalg.norm(weights)
+    return features, (weights / norm if norm else weights).astype(np.float32)
+
+
+def _matrix(rows: List[Tuple], size: int):
+    """CSR matrix from (features, weights) pairs."""
+    import numpy as np
+    from scipy import sparse
+
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(features) for features, _ in rows])
+    indices = np.concatenate([features for features, _ in rows]) if rows else np.zeros(0, dtype=np.int32)
+    data = np.concatenate([weights for _, weights in rows]) if rows else np.zeros(0, dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), size))
+
+
+def _top_k(row_ids, row_scores, k: int, exclude: int) -> List[Tuple[int, float]]:
+    import numpy as np
+
+    mask = row_ids != exclude
+    row_ids, row_scores = row_ids[mask], row_scores[mask]
+    if len(row_scores) > k:
+        top = np.argpartition(row_scores, -k)[-k:]
+        row_ids, row_scores = row_ids[top], row_scores[top]
+    order = np.argsort(-row_scores, kind="stable")
+    return [(int(row_ids[i]), float(row_scores[i])) for i in order]
+
+
+def _published_texts(db: Session, post_ids: Optional[Iterable[int]] = None):
+    query = select(Post.id, Post.title, Post.subtitle, Post.content).where(Post.published == 1).order_by(Post.id)
+    if post_ids is not None:
+        query = query.where(Post.id.in_(list(post_ids)))
+    return db.execute(query.execution_options(yield_per=1000))
+
+
+def rebuild_related(db: Session) -> int:
+    """Recompute every vector, the IDF weights and all related lists; returns the post count."""
+    import numpy as np
+
+    size = 1 << settings.RELATED_HASH_BITS
+    k = settings.RELATED_POSTS_K
+    post_ids, counted = [], []
+    document_frequency = np.zeros(size, dtype=np.int64)
+    for post_id, title, subtitle, content in _published_texts(db):
+        features, counts = ngram_counts(post_document(title, subtitle, content))
+        document_frequency[features] += 1
+        post_ids.append(post_id)
+        counted.append((features, counts))
+    # Don't hold a read transaction (a lock, on SQLite) during the maths
+    db.rollback()
+    # Smoothed IDF, as in scikit-learn
+    idf = (np.log((1 + len(post_ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+    vectors = [weigh(features, counts, idf) for features, counts in counted]
+    del counted
+
+    matrix = _matrix(vectors, size)
+    transposed = matrix.T.tocsr()
+    ids = np.asarray(post_ids, dtype=np.int64)
+    # (post_id, [(related_post_id, score), ...]); rows are built per chunk
+    # at write time so 100k posts never become a million dicts at once
+    related: List[Tuple[int, List[Tuple[int, float]]]] = []
+    for start in range(0, len(post_ids), BLOCK_ROWS):
+        block = (matrix[start:start + BLOCK_ROWS] @ transposed).tocsr()
+        for offset in range(block.shape[0]):
+            lo, hi = block.indptr[offset], block.indptr[offset + 1]
+            post_id = post_ids[start + offset]
+            related.append((post_id, _top_k(ids[block.indices[lo:hi]], block.data[lo:hi], k, post_id)))
+
+    # Computed outside the transaction, so the swap itself is short
+    now = datetime.utcnow()
+    db.execute(delete(RelatedPost))
+    db.execute(delete(PostVector))
+    db.execute(delete(RelatedIndex))
+    db.add(RelatedIndex(built_at=now, documents=len(post_ids), idf=idf.tobytes()))
+    for start in range(0, len(related), 1000):
+        rows = [
+            {"post_id": post_id, "rank": rank, "related_post_id": related_id, "score": score}
+            for post_id, neighbours in related[start:start + 1000]
+            for rank, (related_id, score) in enumerate(neighbours)
+        ]
+        if rows:
+            db.execute(insert(RelatedPost), rows)
+    for start in range(0, len(post_ids), 1000):
+        db.execute(insert(PostVector), [
+            {"post_id": post_id, "features": features.tobytes(), "weights": weights.tobytes(), "updated_at": now}
+            for post_id, (features, weights) in zip(post_ids[start:start + 1000], vectors[start:start + 1000])
+        ])
+    db.commit()
+    return len(post_ids)
+
+
+def _insert_list(db: Session, post_id: int, neighbours: List[Tuple[int, float]]) -> None:
+    if neighbours:
+        db.execute(insert(RelatedPost), [
+            {"post_id": post_id, "rank": rank, "related_post_id": related_id, "score": score}
+            for rank, (related_id, score) in enumerate(neighbours)
+        ])
+
+
+def _load_vectors(db: Session, exclude: Set[int]):
+    """The vectors of the most recent posts, a backwards range of the primary key."""
+    import numpy as np
+
+    ids, rows = [], []
+    query = select(PostVector.post_id, PostVector.features, PostVector.weights).order_by(
+        PostVector.post_id.desc()
+    ).limit(settings.RELATED_REFRESH_WINDOW).execution_options(yield_per=5000)
+    for post_id, features, weights in db.execute(query):
+        if post_id in exclude:
+            continue
+        ids.append(post_id)
+        rows.append((np.frombuffer(features, dtype=np.int32), np.frombuffer(weights, dtype=np.float32)))
+    return np.asarray(ids, dtype=np.int64), _matrix(rows, 1 << settings.RELATED_HASH_BITS)
+
+
+def refresh_related(db: Session, post_ids: Iterable[int]) -> None:
+    """Re-score the given posts against the stored vectors and update the lists."""
+    import numpy as np
+    from scipy import sparse
+
+    post_ids = set(post_ids)
+    index = db.execute(select(RelatedIndex).order_by(RelatedIndex.id.desc()).limit(1)).scalar_one_or_none()
+    if index is None or len(np.frombuffer(index.idf, dtype=np.float32)) != 1 << settings.RELATED_HASH_BITS:
+        # No usable model yet (first run, or RELATED_HASH_BITS changed). A
+        # rebuild reads every post, which is the offline command's job.
+        logger.warning("No related-posts index; run `python -m app.core.related` to build it")
+        return
+    idf = np.frombuffer(index.idf, dtype=np.float32)
+    k = settings.RELATED_POSTS_K
+    vectors = {
+        row.id: weigh(*ngram_counts(post_document(row.title, row.subtitle, row.content)), idf)
+        for row in _published_texts(db, post_ids)
+    }
+    stored_ids, stored = _load_vectors(db, post_ids)
+    # Posts refreshed together are scored against each other too
+    ids = np.concatenate([stored_ids, np.asarray(list(vectors), dtype=np.int64)])
+    matrix = sparse.vstack([stored, _matrix(list(vectors.values()), stored.shape[1])]).tocsr()
+    now = datetime.utcnow()
+
+    for post_id in post_ids:
+        db.execute(delete(RelatedPost).where(RelatedPost.post_id == post_id))
+        db.execute(delete(PostVector).where(PostVector.post_id == post_id))
+        if post_id not in vectors:
+            # Unpublished or deleted since it was queued
+            continue
+        features, weights = vectors[post_id]
+        db.add(PostVector(post_id=post_id, features=features.tobytes(), weights=weights.tobytes(), updated_at=now))
+        scores = (matrix @ _matrix([(features, weights)], matrix.shape[1]).T).toarray().ravel()
+        nonzero = np.flatnonzero(scores)
+        neighbours = _top_k(ids[nonzero], scores[nonzero], k, post_id)
+        _insert_list(db, post_id, neighbours)
+
+        # The new post may now rank among other posts' neighbours
+        candidates = _top_k(ids[nonzero], scores[nonzero], REFRESH_CANDIDATES, post_id)
+        candidate_scores: Dict[int, float] = dict(candidates)
+        current = db.execute(
+            select(RelatedPost.post_id, RelatedPost.related_post_id, RelatedPost.score)
+            .where(RelatedPost.post_id.in_(list(candidate_scores)))
+        ).all()
+        lists: Dict[int, List[Tuple[int, float]]] = {candidate: [] for candidate in candidate_scores}
+        for owner, related_id, score in current:
+            if related_id != post_id:
+                lists[owner].append((related_id, score))
+        for owner, entries in lists.items():
+            score = candidate_scores[owner]
+            if len(entries) >= k and score <= min(s for _, s in entries):
+                continue
+            entries = sorted(entries + [(post_id, score)], key=lambda entry: -entry[1])[:k]
+            db.execute(delete(RelatedPost).where(RelatedPost.post_id == owner))
+            _insert_list(db, owner, entries)
+
+    removed = post_ids - set(vectors)
+    if removed:
+        _backfill_lists(db, removed, ids, matrix, k)
+    db.commit()
+
+
+def _backfill_lists(db: Session, removed: Set[int], ids, matrix, k: int) -> None:
+    """Drop posts that left (unpublished, deleted) from other posts' lists.
+
+    Each affected list keeps its remaining entries and is topped up to k from
+    the refresh window, so it doesn't shrink until the next rebuild.
+    """
+    import numpy as np
+
+    lists: Dict[int, List[Tuple[int, float]]] = {}
+    for owner, related_id, score in db.execute(
+        select(RelatedPost.post_id, RelatedPost.related_post_id, RelatedPost.score).where(
+            RelatedPost.post_id.in_(
+                select(RelatedPost.post_id).where(RelatedPost.related_post_id.in_(list(removed)))
+            )
+        )
+    ):
+        entries = lists.setdefault(owner, [])
+        if related_id not in removed:
+            entries.append((related_id, score))
+    if not lists:
+        return
+    owners = db.execute(
+        select(PostVector.post_id, PostVector.features, PostVector.weights).where(PostVector.post_id.in_(list(lists)))
+    ).all()
+    for owner, features, weights in owners:
+        vector = (np.frombuffer(features, dtype=np.int32), np.frombuffer(weights, dtype=np.float32))
+        scores = (matrix @ _matrix([vector], matrix.shape[1]).T).toarray().ravel()
+        nonzero = np.flatnonzero(scores)
+        merged = dict(_top_k(ids[nonzero], scores[nonzero], k, owner))
+        merged.update(lists[owner])
+        entries = sorted(merged.items(), key=lambda entry: -entry[1])[:k]
+        db.execute(delete(RelatedPost).where(RelatedPost.post_id == owner))
+        _insert_list(db, owner, entries)
+    # Owners without a stored vector just lose the entries
+    db.execute(delete(RelatedPost).where(RelatedPost.related_post_id.in_(list(removed))))
+
+
+def _run_refresh() -> None:
+    with _queued_lock:
+        post_ids = set(_queued)
+        _queued.clear()
+    if not post_ids:
+        return
+    db = SessionLocal()
+    try:
+        refresh_related(db, post_ids)
+    except Exception:
+        logger.exception("Refreshing related posts failed for %s", sorted(post_ids))
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="related-posts")
+        return _executor
+
+
+def schedule_related_refresh(post_id: int) -> Optional[Future]:
+    """Queue a post for re-scoring; posts queued together share one pass over the vectors."""
+    if not settings.RELATED_POSTS_ENABLED:
+        return None
+    with _queued_lock:
+        first = not _queued
+        _queued.add(post_id)
+    if not first:
+        return None
+    future = _get_executor().submit(_run_refresh)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    return future
+
+
+def wait_for_related(timeout: Optional[float] = None) -> None:
+    """Block until queued refreshes finish (tests, shutdown)."""
+    wait(list(_pending), timeout=timeout)
+
+
+def shutdown_related_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def main() -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Rebuild the related-posts table")
+    parser.parse_args()
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        count = rebuild_related(db)
+    finally:
+        db.close()
+    print(f"Related posts rebuilt for {count} posts in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Post revision history stored as periodic snapshots plus deltas.
+
+Every change to a post's title, subtitle or content records a revision.
+Most revisions store only a delta against the previous one; every
+REVISION_SNAPSHOT_INTERVAL-th revision (and any whose delta would not be
+much smaller than the text) stores the full content. Rebuilding a revision
+therefore applies at most REVISION_SNAPSHOT_INTERVAL - 1 deltas.
+
+A delta is a JSON list applied left to right over the old text: a positive
+int keeps that many characters, a negative int deletes that many, and a
+string inserts itself. Lengths count Unicode code points and must cover the
+old text exactly, e.g. ``[120, -5, "नया", 300]``. Clients send the same
+format to PATCH a post's content.
+"""
+import json
+import re
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple, Union
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Post, PostRevision
+
+Delta = List[Union[int, str]]
+# Title, subtitle, content
+PostText = Tuple[str, Optional[str], str]
+
+TOKEN = re.compile(r"\s+|[^\s]+")
+
+
+class InvalidDelta(ValueError):
+    pass
+
+
+def make_delta(old: str, new: str) -> Delta:
+    """A compact delta turning old into new, diffed word by word."""
+    a, b = TOKEN.findall(old), TOKEN.findall(new)
+    delta: Delta = []
+
+    def push(op):
+        # Merge runs of the same kind of op
+        if delta and type(delta[-1]) is type(op) and (isinstance(op, str) or (delta[-1] > 0) == (op > 0)):
+            delta[-1] += op
+        else:
+            delta.append(op)
+
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            push(sum(len(token) for token in a[i1:i2]))
+            continue
+        if i2 > i1:
+            push(-sum(len(token) for token in a[i1:i2]))
+        if j2 > j1:
+            push("".join(b[j1:j2]))
+    return delta
+
+
+def apply_delta(old: str, delta: Delta) -> str:
+    parts = []
+    position = 0
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        elif isinstance(op, int) and not isinstance(op, bool) and op != 0:
+            end = position + abs(op)
+            if end > len(old):
+                raise InvalidDelta("delta runs past the end of the text")
+            if op > 0:
+                parts.append(old[position:end])
+            position = end
+        else:
+            raise InvalidDelta(f"invalid delta op: {op!r}")
+    if position != len(old):
+        raise InvalidDelta(f"delta covers {position} of {len(old)} characters")
+    return "".join(parts)
+
+
+def post_text(post: Post) -> PostText:
+    return post.title, post.subtitle, post.content
+
+
+def record_revision(db: Session, post: Post, editor_id: Optional[int], previous: Optional[PostText] = None) -> PostRevision:
+    """Record the post's current text as its next revision.
+
+    previous is the text before this change; posts created before revision
+    history existed get it recorded as their first revision.
+    """
+    db.flush()
+    if not post.revision and previous is not None:
+        db.add(PostRevision(
+            post_id=post.id,
+            number=1,
+            title=previous[0],
+            subtitle=previous[1],
+            snapshot=previous[2],
+            content_length=len(previous[2]),
+        ))
+        post.revision = 1
+    number = (post.revision or 0) + 1
+    revision = PostRevision(
+        post_id=post.id,
+        number=number,
+        title=post.title,
+        subtitle=post.subtitle,
+        content_length=len(post.content),
+        editor_id=editor_id,
+    )
+    if previous is None or number % settings.REVISION_SNAPSHOT_INTERVAL == 1:
+        revision.snapshot = post.content
+    else:
+        delta = make_delta(previous[2], post.content)
+        # Heavily rewritten text: a snapshot is about as small and ends the chain
+        if len(json.dumps(delta, ensure_ascii=False)) * 2 > len(post.content):
+            revision.snapshot = post.content
+        else:
+            revision.delta = delta
+    db.add(revision)
+    post.revision = number
+    return revision
+
+
+def revision_content(db: Session, post_id: int, number: int) -> Optional[str]:
+    """Rebuild a revision's content from the nearest snapshot at or before it."""
+    base = db.query(func.max(PostRevision.number)).filter(
+        PostRevision.post_id == post_id, PostRevision.number <= number, PostRevision.snapshot.isnot(None)
+    ).scalar()
+    if base is None:
+        return None
+    rows = db.query(PostRevision.number, PostRevision.snapshot, PostRevision.delta).filter(
+        PostRevision.post_id == post_id, PostRevision.number >= base, PostRevision.number <= number
+    ).order_by(PostRevision.number).all()
+    if rows[-1].number != number:
+        return None
+    content = rows[0].snapshot
+    for row in rows[1:]:
+        content = apply_delta(content, row.delta)
+    return content
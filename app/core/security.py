@@ -1,3 +1,6 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -5,17 +8,69 @@ from jose.exceptions import ExpiredSignatureError
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# The policy is built once; BCRYPT_ROUNDS lets tests and dev use cheap hashes
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Stored for accounts that only sign in through OAuth. It is not a valid
+# bcrypt hash, so no password ever verifies against it.
+UNUSABLE_PASSWORD = "!"
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
+def has_usable_password(hashed_password: Optional[str]) -> bool:
+    return bool(hashed_password) and not hashed_password.startswith(UNUSABLE_PASSWORD)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     # Bcrypt has a 72-byte limit, truncate if necessary
     if len(password.encode('utf-8')) > 72:
         password = password[:72]
     return pwd_context.hash(password)
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    # bcrypt releases the GIL while hashing, so threads run in parallel and a
+    # small pool caps how many cores hashing can take from request handling
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+            )
+        return _hash_executor
+
+# Every bcrypt call goes through the bounded pool: the async helpers for
+# async handlers, the blocking ones for sync code (threadpool handlers,
+# scripts), which wait for their turn rather than hash on their own thread.
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    if not has_usable_password(hashed_password):
+        return False
+    return _get_hash_executor().submit(_verify, plain_password, hashed_password).result()
+
+def get_password_hash(password: str) -> str:
+    return _get_hash_executor().submit(_hash, password).result()
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash for async handlers, run off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), _hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    if not has_usable_password(hashed_password):
+        return False
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), _verify, plain_password, hashed_password)
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False)
+            _hash_executor = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -26,6 +81,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def bearer_token_subject(request) -> Optional[str]:
+    """The ``sub`` of a valid bearer token on the request, without touching the DB.
+
+    Decoded once per request; the result is cached on request.state.
+    """
+    cached = getattr(request.state, "bearer_subject", False)
+    if cached is not False:
+        return cached
+    subject = None
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            subject = decode_access_token(authorization[7:]).get("sub")
+        except Exception:
+            subject = None
+    request.state.bearer_subject = subject
+    return subject
+
 def decode_access_token(token: str):
     # Let JWT-related exceptions propagate so callers can handle them specifically.
     payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
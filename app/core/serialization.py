@@ -0,0 +1,26 @@
+"""Fast JSON serialization for large list responses.
+
+FastAPI's generic path can validate the ORM objects into models, turn them
+back into dicts with ``jsonable_encoder`` and then run ``json.dumps``. For
+lists of posts with full content it is cheaper to validate and dump
+straight to JSON bytes inside pydantic-core with a cached TypeAdapter.
+"""
+from functools import lru_cache
+from typing import List, Sequence, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def dump_list_json(model: Type[BaseModel], items: Sequence) -> bytes:
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+def list_response(model: Type[BaseModel], items: Sequence, status_code: int = 200) -> Response:
+    """JSON response for ``items`` (ORM objects or dicts) shaped as ``List[model]``."""
+    return Response(content=dump_list_json(model, items), media_type="application/json", status_code=status_code)
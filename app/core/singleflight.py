@@ -0,0 +1,84 @@
+"""Coalescing of concurrent identical lookups ("single flight").
+
+When a post goes viral, hundreds of requests for the same slug arrive
+within milliseconds. Without coordination each one checks out a pooled
+connection and runs the same query. A SingleFlight lets the first caller
+for a key (the leader) run the lookup while every caller that arrives
+before it finishes waits for, and shares, its result. Nothing is cached:
+once the leader finishes, the next caller starts a fresh lookup.
+
+Results are shared between requests, so lookups should return immutable
+serialized data (bytes, a CompressedArtifact), never ORM objects bound to
+the leader's session.
+
+Sync callers (threadpool endpoints) use ``do``; async callers use
+``do_async``, which waits on the event loop and runs the leader's lookup in
+the threadpool, so waiting requests hold no thread. Both kinds of caller
+can share one flight.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+from app.core.metrics import REGISTRY
+
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    "singleflight_calls_total", "Coalesced lookups, by whether they ran or shared one in flight", ["lookup", "result"]
+)
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                SINGLEFLIGHT_CALLS.inc(lookup=self.name, result="shared")
+                return future, False
+            future = self._calls[key] = Future()
+        SINGLEFLIGHT_CALLS.inc(lookup=self.name, result="leader")
+        return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable, args: Tuple) -> None:
+        try:
+            result = fn(*args)
+        except BaseException as exc:
+            self._done(key, future)
+            future.set_exception(exc)
+        else:
+            self._done(key, future)
+            future.set_result(result)
+
+    def _done(self, key: Hashable, future: Future) -> None:
+        # Leave before publishing the result, so later callers start afresh
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable, *args) -> Any:
+        """Return fn(*args), sharing the result of an identical call in flight."""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn, args)
+        return future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable, *args) -> Any:
+        """Like do, but waits on the event loop and runs fn in the threadpool."""
+        future, leader = self._join(key)
+        if leader:
+            from anyio import to_thread
+
+            # Not abandoned on cancellation: followers still need the result
+            await to_thread.run_sync(self._run, key, future, fn, args)
+        # Shielded: a waiter cancelled by its client's disconnect must not
+        # cancel the shared future that every other caller is waiting on
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def forget(self) -> None:
+        """Make calls after this point start new lookups (after a write)."""
+        with self._lock:
+            self._calls.clear()
@@ -0,0 +1,87 @@
+"""Storage for uploaded media behind a small interface.
+
+Keys are content-addressed paths like ``images/ab/cdef…/original.jpg``, so
+a stored object never changes and can be cached forever. Only a local
+filesystem backend exists; an object store would implement the same four
+methods.
+"""
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from starlette.staticfiles import StaticFiles
+from app.core.config import settings
+
+
+class Storage(ABC):
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def put_file(self, key: str, path: str) -> None:
+        """Move a finished local file into storage under key."""
+
+    @abstractmethod
+    def local_path(self, key: str) -> str:
+        """A readable local path for key (downloading it first if needed)."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    def temp_dir(self) -> str:
+        """Where uploads are spooled before put_file."""
+        return tempfile.gettempdir()
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"invalid storage key: {key!r}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put_file(self, key: str, path: str) -> None:
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            # Atomic when the temp file is on the same filesystem
+            os.replace(path, target)
+        except OSError:
+            shutil.move(path, target)
+
+    def local_path(self, key: str) -> str:
+        return self._path(key)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def temp_dir(self) -> str:
+        # Spool beside the root, not inside it: everything under the root is
+        # served publicly, half-written uploads included. A sibling is on the
+        # same filesystem, so put_file is still a rename.
+        parent, name = os.path.split(self.root)
+        path = os.path.join(parent, f".{name}-tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for content-addressed keys: cache for a year."""
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+storage = LocalStorage(settings.MEDIA_ROOT, settings.MEDIA_URL)
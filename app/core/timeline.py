@@ -0,0 +1,160 @@
+"""Following feed: fan-out on write, with fan-out on read for big authors.
+
+When a post is published it is copied into ``timeline_entries`` for every
+follower of its author with one INSERT ... SELECT, so reading a timeline is
+a single index range scan instead of ``WHERE author_id IN (...)`` over all
+posts. Authors with more than FEED_FANOUT_MAX_FOLLOWERS followers (the
+satirical bot) are not fanned out: their posts are pulled at read time from
+``posts`` and merged with the materialized entries.
+
+An author whose follower count crosses the threshold gets both treatments
+for their older posts; reads dedupe by post id.
+"""
+import base64
+import heapq
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import DateTime, Integer, and_, insert, literal, or_, select
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import settings
+from app.models import Follow, Post, TimelineEntry, User
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{post_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Raises ValueError for cursors we did not issue."""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    created_at, _, post_id = raw.partition("|")
+    return datetime.fromisoformat(created_at), int(post_id)
+
+
+def fans_out(author: User) -> bool:
+    return (author.follower_count or 0) <= settings.FEED_FANOUT_MAX_FOLLOWERS
+
+
+def fan_out_post(db: Session, post: Post) -> None:
+    """Materialize a newly published post into its author's followers' timelines.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+    if not fans_out(post.author):
+        return
+    db.execute(
+        insert(TimelineEntry).from_select(
+            ["user_id", "post_id", "author_id", "created_at"],
+            select(
+                Follow.follower_id,
+                literal(post.id, Integer),
+                literal(post.author_id, Integer),
+                literal(post.created_at, DateTime),
+            ).where(Follow.followee_id == post.author_id),
+        )
+    )
+
+
+def follow(db: Session, follower: User, followee: User) -> bool:
+    """Follow followee and backfill their recent posts; False if already following."""
+    if db.get(Follow, (follower.id, followee.id)) is not None:
+        return False
+    db.add(Follow(follower_id=follower.id, followee_id=followee.id))
+    # updated_at is kept as is: a follower count is not a profile edit, and
+    # bumping it would invalidate every cached artifact of the author's posts
+    db.query(User).filter(User.id == followee.id).update(
+        {User.follower_count: User.follower_count + 1, User.updated_at: User.updated_at}, synchronize_session=False
+    )
+    if fans_out(followee):
+        recent = (
+            select(Post.id)
+            .where(Post.author_id == followee.id, Post.published == 1)
+            .order_by(Post.created_at.desc())
+            .limit(settings.FEED_BACKFILL_POSTS)
+            .scalar_subquery()
+        )
+        db.flush()
+        db.execute(
+            insert(TimelineEntry).from_select(
+                ["user_id", "post_id", "author_id", "created_at"],
+                select(literal(follower.id, Integer), Post.id, Post.author_id, Post.created_at)
+                .where(Post.id.in_(recent)),
+            )
+        )
+    return True
+
+
+def unfollow(db: Session, follower: User, followee: User) -> bool:
+    deleted = db.query(Follow).filter(
+        Follow.follower_id == follower.id, Follow.followee_id == followee.id
+    ).delete(synchronize_session=False)
+    if not deleted:
+        return False
+    db.query(User).filter(User.id == followee.id).update(
+        {User.follower_count: User.follower_count - 1, User.updated_at: User.updated_at}, synchronize_session=False
+    )
+    db.query(TimelineEntry).filter(
+        TimelineEntry.user_id == follower.id, TimelineEntry.author_id == followee.id
+    ).delete(synchronize_session=False)
+    return True
+
+
+def _before(created_at_column, id_column, cursor: Optional[Cursor]):
+    if cursor is None:
+        return True
+    created_at, post_id = cursor
+    return or_(created_at_column < created_at, and_(created_at_column == created_at, id_column < post_id))
+
+
+def read_timeline(db: Session, user: User, limit: int, cursor: Optional[Cursor] = None) -> Tuple[List[Post], Optional[str]]:
+    """One page of the following feed, newest first, and the cursor for the next page."""
+    materialized = db.execute(
+        select(TimelineEntry.created_at, TimelineEntry.post_id)
+        .where(TimelineEntry.user_id == user.id, _before(TimelineEntry.created_at, TimelineEntry.post_id, cursor))
+        .order_by(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc())
+        .limit(limit + 1)
+    ).all()
+
+    # Followed authors too big to fan out; usually none or a handful. One
+    # ordered index scan each, rather than an IN (...) that has to sort
+    pulled_authors = db.execute(
+        select(Follow.followee_id).join(User, User.id == Follow.followee_id).where(
+            Follow.follower_id == user.id, User.follower_count > settings.FEED_FANOUT_MAX_FOLLOWERS
+        )
+    ).scalars().all()
+    pulled = [
+        db.execute(
+            select(Post.created_at, Post.id)
+            .where(Post.author_id == author_id, Post.published == 1, _before(Post.created_at, Post.id, cursor))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit + 1)
+        ).all()
+        for author_id in pulled_authors
+    ]
+
+    page: List[Cursor] = []
+    seen = set()
+    for created_at, post_id in heapq.merge(materialized, *pulled, key=lambda row: (row[0], row[1]), reverse=True):
+        if post_id in seen:
+            continue
+        seen.add(post_id)
+        page.append((created_at, post_id))
+        if len(page) > limit:
+            break
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(*page[-1])
+    if not page:
+        return [], None
+    ids = [post_id for _, post_id in page]
+    posts = {
+        post.id: post
+        for post in db.query(Post).options(joinedload(Post.author)).filter(Post.id.in_(ids), Post.published == 1)
+    }
+    return [posts[post_id] for post_id in ids if post_id in posts], next_cursor
+
@@ -0,0 +1,301 @@
+"""Post audio: text-to-speech rendered per paragraph and cached by content hash.
+
+A post is read as its title, subtitle and paragraphs. Each chunk is stored
+under the hash of its text (and the provider settings that voiced it), so
+editing one paragraph re-synthesizes only that paragraph. The chunks are
+then joined into one file per post, itself keyed by the hashes of its
+chunks, and served from storage, which handles range requests and caches
+forever. Rendering runs on a small thread pool after the post is
+committed; the request never waits on the provider.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+import wave
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import List, Optional, Set
+import requests
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.storage import storage
+from app.database import SessionLocal
+from app.models import Post
+
+logger = logging.getLogger(__name__)
+
+TTS_CHUNKS = REGISTRY.counter(
+    "tts_chunks_total", "Post audio chunks, synthesized or reused from storage", ["result"]
+)
+EXTENSIONS = {"audio/mpeg": "mp3", "audio/wav": "wav"}
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending: Set[Future] = set()
+_queued: Set[int] = set()
+_queued_lock = threading.Lock()
+
+
+class TTSProvider(ABC):
+    media_type = "audio/mpeg"
+
+    @property
+    @abstractmethod
+    def cache_namespace(self) -> str:
+        """Everything besides the text that changes the audio (provider, voice)."""
+
+    @abstractmethod
+    def synthesize(self, text: str) -> bytes:
+        ...
+
+
+class StubProvider(TTSProvider):
+    """Silent WAV audio, 10ms per character; for tests and local development."""
+
+    media_type = "audio/wav"
+    cache_namespace = "stub"
+    SAMPLE_RATE = 8000
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text: str) -> bytes:
+        self.calls += 1
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(1)
+            out.setframerate(self.SAMPLE_RATE)
+            # 8-bit PCM is unsigned, 0x80 is silence
+            out.writeframes(b"\x80" * (len(text) * self.SAMPLE_RATE // 100))
+        return buffer.getvalue()
+
+
+class DesiVocalProvider(TTSProvider):
+    media_type = "audio/mpeg"
+
+    def __init__(self, api_key: str, api_url: str, voice_id: str, timeout: float):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.voice_id = voice_id
+        self.timeout = timeout
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"desivocal:{self.voice_id}"
+
+    def synthesize(self, text: str) -> bytes:
+        response = requests.post(
+            self.api_url,
+            headers={"X_API_KEY": self.api_key},
+            json={"text": text, "voice_id": self.voice_id},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        if response.headers.get("content-type", "").startswith("audio/"):
+            return response.content
+        # Otherwise the API answers with a link to the rendered file
+        body = response.json()
+        audio_url = body.get("s3_path") or body.get("url")
+        if not audio_url:
+            raise ValueError(f"TTS response has no audio: {body!r}")
+        audio = requests.get(audio_url, timeout=self.timeout)
+        audio.raise_for_status()
+        return audio.content
+
+
+_provider: Optional[TTSProvider] = None
+
+
+def get_provider() -> Optional[TTSProvider]:
+    """The configured provider, or None when post audio is off."""
+    global _provider
+    name = settings.TTS_PROVIDER or ("desivocal" if settings.DESIVOCAL_API_KEY else "")
+    if not name:
+        return None
+    if _provider is None:
+        if name == "stub":
+            _provider = StubProvider()
+        elif name == "desivocal":
+            _provider = DesiVocalProvider(
+                settings.DESIVOCAL_API_KEY,
+                settings.DESIVOCAL_API_URL,
+                settings.DESIVOCAL_VOICE_ID,
+                settings.TTS_TIMEOUT_SECONDS,
+            )
+        else:
+            raise ValueError(f"unknown TTS_PROVIDER: {name!r}")
+    return _provider
+
+
+def split_chunks(text: str, max_chars: int) -> List[str]:
+    """Paragraphs of text, with long ones packed sentence by sentence."""
+    chunks = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            chunks.append(paragraph)
+            continue
+        current = ""
+        for sentence in SENTENCE_END.split(paragraph):
+            while len(sentence) > max_chars:
+                # A single overlong sentence: cut at the last space that fits
+                cut = sentence.rfind(" ", 0, max_chars + 1)
+                cut = cut if cut > 0 else max_chars
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def post_chunks(post: Post) -> List[str]:
+    parts = [post.title, post.subtitle or "", post.content]
+    return split_chunks("\n\n".join(parts), settings.TTS_MAX_CHUNK_CHARS)
+
+
+def chunk_key(provider: TTSProvider, text: str) -> str:
+    digest = hashlib.sha256(f"{provider.cache_namespace}\n{text}".encode("utf-8")).hexdigest()
+    return f"audio/chunks/{digest[:2]}/{digest}.{EXTENSIONS[provider.media_type]}"
+
+
+def post_audio_key(provider: TTSProvider, chunk_keys: List[str]) -> str:
+    digest = hashlib.sha256("\n".join(chunk_keys).encode("utf-8")).hexdigest()
+    return f"audio/posts/{digest[:2]}/{digest}.{EXTENSIONS[provider.media_type]}"
+
+
+def _put_bytes(key: str, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=storage.temp_dir(), suffix=".audio")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    storage.put_file(key, tmp)
+
+
+def join_audio(media_type: str, paths: List[str]) -> bytes:
+    if media_type == "audio/wav":
+        # One header for the whole file; assumes chunks share a format
+        output = io.BytesIO()
+        with wave.open(output, "wb") as out:
+            for i, path in enumerate(paths):
+                with wave.open(path, "rb") as part:
+                    if i == 0:
+                        out.setparams(part.getparams())
+                    out.writeframes(part.readframes(part.getnframes()))
+        return output.getvalue()
+    # MP3 is a sequence of self-contained frames, files concatenate as-is
+    data = bytearray()
+    for path in paths:
+        with open(path, "rb") as f:
+            data += f.read()
+    return bytes(data)
+
+
+def synthesize_chunks(provider: TTSProvider, chunks: List[str]) -> str:
+    """Store audio for the chunks and their concatenation; returns the joined key."""
+    keys = []
+    for text in chunks:
+        key = chunk_key(provider, text)
+        if storage.exists(key):
+            TTS_CHUNKS.inc(result="cached")
+        else:
+            _put_bytes(key, provider.synthesize(text))
+            TTS_CHUNKS.inc(result="synthesized")
+        keys.append(key)
+    joined = post_audio_key(provider, keys)
+    if not storage.exists(joined):
+        _put_bytes(joined, join_audio(provider.media_type, [storage.local_path(key) for key in keys]))
+    return joined
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.TTS_WORKERS, thread_name_prefix="post-audio")
+        return _executor
+
+
+def request_post_audio(post: Post) -> bool:
+    """Mark a post's audio pending before its commit; False when audio is off.
+
+    Call schedule_post_audio with the id once the post is committed.
+    """
+    if get_provider() is None:
+        return False
+    post.audio_status = "pending"
+    return True
+
+
+def schedule_post_audio(post_id: int) -> Optional[Future]:
+    if get_provider() is None:
+        return None
+    with _queued_lock:
+        if post_id in _queued:
+            # The queued job reads the post when it starts, so it covers this edit
+            return None
+        _queued.add(post_id)
+    future = _get_executor().submit(render_post_audio, post_id)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    return future
+
+
+def wait_for_audio(timeout: Optional[float] = None) -> None:
+    """Block until queued audio jobs finish (tests, shutdown)."""
+    wait(list(_pending), timeout=timeout)
+
+
+def shutdown_audio_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def render_post_audio(post_id: int) -> None:
+    with _queued_lock:
+        _queued.discard(post_id)
+    provider = get_provider()
+    db = SessionLocal()
+    try:
+        post = db.get(Post, post_id)
+        if post is None or not post.published or provider is None:
+            return
+        chunks = post_chunks(post)
+        db.rollback()  # don't hold a transaction open while the provider works
+        try:
+            key = synthesize_chunks(provider, chunks)
+        except Exception:
+            logger.exception("Rendering audio failed for post %s", post_id)
+            post = db.get(Post, post_id)
+            # An edit meanwhile queued a newer render; leave it pending
+            if post is not None and post_chunks(post) == chunks:
+                post.audio_status = "failed"
+                db.commit()
+            return
+        post = db.get(Post, post_id)
+        if post is None or post_chunks(post) != chunks:
+            # Edited meanwhile; the edit queued another render
+            return
+        post.audio_url = storage.url(key)
+        post.audio_status = "ready"
+        # updated_at changes too, which retires cached post responses
+        db.commit()
+    finally:
+        db.close()
@@ -1,20 +1,262 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
+from starlette.requests import Request
 from app.core.config import settings
+from app.core.metrics import REGISTRY, current_request_stats
+from app.core.profiling import current_profile, log_slow_query
+from app.core.security import bearer_token_subject
 
-# Configure connection args based on database type
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = REGISTRY.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT",
+    ["pool"],
+)
+POOL_IN_USE = REGISTRY.gauge("db_pool_connections_in_use", "Connections currently checked out", ["pool"])
+POOL_OVERFLOW = REGISTRY.gauge("db_pool_overflow", "Connections open beyond pool_size", ["pool"])
+POOL_SIZE = REGISTRY.gauge("db_pool_size", "Configured pool size", ["pool"])
+POOL_IN_USE_PEAK = REGISTRY.gauge(
+    "db_pool_connections_in_use_peak", "Highest number of connections checked out at once", ["pool"]
+)
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args=connect_args,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=300,  # Recycle connections after 5 minutes
+DB_STATEMENT_DURATION = REGISTRY.histogram(
+    "db_statement_duration_seconds",
+    "Duration of individual SQL statements",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
 )
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc(pool=self.logging_name)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, pool=self.logging_name)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite://"))
+
+
+def _enforce_sqlite_foreign_keys(engine: Engine) -> None:
+    # SQLite ignores foreign keys, ON DELETE CASCADE included, unless enabled
+    # on each connection
+    @event.listens_for(engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def _ping_idle_connections(engine: Engine) -> None:
+    idle_seconds = settings.DB_PRE_PING_IDLE_SECONDS
+
+    @event.listens_for(engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError()
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+
+def _instrument_pool(engine: Engine, name: str) -> None:
+    # Read through engine.pool so the gauges follow pool recreation on dispose()
+    POOL_SIZE.set_function(lambda: engine.pool.size(), pool=name)
+    POOL_IN_USE.set_function(lambda: engine.pool.checkedout(), pool=name)
+    POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0), pool=name)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        in_use = engine.pool.checkedout()
+        if in_use > POOL_IN_USE_PEAK.value(pool=name):
+            POOL_IN_USE_PEAK.set(in_use, pool=name)
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+
+def _instrument_statements(engine: Engine, name: str) -> None:
+    slow_seconds = settings.SQL_SLOW_QUERY_MS / 1000
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_STATEMENT_DURATION.observe(elapsed, pool=name)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+        profile = current_profile.get()
+        if profile is not None:
+            profile.record(statement, parameters, elapsed)
+        if slow_seconds and elapsed >= slow_seconds:
+            log_slow_query(statement, parameters, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def discard_start(context):
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+
+def create_db_engine(url: str, name: str = "primary") -> Engine:
+    """Build an engine with the pool configured from settings."""
+    # Configure connection args based on database type
+    connect_args = {}
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+
+    options = {"connect_args": connect_args}
+    if settings.DB_POOL_MODE == "null":
+        # PgBouncer (transaction pooling) already pools server connections
+        options["poolclass"] = NullPool
+    elif not _is_memory_sqlite(url):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name=name,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_PRE_PING == "always",
+        )
+
+    engine = create_engine(url, **options)
+    if url.startswith("sqlite"):
+        _enforce_sqlite_foreign_keys(engine)
+    _instrument_statements(engine, name)
+    if isinstance(engine.pool, QueuePool):
+        if settings.DB_PRE_PING == "idle":
+            _ping_idle_connections(engine)
+        _instrument_pool(engine, name)
+    return engine
+
+
+class ReplicaRouter:
+    """Round-robin read routing with health tracking and read-your-writes.
+
+    Replicas that fail are skipped for ``retry_seconds`` and probed again on
+    the next pick after that. Users who wrote within ``sticky_seconds`` read
+    from the primary so they never see replication lag on their own changes.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], sticky_seconds: float, retry_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._down_until: Dict[Engine, float] = {}
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        for replica in replicas:
+            self._watch(replica)
+
+    def _watch(self, replica: Engine) -> None:
+        @event.listens_for(replica, "handle_error")
+        def on_error(context):
+            if context.is_disconnect or isinstance(context.original_exception, exc.OperationalError):
+                self.mark_down(replica)
+
+    def mark_down(self, replica: Engine) -> None:
+        self._down_until[replica] = time.monotonic() + self.retry_seconds
+
+    def mark_write(self, key: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._recent_writes[key] = now + self.sticky_seconds
+            if len(self._recent_writes) > 10000:
+                self._recent_writes = {k: v for k, v in self._recent_writes.items() if v > now}
+
+    def _is_sticky(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        until = self._recent_writes.get(key)
+        return until is not None and until > time.monotonic()
+
+    def _probe(self, replica: Engine) -> bool:
+        try:
+            with replica.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception:
+            self.mark_down(replica)
+            return False
+        self._down_until.pop(replica, None)
+        return True
+
+    def engine_for(self, key: Optional[str] = None) -> Engine:
+        """Pick the engine a read-only request should use."""
+        if not self.replicas or self._is_sticky(key):
+            return self.primary
+        start = next(self._counter)
+        now = time.monotonic()
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            down_until = self._down_until.get(replica)
+            if down_until is None:
+                return replica
+            if down_until <= now and self._probe(replica):
+                return replica
+        return self.primary
+
+
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+read_router = ReplicaRouter(
+    engine,
+    [create_db_engine(url, name=f"replica{i}") for i, url in enumerate(settings.read_database_urls)],
+    sticky_seconds=settings.READ_REPLICA_STICKY_SECONDS,
+    retry_seconds=settings.READ_REPLICA_RETRY_SECONDS,
+)
+
+# get_current_user stores the user id under this key in Session.info so that
+# committed writes can pin that user's reads to the primary.
+STICKY_KEY = "sticky_key"
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _remember_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_writer_to_primary(session):
+    if session.info.pop("has_writes", False) and session.info.get(STICKY_KEY):
+        read_router.mark_write(session.info[STICKY_KEY])
+
+
 Base = declarative_base()
 
 def get_db():
@@ -24,3 +266,18 @@ def get_db():
     finally:
         db.close()
 
+
+def _sticky_key(request: Request) -> Optional[str]:
+    return bearer_token_subject(request)
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints, routed to a replica when configured."""
+    if not read_router.replicas:
+        db = SessionLocal()
+    else:
+        db = SessionLocal(bind=read_router.engine_for(_sticky_key(request)))
+    try:
+        yield db
+    finally:
+        db.close()
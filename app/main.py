@@ -1,15 +1,51 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from app.api import api_router
+from app.core.accounts import resume_account_deletions, shutdown_deletion_executor
 from app.core.config import settings
-from app.database import engine, Base
+from app.core.images import shutdown_image_executor
+from app.core.logs import configure_logging, stop_logging
+from app.core.metrics import REGISTRY
+from app.core.publisher import start_publisher, stop_publisher
+from app.core.rate_limit import rate_limit
+from app.core.related import shutdown_related_executor
+from app.core.security import shutdown_hash_executor
+from app.core.storage import ImmutableStaticFiles
+from app.core.tts import shutdown_audio_executor
+from app.core.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    SecurityHeadersMiddleware,
+    SQLProfilingMiddleware,
+)
+from app.database import engine
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    # Bring the schema up to date on startup rather than at import time
+    if not settings.SKIP_SCHEMA_CHECK:
+        # Alembic is only needed here, keep it out of the import path
+        from app.core.migrations import upgrade_database
+        upgrade_database(engine)
+    resume_account_deletions()
+    start_publisher()
+    yield
+    stop_publisher()
+    shutdown_deletion_executor()
+    shutdown_image_executor()
+    shutdown_audio_executor()
+    shutdown_related_executor()
+    shutdown_hash_executor()
+    engine.dispose()
+    stop_logging()
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # Update CORS to handle dynamic Vercel URLs
 app.add_middleware(
@@ -22,85 +58,92 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-class CoopHeaderMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        try:
-            response.headers["Cross-Origin-Opener-Policy"] = "same-origin-allow-popups"
-        except Exception:
-            pass
-        return response
-
-
-class PrivateNetworkMiddleware(BaseHTTPMiddleware):
-    """Add `Access-Control-Allow-Private-Network: true` to responses when the
-    browser requested a private-network preflight via
-    `Access-Control-Request-Private-Network: true`.
-    """
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        try:
-            if request.headers.get("access-control-request-private-network"):
-                response.headers["Access-Control-Allow-Private-Network"] = "true"
-        except Exception:
-            pass
-        return response
-
-# Register ASGI middlewares so they run outside/around CORSMiddleware responses
-app.add_middleware(CoopHeaderMiddleware)
-app.add_middleware(PrivateNetworkMiddleware)
+# Runs outside/around CORSMiddleware so preflight responses get the headers too
+app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(SQLProfilingMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+# Outermost, so latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router, prefix="/api")
+# Uploaded media from local storage; keys are content hashes, so cached forever
+app.mount(settings.MEDIA_URL, ImmutableStaticFiles(directory=settings.MEDIA_ROOT, check_dir=False), name="media")
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Medium Clone API!"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+AI_BOT_TIMEOUT_SECONDS = 120
+# Held by the thread running the bot, which outlives a timed-out request:
+# runs share the bot's module state, so only one goes at a time
+_ai_bot_running = threading.Lock()
+
+# One bucket shared by all callers: every call can start a Gemini generation
+check_ai_bot_rate = rate_limit("ai_bot")
+
+def _run_ai_bot_once(bot):
+    """Run the bot unless a run is already in progress (then None)."""
+    if not _ai_bot_running.acquire(blocking=False):
+        return None
+    try:
+        return bot.run_ai_content_generator()
+    finally:
+        _ai_bot_running.release()
+
 @app.post("/api/trigger-ai-bot")
 async def trigger_ai_bot(request: Request):
-    # Require custom token header
-    token = request.headers.get("X-KAHANI-BACKGROUND-BOT-TOKEN")
-    if token != "e547365bae0244f3afd6b511581e99eb5a4c6246e83e464fafd784c52e832e93":
-        raise HTTPException(status_code=401, detail="Invalid bot token")
     """
     Endpoint to manually trigger AI bot content generation.
     Requires X-KAHANI-BACKGROUND-BOT-TOKEN header for security.
     Can be called by external cron services (e.g., cron-job.org, EasyCron)
     """
+    # Require custom token header
+    token = request.headers.get("X-KAHANI-BACKGROUND-BOT-TOKEN")
+    if token != "e547365bae0244f3afd6b511581e99eb5a4c6246e83e464fafd784c52e832e93":
+        raise HTTPException(status_code=401, detail="Invalid bot token")
+    # After the token check, so unauthenticated calls cannot drain the bucket
+    await check_ai_bot_rate(request)
     try:
-        import subprocess
-        import sys
-        from pathlib import Path
-        
-        # Use sys.path to find where the app module is
-        # The ai_content_bot.py should be in the same directory as the app folder
-        app_dir = Path(__file__).parent.parent  # This is backend/app, go up one level
-        bot_script = app_dir / "ai_content_bot.py"
-        
-        # Run the AI bot script using the same python interpreter
-        result = subprocess.run(
-            [sys.executable, str(bot_script), "test"],
-            cwd=str(app_dir),
-            capture_output=True,
-            text=True,
-            timeout=120
+        # Imported on first use so API workers don't pay for the bot at startup.
+        # Running in-process also reuses this worker's engine and pool instead
+        # of re-importing everything in a subprocess.
+        import ai_content_bot
+
+        # Same budget the subprocess had. A run that overshoots cannot be
+        # killed in-process: the response goes out and the thread finishes
+        # (or fails) on its own.
+        result = await asyncio.wait_for(
+            run_in_threadpool(_run_ai_bot_once, ai_content_bot), timeout=AI_BOT_TIMEOUT_SECONDS
         )
-        
+        if result is None:
+            raise HTTPException(status_code=409, detail="AI bot is already running")
         return {
-            "status": "success" if result.returncode == 0 else "error",
+            "status": "success" if result["published"] else "error",
             "message": "AI bot executed",
-            "returncode": result.returncode,
-            "bot_script_path": str(bot_script),
-            "bot_script_exists": bot_script.exists(),
-            "stdout": result.stdout[:1000] if result.stdout else None,
-            "stderr": result.stderr[:1000] if result.stderr else None
+            # Keys of the subprocess era; the bot's output now goes to this
+            # worker's log instead of being captured
+            "returncode": 0 if result["published"] else 1,
+            "bot_script_path": ai_content_bot.__file__,
+            "bot_script_exists": True,
+            "stdout": None,
+            "stderr": None,
+            **result
+        }
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        return {
+            "status": "error",
+            "message": f"AI bot did not finish within {AI_BOT_TIMEOUT_SECONDS} seconds",
         }
     except Exception as e:
         import traceback
@@ -1,6 +1,14 @@
 from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment
+from app.models.follow import Follow
+from app.models.timeline import TimelineEntry
+from app.models.image import Image
+from app.models.revision import PostRevision
+from app.models.related import PostVector, RelatedIndex, RelatedPost
 
-__all__ = ["User", "Post", "Comment"]
+__all__ = [
+    "User", "Post", "Comment", "Follow", "TimelineEntry", "Image", "PostRevision",
+    "PostVector", "RelatedIndex", "RelatedPost",
+]
 
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.database import Base
+
+class Follow(Base):
+    __tablename__ = "follows"
+    __table_args__ = (
+        # Fan-out on publish reads the followers of an author
+        Index("ix_follows_followee_id", "followee_id"),
+    )
+
+    follower_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    followee_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
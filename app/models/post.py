@@ -1,10 +1,23 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, JSON, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Feed, sitemap and RSS: WHERE published = ? ORDER BY created_at DESC
+        Index("ix_posts_published_created_at", "published", "created_at"),
+        # An author's posts newest first: profile pages and the following
+        # feed's fan-out-on-read path
+        Index("ix_posts_author_id_created_at", "author_id", "created_at"),
+        # The publisher's due-post lookup; only scheduled drafts have a
+        # publish_at, so the index stays as small as the queue
+        Index(
+            "ix_posts_publish_at", "publish_at",
+            sqlite_where=text("publish_at IS NOT NULL"), postgresql_where=text("publish_at IS NOT NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
@@ -12,11 +25,23 @@ class Post(Base):
     content = Column(Text, nullable=False)
     slug = Column(String, unique=True, index=True, nullable=False)
     cover_image = Column(String, nullable=True)
-    author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Uploaded cover: its variant URLs are copied here once generated, so
+    # list pages can use the thumbnail without a join
+    cover_image_id = Column(Integer, ForeignKey("images.id", ondelete="SET NULL"), nullable=True, index=True)
+    cover_images = Column(JSON, nullable=True)
+    # Narrated post (app.core.tts): pending, ready or failed, and the URL of
+    # the latest rendered audio, kept while a newer version renders
+    audio_status = Column(String, nullable=True)
+    audio_url = Column(String, nullable=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     published = Column(Integer, default=0)  # 0 = draft, 1 = published
+    # Drafts scheduled for release (app.core.publisher); cleared on publish
+    publish_at = Column(DateTime, nullable=True)
+    # Number of the latest PostRevision; 0 for posts that predate revisions
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     author = relationship("User", back_populates="posts")
-    comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
+    comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan", passive_deletes=True)
 
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, LargeBinary
+from app.database import Base
+
+class RelatedPost(Base):
+    """One of a post's precomputed nearest neighbours (app.core.related)."""
+    __tablename__ = "related_posts"
+
+    # The primary key is the read path: WHERE post_id = ? ORDER BY rank
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    related_post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+
+class PostVector(Base):
+    """A published post's pruned TF-IDF vector, kept for incremental refreshes."""
+    __tablename__ = "post_vectors"
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    # int32 feature ids and float32 weights, as raw numpy bytes
+    features = Column(LargeBinary, nullable=False)
+    weights = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+class RelatedIndex(Base):
+    """IDF weights from the last full rebuild, reused by incremental refreshes."""
+    __tablename__ = "related_index"
+
+    id = Column(Integer, primary_key=True)
+    built_at = Column(DateTime, nullable=False)
+    documents = Column(Integer, nullable=False)
+    idf = Column(LargeBinary, nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+class PostRevision(Base):
+    """One version of a post's text; see app.core.revisions for the storage scheme."""
+    __tablename__ = "post_revisions"
+    __table_args__ = (
+        # Also what a reconstruction range scans: WHERE post_id = ? AND number BETWEEN ? AND ?
+        UniqueConstraint("post_id", "number", name="uq_post_revisions_post_id_number"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    number = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    subtitle = Column(String, nullable=True)
+    # Exactly one of these: the full content, or a delta from the previous revision
+    snapshot = Column(Text, nullable=True)
+    delta = Column(JSON, nullable=True)
+    content_length = Column(Integer, nullable=False)
+    editor_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.database import Base
+
+class TimelineEntry(Base):
+    """A post materialized into a follower's timeline when it was published.
+
+    created_at and author_id are copied from the post so timeline pages and
+    unfollows never touch the posts table.
+    """
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        # Cursor pagination: WHERE user_id = ? AND (created_at, post_id) < cursor
+        Index("ix_timeline_entries_user_created", "user_id", "created_at", "post_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True, index=True)
+    author_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # The sitemap's authors: WHERE published_post_count > 0 reads only
+        # the people who have published, not every reader
+        Index("ix_users_published_post_count", "published_post_count"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -13,9 +18,24 @@ class User(Base):
     full_name = Column(String, nullable=True)
     bio = Column(Text, nullable=True)
     avatar_url = Column(String, nullable=True)
+    # Maintained on follow/unfollow; decides fan-out on write vs on read
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Profile aggregates, maintained on post and comment writes
+    # (app.core.author_stats)
+    published_post_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_received_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_published_at = Column(DateTime, nullable=True)
+    # Set when the account is scheduled for deletion (app.core.accounts);
+    # the user can no longer authenticate from then on
+    deletion_requested_at = Column(DateTime, nullable=True)
+    # Set by the worker that claimed the deletion job; a claim older than
+    # ACCOUNT_DELETION_LEASE_MINUTES is taken to be from a dead process
+    deletion_started_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
-    posts = relationship("Post", back_populates="author", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="author", cascade="all, delete-orphan")
+    # The database cascades deletes (ON DELETE CASCADE); passive_deletes
+    # keeps the ORM from loading every child row just to delete it
+    posts = relationship("Post", back_populates="author", cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship("Comment", back_populates="author", cascade="all, delete-orphan", passive_deletes=True)
 
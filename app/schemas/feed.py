@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.post import PostResponse
+
+class TimelinePage(BaseModel):
+    items: List[PostResponse]
+    # Pass back as ?cursor= for the next page; null on the last page
+    next_cursor: Optional[str] = None
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Dict, Optional
+
+class ImageResponse(BaseModel):
+    id: int
+    sha256: str
+    content_type: str
+    size_bytes: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # pending until the variants have been generated, then ready (or failed)
+    status: str
+    variants: Optional[Dict[str, str]] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
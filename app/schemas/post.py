@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from app.schemas.user import UserResponse
 
 class PostBase(BaseModel):
@@ -8,7 +8,12 @@ class PostBase(BaseModel):
     subtitle: Optional[str] = None
     content: str
     cover_image: Optional[str] = None
+    # An uploaded image (POST /api/uploads/images) to use as the cover
+    cover_image_id: Optional[int] = None
     published: int = 0
+    # A draft with publish_at is published automatically at that time (UTC
+    # when no offset is given); a time in the past publishes it right away
+    publish_at: Optional[datetime] = None
 
 class PostCreate(PostBase):
     pass
@@ -18,15 +23,45 @@ class PostUpdate(BaseModel):
     subtitle: Optional[str] = None
     content: Optional[str] = None
     cover_image: Optional[str] = None
+    cover_image_id: Optional[int] = None
     published: Optional[int] = None
+    # null cancels the schedule
+    publish_at: Optional[datetime] = None
 
 class PostResponse(PostBase):
     id: int
     slug: str
     author_id: int
     author: UserResponse
+    # thumbnail/card/full WebP and original URLs once the cover is processed
+    cover_images: Optional[Dict[str, str]] = None
+    # Narration; audio_url supports range requests
+    audio_status: Optional[str] = None
+    audio_url: Optional[str] = None
+    # Latest revision number; PATCH /content deltas are based on it
+    revision: int = 0
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+
+class PostBatchResponse(BaseModel):
+    # In request order: ids first, then slugs; a post asked for twice is listed once
+    posts: List[PostResponse]
+    missing_ids: List[int] = []
+    missing_slugs: List[str] = []
+
+class RelatedPostResponse(BaseModel):
+    """A card for the related-posts list: no content, plus the similarity score"""
+    id: int
+    title: str
+    subtitle: Optional[str] = None
+    slug: str
+    cover_image: Optional[str] = None
+    cover_images: Optional[Dict[str, str]] = None
+    author: UserResponse
+    created_at: datetime
+    score: float
+
+    model_config = ConfigDict(from_attributes=True)
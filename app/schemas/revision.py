@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict, StrictInt, StrictStr
+from datetime import datetime
+from typing import List, Optional, Union
+
+class RevisionSummary(BaseModel):
+    number: int
+    title: str
+    subtitle: Optional[str] = None
+    content_length: int
+    editor_id: Optional[int] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class RevisionResponse(RevisionSummary):
+    content: str
+
+class ContentPatch(BaseModel):
+    # The revision the delta was computed against; anything else is a conflict
+    base_revision: int
+    # Keep (positive int), delete (negative int) and insert (string) ops,
+    # see app.core.revisions
+    delta: List[Union[StrictInt, StrictStr]]
+    title: Optional[str] = None
+    subtitle: Optional[str] = None
+
+class ContentPatchResponse(BaseModel):
+    revision: int
+    content_length: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -22,6 +22,30 @@ class UserResponse(UserBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class UserPublic(BaseModel):
+    """What anyone may see about an author, e.g. on an author card"""
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    bio: Optional[str] = None
+    avatar_url: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class UserProfile(UserPublic):
+    """A public profile; the aggregates are precomputed on the users row"""
+    follower_count: int = 0
+    published_post_count: int = 0
+    comments_received_count: int = 0
+    last_published_at: Optional[datetime] = None
+
+class UserBatchResponse(BaseModel):
+    # In request order: ids first, then usernames
+    users: List[UserPublic]
+    missing_ids: List[int] = []
+    missing_usernames: List[str] = []
+
 class Token(BaseModel):
     access_token: str
     token_type: str
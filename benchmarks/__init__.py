@@ -0,0 +1 @@
+"""Performance benchmarks. Run modules with ``python -m benchmarks.<name>``."""
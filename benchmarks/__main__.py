@@ -0,0 +1,113 @@
+"""Benchmark command line.
+
+    python -m benchmarks run --driver asgi --posts 1000 --output baseline.json
+    python -m benchmarks run --driver uvicorn --output current.json
+    python -m benchmarks compare baseline.json current.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def run(args) -> int:
+    # Settings read DATABASE_URL at import time, so set it before importing the app
+    os.environ["DATABASE_URL"] = args.database_url
+    # Load tests hammer the write endpoints from one client on purpose
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    from benchmarks.seed import seed
+    from benchmarks.runner import build_scenarios, run_asgi, run_uvicorn
+    from app.core.security import create_access_token
+
+    counts = {"users": args.users, "posts": args.posts, "comments": args.comments}
+    if not args.no_seed:
+        print(f"Seeding {args.database_url} with {counts}")
+        seed(args.database_url, **counts)
+
+    scenarios = build_scenarios(counts)
+    if args.only:
+        wanted = set(args.only.split(","))
+        scenarios = [s for s in scenarios if s.name in wanted]
+    token = create_access_token({"sub": "1"})
+
+    print(f"Running {len(scenarios)} scenarios with the {args.driver} driver")
+    driver = run_asgi if args.driver == "asgi" else run_uvicorn
+    results = driver(scenarios, args.requests, args.concurrency, token)
+
+    report = {
+        "meta": {
+            "driver": args.driver,
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": args.database_url.split(":", 1)[0],
+            "seed": counts,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+def compare_command(args) -> int:
+    from benchmarks.compare import compare, load, print_report
+
+    baseline, current = load(args.baseline), load(args.current)
+    for key in ("driver", "database", "seed", "concurrency"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+    rows = compare(baseline, current, args.threshold)
+    print_report(rows)
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="seed a database and benchmark the API")
+    run_parser.add_argument("--driver", choices=["asgi", "uvicorn"], default="asgi")
+    run_parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    run_parser.add_argument("--users", type=int, default=50)
+    run_parser.add_argument("--posts", type=int, default=1000)
+    run_parser.add_argument("--comments", type=int, default=5000)
+    run_parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded database")
+    run_parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--only", help="comma-separated scenario names")
+    run_parser.add_argument("--output", default="benchmarks/results/latest.json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative change")
+    compare_parser.set_defaults(func=compare_command)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Deleting a post with 10k comments, and a prolific account.
+
+Seeds a temporary SQLite database (foreign keys enforced, as the app's
+engine does) and compares deleting a post the way the ORM cascade used to,
+loading every comment and deleting it row by row, with leaving the cascade
+to the database (passive_deletes). It then deletes an author with many
+posts and comments through the chunked account-deletion job and reports
+the longest single transaction, which is what other writers wait on.
+
+    python -m benchmarks.cascade_delete --comments 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=10000, help="comments on the deleted post")
+    parser.add_argument("--account-posts", type=int, default=2000)
+    parser.add_argument("--account-comments", type=int, default=50000, help="comments on the account's posts")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'cascade.db')}"
+    from sqlalchemy import delete, event, insert
+    from app.core.accounts import delete_account
+    from app.core.migrations import upgrade_database
+    from app.database import SessionLocal, engine
+    from app.models import Comment, Post, User
+
+    upgrade_database(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"u{i}@example.com", "username": f"u{i}", "hashed_password": "!",
+             "created_at": now, "updated_at": now}
+            for i in (1, 2)
+        ])
+
+    def seed_post(post_id: int, author_id: int, comments: int) -> None:
+        with engine.begin() as conn:
+            conn.execute(insert(Post), [{"id": post_id, "title": "T", "content": "x", "slug": f"p{post_id}",
+                                         "author_id": author_id, "published": 1, "created_at": now}])
+            if comments:
+                conn.execute(insert(Comment), [
+                    {"content": "बहुत बढ़िया!", "post_id": post_id, "author_id": 2, "created_at": now}
+                    for _ in range(comments)
+                ])
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        # An executemany runs the statement once per parameter set
+        statements.extend([statement] * (len(parameters) if executemany else 1))
+
+    def delete_post(post_id: int, load_comments: bool):
+        statements.clear()
+        tracemalloc.start()
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            post = db.get(Post, post_id)
+            if load_comments:
+                # What cascade="all, delete-orphan" without passive_deletes did
+                list(post.comments)
+            db.delete(post)
+            db.commit()
+        finally:
+            db.close()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, len(statements)
+
+    print(f"Deleting a post with {args.comments} comments")
+    for post_id, (label, load) in enumerate((("ORM-loaded cascade", True), ("database cascade", False)), start=1):
+        seed_post(post_id, 1, args.comments)
+        elapsed, peak, count = delete_post(post_id, load)
+        print(f"  {label:<20} {elapsed * 1000:9.1f} ms  peak {peak / 1e6:7.2f} MB  {count:>5} statements")
+
+    def seed_account() -> None:
+        first_post = 1000
+        with engine.begin() as conn:
+            conn.execute(insert(User), [{"id": 3, "email": "u3@example.com", "username": "u3",
+                                         "hashed_password": "!", "created_at": now, "updated_at": now}])
+            conn.execute(insert(Post), [
+                {"id": first_post + i, "title": "T", "content": "x", "slug": f"a{i}", "author_id": 3,
+                 "published": 1, "created_at": now}
+                for i in range(args.account_posts)
+            ])
+            conn.execute(insert(Comment), [
+                {"content": "!", "post_id": first_post + i % args.account_posts, "author_id": 2, "created_at": now}
+                for i in range(args.account_comments)
+            ])
+
+    print(f"Deleting an account with {args.account_posts} posts and {args.account_comments} comments")
+    seed_account()
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(delete(User).where(User.id == 3))
+    print(f"  one cascading DELETE      {(time.perf_counter() - start) * 1000:9.1f} ms in a single transaction")
+
+    seed_account()
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(time.perf_counter()))
+    start = time.perf_counter()
+    delete_account(3, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    longest = max(b - a for a, b in zip([start] + commits, commits))
+    print(f"  chunked job, batch {args.batch_size:<6} {elapsed * 1000:9.1f} ms in {len(commits)} transactions, "
+          f"longest {longest * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare two benchmark result files and flag regressions."""
+import json
+from typing import Dict, List
+
+# metric -> True when higher is worse
+METRICS = {"p50_ms": True, "p95_ms": True, "p99_ms": True, "throughput_rps": False}
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.15) -> List[Dict[str, object]]:
+    """Return one row per scenario/metric; ``regression`` marks changes beyond ``threshold``."""
+    rows = []
+    for scenario, base_stats in baseline["results"].items():
+        stats = current["results"].get(scenario)
+        if stats is None:
+            continue
+        for metric, higher_is_worse in METRICS.items():
+            before, after = base_stats[metric], stats[metric]
+            change = (after - before) / before if before else 0.0
+            worse = change > threshold if higher_is_worse else change < -threshold
+            rows.append({
+                "scenario": scenario,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regression": worse,
+            })
+        if stats["errors"] > base_stats["errors"]:
+            rows.append({
+                "scenario": scenario,
+                "metric": "errors",
+                "baseline": base_stats["errors"],
+                "current": stats["errors"],
+                "change": None,
+                "regression": True,
+            })
+    return rows
+
+
+def print_report(rows: List[Dict[str, object]]) -> None:
+    for row in rows:
+        change = "" if row["change"] is None else f"{row['change'] * 100:+7.1f}%"
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['scenario']:<20} {row['metric']:<15} {row['baseline']:>10} -> {row['current']:>10} {change:>9} {flag}")
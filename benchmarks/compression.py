@@ -0,0 +1,68 @@
+"""Bytes on the wire and CPU per request with and without compression.
+
+Seeds a temporary SQLite database, then requests the post list, a single
+post, the sitemap and the RSS feed with ``identity``, ``gzip`` and ``br``.
+For the precompressed artifacts it also shows what compressing the same
+body on every request would cost.
+
+    python -m benchmarks.compression --posts 1000 --requests 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'compression.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    from benchmarks.seed import seed
+    from fastapi.testclient import TestClient
+    from app.core.compression import available_encodings, compress
+    from app.core.config import settings
+    from app.main import app
+
+    seed(database_url, users=50, posts=args.posts, comments=0)
+    client = TestClient(app)
+    endpoints = {
+        "posts?limit=100": "/api/posts?limit=100",
+        "post by slug": "/api/posts/slug/post-1",
+        "sitemap.xml": "/api/sitemap.xml",
+        "rss.xml": "/api/rss.xml",
+    }
+    encodings = ("identity",) + available_encodings()
+
+    print(f"{'endpoint':<18} {'encoding':<9} {'wire bytes':>11} {'ratio':>7} {'cpu ms/req':>11}")
+    for name, path in endpoints.items():
+        identity_size = None
+        for encoding in encodings:
+            headers = {"Accept-Encoding": encoding}
+            with client.stream("GET", path, headers=headers) as response:  # warm the caches
+                b"".join(response.iter_raw())
+            size = 0
+            cpu_start = time.process_time()
+            for _ in range(args.requests):
+                with client.stream("GET", path, headers=headers) as response:
+                    size = len(b"".join(response.iter_raw()))
+            cpu_ms = (time.process_time() - cpu_start) / args.requests * 1000
+            identity_size = identity_size or size
+            print(f"{name:<18} {encoding:<9} {size:>11} {size / identity_size:>7.2f} {cpu_ms:>11.3f}")
+
+    print("\nCost avoided by precompression (compressing the identity body on every request):")
+    for name in ("sitemap.xml", "rss.xml", "post by slug"):
+        body = client.get(endpoints[name], headers={"Accept-Encoding": "identity"}).content
+        for encoding in available_encodings():
+            start = time.process_time()
+            for _ in range(args.requests):
+                compress(body, encoding, settings.GZIP_LEVEL, settings.BROTLI_QUALITY)
+            cpu_ms = (time.process_time() - start) / args.requests * 1000
+            print(f"{name:<18} {encoding:<9} {len(body):>11} bytes  {cpu_ms:>8.3f} cpu ms/req")
+
+
+if __name__ == "__main__":
+    main()
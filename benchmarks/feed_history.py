@@ -0,0 +1,164 @@
+"""Feed latency as history grows to two years.
+
+Seeds a temporary SQLite database with the bot posting every 5 minutes,
+regular authors posting at random and a few comments per post, extending the
+history further into the past at each checkpoint (one month, one year, two
+years by default). At each checkpoint it times the read endpoints in posts,
+comments and seo through the app: the front page and a deep page, a post by
+slug, a post's comments, the bot's paged post list, RSS and the sitemap (warm,
+and rebuilt cold). For comparison it also times the whole-table queries the
+sitemap and RSS used before they were bounded to the newest posts: the
+(count, max(updated_at)) fingerprint over every published post and the
+sitemap's load of every post.
+
+    python -m benchmarks.feed_history --days 30,365,730
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+BOT_ID = 1
+
+
+def p50_p95(values: List[float]) -> str:
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{statistics.median(ordered) * 1000:8.2f} / {p95 * 1000:8.2f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", default="30,365,730", help="history at each checkpoint, comma-separated")
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--author-posts-per-day", type=int, default=100)
+    parser.add_argument("--comments-per-post", type=int, default=3)
+    parser.add_argument("--reads", type=int, default=50)
+    args = parser.parse_args()
+    checkpoints = sorted(int(days) for days in args.days.split(","))
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'history.db')}"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # Seeding and the "before" queries are slow on purpose
+    os.environ.setdefault("SQL_SLOW_QUERY_MS", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, insert, select, text
+    from app.core.compression import artifact_cache
+    from app.core.config import settings
+    from app.core.migrations import upgrade_database
+    from app.database import SessionLocal, engine
+    from app.main import app
+    from app.models import Comment, Post, User
+    from benchmarks.seed import make_content
+
+    rng = random.Random(1)
+    upgrade_database(engine)
+    settings.SKIP_SCHEMA_CHECK = True
+    settings.PUBLISHER_ENABLED = False
+    settings.RELATED_POSTS_ENABLED = False
+    now = datetime.utcnow().replace(microsecond=0)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"u{i}@example.com", "username": f"u{i}", "hashed_password": "!",
+             "created_at": now, "updated_at": now}
+            for i in range(1, args.authors + 2)
+        ])
+    contents = [make_content(rng) for _ in range(50)]
+    next_id = 1
+
+    def seed_days(first_day: int, last_day: int) -> None:
+        """Posts and comments for the days first_day..last_day before now"""
+        nonlocal next_id
+        start, end = now - timedelta(days=last_day), now - timedelta(days=first_day)
+        times = []
+        moment = start
+        while moment < end:
+            times.append((moment, BOT_ID))
+            moment += timedelta(minutes=5)
+        span = (end - start).total_seconds()
+        times += [
+            (start + timedelta(seconds=rng.uniform(0, span)), rng.randint(2, args.authors + 1))
+            for _ in range(args.author_posts_per_day * (last_day - first_day))
+        ]
+        for chunk in range(0, len(times), 10000):
+            posts, comments = [], []
+            for created_at, author_id in times[chunk:chunk + 10000]:
+                posts.append({"id": next_id, "title": f"Post {next_id}", "content": rng.choice(contents),
+                              "slug": f"post-{next_id}", "author_id": author_id, "published": 1,
+                              "created_at": created_at, "updated_at": created_at})
+                comments += [{"content": "वाह", "post_id": next_id, "author_id": rng.randint(2, args.authors + 1),
+                              "created_at": created_at, "updated_at": created_at}
+                             for _ in range(rng.randint(0, args.comments_per_post * 2))]
+                next_id += 1
+            with engine.begin() as conn:
+                conn.execute(insert(Post), posts)
+                if comments:
+                    conn.execute(insert(Comment), comments)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE users SET published_post_count = (SELECT count(*) FROM posts WHERE author_id = users.id), "
+                "last_published_at = (SELECT max(created_at) FROM posts WHERE author_id = users.id)"
+            ))
+            conn.execute(text("ANALYZE"))
+
+    def timed(fn: Callable[[], None], reads: int) -> List[float]:
+        timings = []
+        for _ in range(reads):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    results: Dict[str, Dict[int, str]] = {}
+    seeded = 0
+    with TestClient(app) as client:
+        def get(path: str) -> None:
+            assert client.get(path).status_code == 200, path
+
+        for days in checkpoints:
+            began = time.perf_counter()
+            seed_days(seeded, days)
+            seeded = days
+            db = SessionLocal()
+            posts, comments = db.query(func.count(Post.id)).scalar(), db.query(func.count(Comment.id)).scalar()
+            print(f"{days} days: {posts} posts, {comments} comments (seeded in {time.perf_counter() - began:.0f} s)")
+
+            def row(name: str, fn: Callable[[], None], reads: int = args.reads) -> None:
+                results.setdefault(name, {})[days] = p50_p95(timed(fn, reads))
+
+            row("GET /api/posts?limit=10", lambda: get("/api/posts?limit=10"))
+            row("GET /api/posts?skip=5000", lambda: get("/api/posts?skip=5000&limit=10"))
+            row("GET /api/posts/slug/{random}", lambda: get(f"/api/posts/slug/post-{rng.randint(1, posts)}"))
+            row("GET /api/comments/post/{random}", lambda: get(f"/api/comments/post/{rng.randint(1, posts)}"))
+            row("GET /api/posts/user/1?limit=20", lambda: get(f"/api/posts/user/{BOT_ID}?limit=20"))
+            row("GET /api/rss.xml (warm)", lambda: get("/api/rss.xml"))
+            row("GET /api/sitemap.xml (warm)", lambda: get("/api/sitemap.xml"))
+
+            def cold_sitemap() -> None:
+                artifact_cache.invalidate("sitemap.xml")
+                get("/api/sitemap.xml")
+
+            row("GET /api/sitemap.xml (cold)", cold_sitemap, 5)
+            row("before: whole-table fingerprint", lambda: db.execute(
+                select(func.count(Post.id), func.max(Post.updated_at)).where(Post.published == 1)
+            ).one(), 5)
+
+            def load_every_post() -> None:
+                db.query(Post).filter(Post.published == 1).order_by(Post.created_at.desc()).all()
+                db.expunge_all()
+
+            row("before: load every post (sitemap)", load_every_post, 1)
+            db.close()
+
+    print(f"\n{'p50 / p95 ms':<36}" + "".join(f"{f'{days} days':>22}" for days in checkpoints))
+    for name, by_days in results.items():
+        print(f"{name:<36}" + "".join(f"{by_days[days]:>22}" for days in checkpoints))
+
+
+if __name__ == "__main__":
+    main()
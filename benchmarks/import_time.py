@@ -0,0 +1,100 @@
+"""Cold-start import cost of the API and the bot, from ``python -X importtime``.
+
+Each target is imported in a fresh interpreter several times and the median
+total is reported with the slowest top-level packages. Modules listed in
+LAZY_MODULES must not be imported at startup at all.
+
+    python -m benchmarks.import_time --output import_baseline.json
+    python -m benchmarks.import_time --baseline import_baseline.json --threshold 0.2
+
+Exits non-zero when a lazy module is imported eagerly or, with --baseline,
+when a target got slower than the threshold allows.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = ("app.main", "ai_content_bot")
+# Heavy SDKs that must only load on first use
+LAZY_MODULES = ("google.generativeai", "numpy", "scipy")
+
+
+def profile(target: str) -> Tuple[float, Dict[str, float], List[str]]:
+    """Return (total ms, ms per top-level package, imported module names)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    packages: Dict[str, float] = defaultdict(float)
+    modules = []
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        modules.append(name)
+        if depth == 0:
+            # top-level imports of the -c statement; their cumulative times add up
+            ms = int(cumulative) / 1000
+            total += ms
+            packages[name.split(".")[0]] += ms
+    return total, dict(packages), modules
+
+
+def measure(target: str, runs: int) -> dict:
+    results = [profile(target) for _ in range(runs)]
+    totals = [total for total, _, _ in results]
+    packages = results[totals.index(statistics.median_low(totals))][1]
+    top = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:8]
+    eager = sorted({m for m in results[0][2] for lazy in LAZY_MODULES if m == lazy or m.startswith(lazy + ".")})
+    return {
+        "median_ms": round(statistics.median(totals), 1),
+        "top_packages_ms": {name: round(ms, 1) for name, ms in top},
+        "eager_lazy_modules": eager,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = {target: measure(target, args.runs) for target in TARGETS}
+    failures = []
+    for target, result in results.items():
+        print(f"{target}: {result['median_ms']} ms (median of {args.runs})")
+        for name, ms in result["top_packages_ms"].items():
+            print(f"    {name:<28} {ms:8.1f} ms")
+        if result["eager_lazy_modules"]:
+            failures.append(f"{target} imports {', '.join(result['eager_lazy_modules'][:3])} at startup")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for target, result in results.items():
+            before = baseline.get(target, {}).get("median_ms")
+            if before and result["median_ms"] > before * (1 + args.threshold):
+                failures.append(f"{target} import time {before} -> {result['median_ms']} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
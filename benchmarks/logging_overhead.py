@@ -0,0 +1,95 @@
+"""Request throughput with logging off, synchronous and queued.
+
+Each request to a small app logs three INFO lines with arguments and extra
+fields, like the login path. Variants: logging off (level WARNING), a plain
+StreamHandler writing JSON in the request, the QueueHandler pipeline from
+app.core.logs, and the pipeline sampling the lines at 10%. The sink is a
+file whose writes can be slowed down (--sink-delay-us) to stand in for a
+congested stdout pipe or log collector.
+
+    python -m benchmarks.logging_overhead --requests 20000 --sink-delay-us 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from fastapi import FastAPI
+from app.core.logs import LOGS_DROPPED, JSONFormatter, configure_logging, stop_logging
+from benchmarks.middleware_overhead import measure
+
+logger = logging.getLogger("bench.requests")
+
+
+class SlowFile:
+    """A file whose writes take at least delay seconds."""
+
+    def __init__(self, path: str, delay: float):
+        self.file = open(path, "w", encoding="utf-8")
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        self.lines += 1
+        return self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        logger.info("Token checked for %s", "client", extra={"user_id": 42})
+        logger.info("Loaded user %s in %.1f ms", 42, 0.4)
+        logger.info("Login succeeded", extra={"user_id": 42})
+        return {"ok": True}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--sink-delay-us", type=float, default=0, help="sleep per write, simulating a slow stdout")
+    args = parser.parse_args()
+
+    app = build_app()
+    root = logging.getLogger()
+    directory = tempfile.mkdtemp()
+
+    def synchronous(sink):
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(JSONFormatter())
+        root.handlers[:] = [handler]
+        root.setLevel(logging.INFO)
+
+    variants = {
+        "logging off": lambda sink: root.setLevel(logging.WARNING),
+        "synchronous StreamHandler": synchronous,
+        "queued (app.core.logs)": lambda sink: configure_logging("INFO", "json", "", stream=sink),
+        "queued, sampled at 10%": lambda sink: configure_logging("INFO", "json", "bench.requests:0.1", stream=sink),
+    }
+    print(f"{args.requests} requests, concurrency {args.concurrency}, sink delay {args.sink_delay_us:.0f} us/write")
+    for name, setup in variants.items():
+        sink = SlowFile(os.path.join(directory, "log.jsonl"), args.sink_delay_us / 1e6)
+        root.handlers[:] = []
+        setup(sink)
+        dropped = LOGS_DROPPED.value()
+        us = asyncio.run(measure(app, args.requests, args.concurrency))
+        start = time.perf_counter()
+        stop_logging()
+        drain = time.perf_counter() - start
+        dropped = LOGS_DROPPED.value() - dropped
+        print(f"  {name:<28} {us:8.1f} us/request  {1e6 / us:8.0f} req/s  "
+              f"{sink.lines:>6} written, {dropped:>6.0f} dropped, {drain * 1000:.0f} ms left to drain")
+
+
+if __name__ == "__main__":
+    main()
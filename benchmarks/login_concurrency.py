@@ -0,0 +1,99 @@
+"""100 simultaneous first-time Google logins, and what bcrypt does to the loop.
+
+google_login is an async handler, so anything CPU-bound in it stalls every
+other request on the worker. This measures:
+
+- the real endpoint with concurrent first-time sign-ups (OAuth-only accounts
+  store a sentinel, so no hashing happens), and
+- the same number of bcrypt hashes run inline on the event loop versus
+  through the bounded hashing executor.
+
+For each it reports wall time, per-request latency and the worst event loop
+lag seen by a 1ms ticker running alongside.
+
+    python -m benchmarks.login_concurrency --logins 100 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable, List
+
+
+async def measure(name: str, count: int, job: Callable[[int], Awaitable[None]]) -> None:
+    from benchmarks.runner import summarize
+
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - before - 0.001)
+
+    latencies: List[float] = []
+
+    async def timed(i: int) -> None:
+        start = time.perf_counter()
+        await job(i)
+        latencies.append(time.perf_counter() - start)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+    stats = summarize(latencies, elapsed, 0)
+    print(
+        f"{name:<34} wall {elapsed * 1000:9.1f} ms  p50 {stats['p50_ms']:9.1f} ms  "
+        f"p95 {stats['p95_ms']:9.1f} ms  max loop lag {max(lags, default=0) * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS for the hashing comparison")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'logins.db')}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    # Every login comes from one address; the per-IP limit is not measured here
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    from unittest import mock
+    import httpx
+    from app.core.migrations import upgrade_database
+    from app.core.security import get_password_hash_async, pwd_context
+    from app.database import engine
+    from app.main import app
+    from benchmarks.runner import fake_google_tokeninfo
+
+    upgrade_database(engine)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            async def login(i: int) -> None:
+                response = await client.post("/api/auth/google-login", json={"token": f"newcomer{i}@example.com"})
+                assert response.status_code == 200, response.text
+
+            await measure(f"{args.logins} first-time logins", args.logins, login)
+
+        async def inline(i: int) -> None:
+            pwd_context.hash(f"password-{i}")
+
+        async def offloaded(i: int) -> None:
+            await get_password_hash_async(f"password-{i}")
+
+        await measure(f"bcrypt x{args.logins} inline (rounds={args.rounds})", args.logins, inline)
+        await measure(f"bcrypt x{args.logins} executor (rounds={args.rounds})", args.logins, offloaded)
+
+    with mock.patch("app.api.endpoints.auth.requests.get", fake_google_tokeninfo):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
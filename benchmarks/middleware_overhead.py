@@ -0,0 +1,113 @@
+"""Per-request overhead of the header middlewares.
+
+Compares the old pair of BaseHTTPMiddleware subclasses against the single
+pure-ASGI SecurityHeadersMiddleware, both stacked on CORS like in app.main.
+Requests are driven straight through the ASGI interface (no sockets) in
+concurrent batches, so the numbers isolate middleware cost.
+
+    python -m benchmarks.middleware_overhead --requests 20000 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.middleware import SecurityHeadersMiddleware
+
+
+class LegacyCoopHeaderMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        response.headers["Cross-Origin-Opener-Policy"] = "same-origin-allow-popups"
+        return response
+
+
+class LegacyPrivateNetworkMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.headers.get("access-control-request-private-network"):
+            response.headers["Access-Control-Allow-Private-Network"] = "true"
+        return response
+
+
+def build_app(middlewares) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000"], allow_methods=["*"])
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def _request(app, extra_headers=()) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"origin", b"http://localhost:3000"), *extra_headers],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, requests: int, concurrency: int, extra_headers=()) -> float:
+    """Return mean microseconds per request."""
+    for _ in range(200):  # warm up
+        await _request(app, extra_headers)
+    start = time.perf_counter()
+    remaining = requests
+    while remaining:
+        batch = min(concurrency, remaining)
+        await asyncio.gather(*(_request(app, extra_headers) for _ in range(batch)))
+        remaining -= batch
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    variants = {
+        "cors only": [],
+        "cors + 2x BaseHTTPMiddleware": [LegacyCoopHeaderMiddleware, LegacyPrivateNetworkMiddleware],
+        "cors + SecurityHeadersMiddleware": [SecurityHeadersMiddleware],
+    }
+    results = {}
+    for name, middlewares in variants.items():
+        results[name] = asyncio.run(measure(build_app(middlewares), args.requests, args.concurrency))
+
+    baseline = results["cors only"]
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    for name, micros in results.items():
+        rps = 1e6 / micros
+        print(f"{name:<36} {micros:8.1f} us/req  {rps:9.0f} req/s  overhead {micros - baseline:+7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
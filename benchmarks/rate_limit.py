@@ -0,0 +1,68 @@
+"""Per-request cost of the token-bucket rate limiter.
+
+Measures a bare bucket check on the backend, then full requests through a
+minimal FastAPI app without the rate_limit dependency, with a per-IP
+policy and with a per-user policy (which also decodes the bearer token). Requests are driven straight
+through ASGI with the limit set high enough that nothing is rejected.
+
+    python -m benchmarks.rate_limit --requests 20000
+    python -m benchmarks.rate_limit --redis-url redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import time
+from fastapi import Depends, FastAPI
+from app.core.config import settings
+from app.core.rate_limit import MemoryBackend, RedisBackend, parse_rate, rate_limit
+from app.core.security import create_access_token
+from benchmarks.middleware_overhead import measure
+
+
+def build_app(policy=None) -> FastAPI:
+    app = FastAPI()
+    dependencies = [Depends(rate_limit(policy))] if policy else []
+
+    @app.get("/ping", dependencies=dependencies)
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def bucket_checks(backend, checks: int) -> float:
+    """Mean microseconds per take() over a spread of keys."""
+    rate = parse_rate("1000000/second")
+    start = time.perf_counter()
+    for i in range(checks):
+        await backend.take(f"bench:user:{i % 1000}", rate)
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--redis-url", help="also measure the shared Redis backend")
+    args = parser.parse_args()
+
+    backends = {"memory": MemoryBackend()}
+    if args.redis_url:
+        backends["redis"] = RedisBackend(args.redis_url)
+    for name, backend in backends.items():
+        micros = asyncio.run(bucket_checks(backend, args.requests))
+        print(f"bucket check, {name:<8} {micros:8.2f} us")
+
+    settings.RATE_LIMIT_ENABLED = True
+    settings.RATE_LIMIT_LOGIN = "1000000000/second"
+    settings.RATE_LIMIT_CREATE_COMMENT = "1000000000/second"
+    token = create_access_token({"sub": "1"})
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    baseline = asyncio.run(measure(build_app(), args.requests, args.concurrency, headers))
+    print(f"request without limiter    {baseline:8.1f} us/req")
+    for label, policy in (("per-ip limiter", "login"), ("per-user limiter", "create_comment")):
+        micros = asyncio.run(measure(build_app(policy), args.requests, args.concurrency, headers))
+        print(f"request with {label:<14}{micros:8.1f} us/req  overhead {micros - baseline:+7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Building and refreshing the related-posts table.
+
+Seeds a temporary SQLite database with a synthetic topical corpus: each
+topic has its own vocabulary of made-up Devanagari words, mixed with words
+shared by every post. Reports the full rebuild (vectorizing, the blocked
+similarity products, writing the table), an incremental refresh after one
+post is published, the endpoint's read, and how many of each post's
+neighbours come from its own topic.
+
+    python -m benchmarks.related --posts 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+SYLLABLES = [c + v for c in "कखगचजटडतदनपबमयरलवसह" for v in ("", "ा", "ि", "ी", "ु", "े", "ो")]
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--words", type=int, default=250, help="words per post")
+    parser.add_argument("--reads", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'related.db')}"
+    from sqlalchemy import event, func, insert, select
+    from app.core.config import settings
+    from app.core.migrations import upgrade_database
+    from app.core.related import ngram_counts, post_document, rebuild_related, refresh_related
+    from app.database import SessionLocal, engine
+    from app.models import Post, RelatedPost, User
+    from benchmarks.seed import WORDS
+
+    rng = random.Random(1)
+    upgrade_database(engine)
+    topics = [[make_word(rng) for _ in range(150)] for _ in range(args.topics)]
+
+    def make_post(topic: int) -> str:
+        # Mostly topic words, the rest shared filler
+        return " ".join(
+            rng.choice(topics[topic]) if rng.random() < 0.6 else rng.choice(WORDS) for _ in range(args.words)
+        )
+
+    now = datetime.utcnow()
+    post_topics = [rng.randrange(args.topics) for _ in range(args.posts)]
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "u@example.com", "username": "u", "hashed_password": "!",
+                                     "created_at": now, "updated_at": now}])
+        for start in range(0, args.posts, 5000):
+            conn.execute(insert(Post), [
+                {"id": i + 1, "title": " ".join(rng.choice(topics[post_topics[i]]) for _ in range(4)),
+                 "content": make_post(post_topics[i]), "slug": f"p{i + 1}", "author_id": 1, "published": 1,
+                 "created_at": now}
+                for i in range(start, min(start + 5000, args.posts))
+            ])
+    print(f"{args.posts} posts in {args.topics} topics, {args.words} words each "
+          f"({settings.RELATED_FEATURES_PER_POST} features kept per post, 2^{settings.RELATED_HASH_BITS} buckets)")
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    for title, content in db.execute(select(Post.title, Post.content).limit(5000)):
+        ngram_counts(post_document(title, None, content))
+    per_post = (time.perf_counter() - start) / min(args.posts, 5000)
+    db.rollback()
+    print(f"  vectorizing           {per_post * 1e6:9.0f} us per post")
+
+    marks = {}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def mark_write(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE FROM related_posts"):
+            marks.setdefault("write", time.perf_counter())
+
+    start = time.perf_counter()
+    rebuild_related(db)
+    end = time.perf_counter()
+    event.remove(engine, "before_cursor_execute", mark_write)
+    print(f"  full rebuild          {end - start:9.1f} s  "
+          f"(read, vectorize and score {marks['write'] - start:.1f} s, write {end - marks['write']:.1f} s)")
+
+    rows = db.execute(select(RelatedPost.post_id, RelatedPost.related_post_id)).all()
+    same = sum(post_topics[post_id - 1] == post_topics[related_id - 1] for post_id, related_id in rows)
+    print(f"  neighbours on topic   {same / len(rows) * 100:9.1f} %  ({len(rows)} rows)")
+
+    new_id = args.posts + 1
+    db.add(Post(id=new_id, title=" ".join(topics[0][:4]), content=make_post(0), slug="new", author_id=1, published=1))
+    db.commit()
+    post_topics.append(0)
+    start = time.perf_counter()
+    refresh_related(db, [new_id])
+    print(f"  refresh one post      {(time.perf_counter() - start) * 1000:9.0f} ms  "
+          f"(against the {settings.RELATED_REFRESH_WINDOW} newest posts)")
+    listed = db.execute(select(func.count()).where(RelatedPost.related_post_id == new_id)).scalar()
+    print(f"  new post listed by    {listed:9d} posts")
+    db.close()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    settings.SKIP_SCHEMA_CHECK = True
+    settings.RATE_LIMIT_ENABLED = False
+    timings = []
+    with TestClient(app) as client:
+        for _ in range(args.reads):
+            post_id = rng.randint(1, args.posts)
+            start = time.perf_counter()
+            response = client.get(f"/api/posts/{post_id}/related")
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200
+    timings.sort()
+    print(f"  GET /related          {statistics.median(timings) * 1000:9.2f} ms median, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
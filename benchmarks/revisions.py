@@ -0,0 +1,85 @@
+"""Storage and rebuild cost of post revision history.
+
+Replays an autosaving editor on a ~5KB post: each save changes a few words
+somewhere in the text. Compares storing a full copy per revision with the
+snapshot-plus-delta scheme in app.core.revisions, the request body of a
+PATCH delta with a full PUT, and the time to rebuild the revision furthest
+from a snapshot.
+
+    python -m benchmarks.revisions --saves 500
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saves", type=int, default=500)
+    parser.add_argument("--words-per-save", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'revisions.db')}"
+    from app.core.config import settings
+    from app.core.migrations import upgrade_database
+    from app.core.revisions import make_delta, post_text, record_revision, revision_content
+    from app.database import SessionLocal, engine
+    from app.models import Post, PostRevision, User
+    from benchmarks.seed import WORDS, make_content
+
+    rng = random.Random(1)
+    upgrade_database(engine)
+    db = SessionLocal()
+    user = User(email="editor@example.com", username="editor", hashed_password="!")
+    db.add(user)
+    db.flush()
+    content = make_content(rng) + "\n\n" + make_content(rng)
+    post = Post(title="Autosaved", content=content, slug="autosaved", author_id=user.id)
+    db.add(post)
+    record_revision(db, post, user.id)
+    db.commit()
+
+    full_copies = len(content.encode("utf-8"))
+    put_bytes = patch_bytes = 0
+    for _ in range(args.saves):
+        words = post.content.split(" ")
+        for _ in range(args.words_per_save):
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+        new = " ".join(words)
+        delta = make_delta(post.content, new)
+        put_bytes += len(json.dumps({"content": new}, ensure_ascii=False).encode("utf-8"))
+        patch_bytes += len(json.dumps({"base_revision": post.revision, "delta": delta}, ensure_ascii=False).encode("utf-8"))
+        previous = post_text(post)
+        post.content = new
+        record_revision(db, post, user.id, previous)
+        db.commit()
+        full_copies += len(new.encode("utf-8"))
+
+    rows = db.query(PostRevision.snapshot, PostRevision.delta).filter(PostRevision.post_id == post.id).all()
+    snapshots = [row.snapshot for row in rows if row.snapshot is not None]
+    deltas = [row.delta for row in rows if row.delta is not None]
+    total = sum(len(snapshot.encode("utf-8")) for snapshot in snapshots) + sum(
+        len(json.dumps(delta, ensure_ascii=False).encode("utf-8")) for delta in deltas
+    )
+    print(f"{args.saves + 1} revisions of a {len(content.encode('utf-8'))}-byte post, "
+          f"snapshot every {settings.REVISION_SNAPSHOT_INTERVAL}")
+    print(f"  full copy per revision  {full_copies / 1024:9.1f} KB")
+    print(f"  snapshots + deltas      {total / 1024:9.1f} KB  ({len(snapshots)} snapshots, {len(deltas)} deltas, "
+          f"{full_copies / total:.1f}x smaller)")
+    print(f"  request bodies: PUT {put_bytes / args.saves:7.0f} B/save   PATCH {patch_bytes / args.saves:7.0f} B/save")
+
+    # The last revision before a snapshot applies the most deltas
+    worst = (post.revision // settings.REVISION_SNAPSHOT_INTERVAL) * settings.REVISION_SNAPSHOT_INTERVAL
+    start = time.perf_counter()
+    for _ in range(100):
+        revision_content(db, post.id, worst)
+    print(f"  rebuild revision {worst} ({settings.REVISION_SNAPSHOT_INTERVAL - 1} deltas) "
+          f"{(time.perf_counter() - start) / 100 * 1000:7.2f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
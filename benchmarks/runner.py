@@ -0,0 +1,175 @@
+"""Drive the real API endpoints and collect latency statistics.
+
+Two drivers share the same scenarios:
+
+- ``asgi`` calls the app in-process through httpx's ASGI transport, which
+  measures the application without socket or server overhead.
+- ``uvicorn`` starts ``benchmarks.server`` in a subprocess and sends real
+  HTTP requests, which is closer to production.
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+import httpx
+
+
+class _TokenInfoResponse:
+    def __init__(self, payload: dict):
+        self.status_code = 200
+        self.text = ""
+        self._payload = payload
+
+    def json(self) -> dict:
+        return self._payload
+
+
+def fake_google_tokeninfo(url: str, *args, **kwargs) -> _TokenInfoResponse:
+    """Stand-in for Google's tokeninfo endpoint: the token is the email."""
+    from app.core.config import settings
+
+    email = parse_qs(urlparse(url).query)["id_token"][0]
+    return _TokenInfoResponse({
+        "email": email,
+        "name": email.split("@")[0],
+        "picture": None,
+        "aud": settings.GOOGLE_CLIENT_ID,
+    })
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[random.Random], str]
+    body: Optional[Callable[[random.Random], dict]] = None
+    authenticated: bool = False
+
+
+def build_scenarios(counts: Dict[str, int]) -> List[Scenario]:
+    posts, users = counts["posts"], counts["users"]
+    return [
+        Scenario("get_posts", "GET", lambda r: f"/api/posts?limit={r.choice([10, 50, 100])}"),
+        Scenario("get_post_by_slug", "GET", lambda r: f"/api/posts/slug/post-{r.randint(1, posts)}"),
+        Scenario("get_post_comments", "GET", lambda r: f"/api/comments/post/{r.randint(1, posts)}"),
+        Scenario("sitemap", "GET", lambda r: "/api/sitemap.xml"),
+        Scenario("rss", "GET", lambda r: "/api/rss.xml"),
+        Scenario(
+            "google_login", "POST", lambda r: "/api/auth/google-login",
+            # Half existing users, half first-time sign-ups
+            body=lambda r: {"token": f"user{r.randint(1, users * 2)}@example.com"},
+        ),
+        Scenario(
+            "create_comment", "POST", lambda r: "/api/comments",
+            body=lambda r: {"post_id": r.randint(1, posts), "content": "Benchmark comment - बढ़िया!"},
+            authenticated=True,
+        ),
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, token: str, seed: int = 1
+) -> Dict[str, float]:
+    rng = random.Random(seed)
+    plan = [(scenario.path(rng), scenario.body(rng) if scenario.body else None) for _ in range(requests)]
+    headers = {"Authorization": f"Bearer {token}"} if scenario.authenticated else {}
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while plan:
+            path, body = plan.pop()
+            start = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def run_all(client, scenarios, requests, concurrency, token) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for scenario in scenarios:
+        # Warm up caches and connection pools before measuring
+        await run_scenario(client, scenario, min(20, requests), concurrency, token, seed=0)
+        results[scenario.name] = await run_scenario(client, scenario, requests, concurrency, token)
+        print(f"  {scenario.name:<20} {results[scenario.name]}")
+    return results
+
+
+def run_asgi(scenarios, requests, concurrency, token) -> Dict[str, Dict[str, float]]:
+    from unittest import mock
+    from app.main import app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await run_all(client, scenarios, requests, concurrency, token)
+
+    with mock.patch("app.api.endpoints.auth.requests.get", fake_google_tokeninfo):
+        return asyncio.run(main())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_uvicorn(scenarios, requests, concurrency, token) -> Dict[str, Dict[str, float]]:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.server", "--port", str(port)],
+        env=dict(os.environ),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                httpx.get(base_url + "/")
+                break
+            except httpx.TransportError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError("benchmark server did not start")
+                time.sleep(0.2)
+
+        async def main():
+            limits = httpx.Limits(max_connections=concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+                return await run_all(client, scenarios, requests, concurrency, token)
+
+        return asyncio.run(main())
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
@@ -0,0 +1,79 @@
+"""Seed a database with synthetic users, posts and comments."""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from app.database import Base
+from app.models import Comment, Post, User
+
+# Mixed Devanagari/English like the real satirical posts
+PARAGRAPHS = [
+    "आज की खबर पढ़कर हंसी भी आई और थोड़ा गुस्सा भी। Seriously, कभी-कभी लगता है कि news और comedy में कोई फर्क ही नहीं बचा।",
+    "Traffic में फंसे लोग अब meditation सीख रहे हैं, क्योंकि और कोई option ही नहीं है। Signal हरा होता है, फिर लाल, फिर हरा, और गाड़ी वहीं की वहीं।",
+    "Politicians ने फिर से वादा किया है कि सब कुछ free मिलेगा। बस common sense का stock खत्म हो गया है, वो अगले election में आएगा।",
+    "Social media पर आज का outrage किसी ने ठीक से पढ़ा भी नहीं, लेकिन trend सबसे ऊपर है। Forward करने से पहले सोचना अब पुराना fashion है।",
+]
+CONTENT_BYTES = 3000
+WORDS = " ".join(PARAGRAPHS).split()
+
+
+def make_content(rng: random.Random) -> str:
+    # Shuffled words keep compression ratios closer to real text than
+    # repeating whole paragraphs would
+    parts = []
+    while len("\n\n".join(parts).encode("utf-8")) < CONTENT_BYTES:
+        parts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(25, 45))))
+    return "\n\n".join(parts)
+
+
+def seed(database_url: str, users: int = 50, posts: int = 1000, comments: int = 5000, seed_value: int = 1) -> dict:
+    """Create the schema and insert synthetic rows; returns the row counts."""
+    rng = random.Random(seed_value)
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "id": i,
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "full_name": f"User {i}",
+                "hashed_password": "!",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, users + 1)
+        ])
+        post_rows = []
+        for i in range(1, posts + 1):
+            created = now - timedelta(minutes=5 * (posts - i))
+            post_rows.append({
+                "id": i,
+                "title": f"Post {i}",
+                "subtitle": "एक छोटी सी कहानी",
+                "content": make_content(rng),
+                "slug": f"post-{i}",
+                "author_id": rng.randint(1, users),
+                "published": 1,
+                "created_at": created,
+                "updated_at": created,
+            })
+        for start in range(0, len(post_rows), 1000):
+            conn.execute(insert(Post), post_rows[start:start + 1000])
+        comment_rows = [
+            {
+                "content": "बहुत बढ़िया लिखा है! Totally agree.",
+                "post_id": rng.randint(1, posts),
+                "author_id": rng.randint(1, users),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for _ in range(comments)
+        ]
+        for start in range(0, len(comment_rows), 5000):
+            conn.execute(insert(Comment), comment_rows[start:start + 5000])
+
+    engine.dispose()
+    return {"users": users, "posts": posts, "comments": comments}
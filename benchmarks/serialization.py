@@ -0,0 +1,74 @@
+"""Serialization cost of a 100-post list response (~3KB content each).
+
+Compares the classic FastAPI path (validate into models, jsonable_encoder,
+json.dumps) against the TypeAdapter path in app.core.serialization that
+dumps straight to JSON bytes.
+
+    python -m benchmarks.serialization --posts 100 --repeat 200
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from app.core.serialization import dump_list_json
+from app.models import Post, User
+from app.schemas.post import PostResponse
+from benchmarks.seed import make_content
+
+
+def make_posts(count: int):
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    authors = [
+        User(id=i, email=f"user{i}@example.com", username=f"user{i}", full_name=f"User {i}", created_at=now)
+        for i in range(1, 11)
+    ]
+    return [
+        Post(
+            id=i, title=f"Post {i}", subtitle="एक छोटी सी कहानी", content=make_content(rng), slug=f"post-{i}",
+            author_id=authors[i % 10].id, author=authors[i % 10], published=1, created_at=now, updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def classic(posts) -> bytes:
+    models = [PostResponse.model_validate(post) for post in posts]
+    # What JSONResponse.render does with the encoded content
+    return json.dumps(
+        jsonable_encoder(models), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def type_adapter(posts) -> bytes:
+    return dump_list_json(PostResponse, posts)
+
+
+def timed(fn, posts, repeat: int) -> float:
+    fn(posts)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(posts)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts)
+    assert json.loads(classic(posts)) == json.loads(type_adapter(posts))
+    size = len(type_adapter(posts))
+    print(f"{args.posts} posts, {size} bytes of JSON")
+    baseline = timed(classic, posts, args.repeat)
+    for name, fn in (("model + jsonable_encoder + json", classic), ("TypeAdapter.dump_json", type_adapter)):
+        ms = timed(fn, posts, args.repeat)
+        print(f"{name:<34} {ms:8.3f} ms/response  {baseline / ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""uvicorn entry point for the benchmark driver, with Google verification stubbed."""
+import argparse
+from unittest import mock
+import uvicorn
+from benchmarks.runner import fake_google_tokeninfo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    mock.patch("app.api.endpoints.auth.requests.get", fake_google_tokeninfo).start()
+    from app.main import app
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
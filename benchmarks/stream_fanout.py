@@ -0,0 +1,87 @@
+"""Idle live-feed connections per worker and publish fan-out latency.
+
+Opens N /api/stream connections against the app in-process (straight
+through ASGI, no sockets), then publishes events and times how long it takes
+until every client has received each one. Reports Python heap held per idle
+connection.
+
+    python -m benchmarks.stream_fanout --clients 5000 --events 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+
+async def run(clients: int, events: int) -> None:
+    from app.core.events import FEED_TOPIC, broker
+    from app.main import app
+
+    disconnect = asyncio.Event()
+    received = [0] * clients
+    all_received = asyncio.Event()
+    target = 0
+
+    def make_send(index: int):
+        async def send(message):
+            if message["type"] == "http.response.body" and b"event: post" in message.get("body", b""):
+                received[index] += 1
+                if received[index] == target and all(count >= target for count in received):
+                    all_received.set()
+        return send
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/stream", "raw_path": b"/api/stream",
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(app(dict(scope), receive, make_send(i))) for i in range(clients)]
+    while broker.subscriber_count() < clients:
+        await asyncio.sleep(0.01)
+    connect_seconds = time.perf_counter() - started
+    await asyncio.sleep(0.2)
+    after = tracemalloc.take_snapshot()
+    held = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    tracemalloc.stop()
+    print(f"{clients} idle clients connected in {connect_seconds:.2f}s, ~{held / clients / 1024:.1f} KiB heap each")
+
+    latencies = []
+    for n in range(1, events + 1):
+        target = n
+        all_received.clear()
+        start = time.perf_counter()
+        # Publish from a worker thread, like the sync endpoints do
+        await asyncio.get_running_loop().run_in_executor(
+            None, broker.publish, FEED_TOPIC, "post", {"id": n, "title": f"Post {n}"}
+        )
+        await all_received.wait()
+        latencies.append(time.perf_counter() - start)
+    print(
+        f"fan-out to {clients} clients: median {statistics.median(latencies) * 1000:.1f} ms, "
+        f"max {max(latencies) * 1000:.1f} ms over {events} events"
+    )
+
+    disconnect.set()
+    await asyncio.gather(*tasks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.events))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from benchmarks.compare import compare
+from benchmarks.runner import summarize
+
+
+def _report(p95, rps, errors=0):
+    stats = {"p50_ms": 10.0, "p95_ms": p95, "p99_ms": 30.0, "throughput_rps": rps, "errors": errors}
+    return {"meta": {}, "results": {"get_posts": stats}}
+
+
+def test_summarize_percentiles():
+    stats = summarize([i / 1000 for i in range(1, 101)], elapsed=2.0, errors=1)
+    assert stats["p50_ms"] == 50.0
+    assert stats["p95_ms"] == 95.0
+    assert stats["p99_ms"] == 99.0
+    assert stats["throughput_rps"] == 50.0
+
+
+def test_compare_flags_regressions():
+    rows = compare(_report(20.0, 100.0), _report(30.0, 95.0, errors=2), threshold=0.15)
+    flagged = {row["metric"] for row in rows if row["regression"]}
+    assert flagged == {"p95_ms", "errors"}
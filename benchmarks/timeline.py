@@ -0,0 +1,173 @@
+"""Following feed at 10k users with the bot posting every 5 minutes.
+
+Seeds a temporary SQLite database with users who each follow a handful of
+regular authors, most of whom also follow the satirical bot. It then
+replays a day of publishing: the bot posts every 5 minutes and regular
+authors post at random. It reports:
+
+- publish cost: fan-out on write for a regular author versus the bot, which
+  is above FEED_FANOUT_MAX_FOLLOWERS and is not fanned out (plus what
+  fanning the bot out would have cost);
+- read cost: the first and a deep page of the merged timeline versus the
+  naive ``WHERE author_id IN (followed) ORDER BY created_at`` query.
+
+    python -m benchmarks.timeline --users 10000 --authors 200 --hours 24
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+
+def ms(values: List[float]) -> str:
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms  (n={len(ordered)})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--follows", type=int, default=10, help="regular authors followed per user")
+    parser.add_argument("--bot-followers", type=float, default=0.8, help="share of users following the bot")
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--author-posts", type=int, default=1000, help="regular posts over the period")
+    parser.add_argument("--history-days", type=int, default=30, help="older posts seeded in bulk before the replay")
+    parser.add_argument("--reads", type=int, default=300)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'timeline.db')}"
+    from sqlalchemy import insert, select, text
+    from sqlalchemy.orm import joinedload
+    from app.core.config import settings
+    from app.core.migrations import upgrade_database
+    from app.core.timeline import fan_out_post, read_timeline
+    from app.database import SessionLocal, engine
+    from app.models import Follow, Post, TimelineEntry, User
+
+    rng = random.Random(1)
+    upgrade_database(engine)
+    bot_id = 1
+    authors = list(range(2, args.authors + 2))
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"u{i}@example.com", "username": f"u{i}", "hashed_password": "!",
+             "created_at": now, "updated_at": now}
+            for i in range(1, args.users + 1)
+        ])
+        follows = []
+        for user_id in range(args.authors + 2, args.users + 1):
+            for author_id in rng.sample(authors, args.follows):
+                follows.append({"follower_id": user_id, "followee_id": author_id, "created_at": now})
+            if rng.random() < args.bot_followers:
+                follows.append({"follower_id": user_id, "followee_id": bot_id, "created_at": now})
+        conn.execute(insert(Follow), follows)
+        conn.execute(text(
+            "UPDATE users SET follower_count = (SELECT count(*) FROM follows WHERE followee_id = users.id)"
+        ))
+    print(f"{args.users} users, {len(follows)} follows, threshold {settings.FEED_FANOUT_MAX_FOLLOWERS} followers")
+
+    # History at the same rates, materialized in bulk as if fanned out
+    history_start = now - timedelta(hours=args.hours, days=args.history_days)
+    history = [(history_start + timedelta(minutes=5 * n), bot_id) for n in range(args.history_days * 288)]
+    history += [
+        (history_start + timedelta(seconds=rng.uniform(0, args.history_days * 86400)), rng.choice(authors))
+        for _ in range(args.author_posts * args.history_days * 24 // args.hours)
+    ]
+    history.sort()
+    with engine.begin() as conn:
+        conn.execute(insert(Post), [
+            {"title": f"Old {n}", "content": "…", "slug": f"old-{n}", "author_id": author_id, "published": 1,
+             "created_at": created_at, "updated_at": created_at}
+            for n, (created_at, author_id) in enumerate(history)
+        ])
+        conn.execute(text(
+            "INSERT INTO timeline_entries (user_id, post_id, author_id, created_at) "
+            "SELECT follows.follower_id, posts.id, posts.author_id, posts.created_at "
+            "FROM posts JOIN follows ON follows.followee_id = posts.author_id "
+            "JOIN users ON users.id = posts.author_id WHERE users.follower_count <= :threshold"
+        ), {"threshold": settings.FEED_FANOUT_MAX_FOLLOWERS})
+        conn.execute(text("ANALYZE"))
+    print(f"{len(history)} posts of history over {args.history_days} days")
+
+    # Replay the period in time order
+    start = now - timedelta(hours=args.hours)
+    schedule = [(start + timedelta(minutes=5 * n), bot_id) for n in range(args.hours * 12)]
+    schedule += [
+        (start + timedelta(seconds=rng.uniform(0, args.hours * 3600)), rng.choice(authors))
+        for _ in range(args.author_posts)
+    ]
+    schedule.sort()
+    publish: Dict[str, List[float]] = {"regular author": [], "bot (fan-out on read)": []}
+    db = SessionLocal()
+    for n, (created_at, author_id) in enumerate(schedule):
+        post = Post(title=f"Post {n}", content="…", slug=f"post-{n}", author_id=author_id, published=1,
+                    created_at=created_at, updated_at=created_at)
+        began = time.perf_counter()
+        db.add(post)
+        db.flush()
+        fan_out_post(db, post)
+        db.commit()
+        publish["bot (fan-out on read)" if author_id == bot_id else "regular author"].append(time.perf_counter() - began)
+    for name, values in publish.items():
+        print(f"publish, {name:<24} {ms(values)}")
+
+    # What the bot would cost if it were fanned out like everyone else
+    bot = db.get(User, bot_id)
+    original = settings.FEED_FANOUT_MAX_FOLLOWERS
+    settings.FEED_FANOUT_MAX_FOLLOWERS = bot.follower_count
+    forced = []
+    for n in range(5):
+        post = Post(title="Forced", content="…", slug=f"forced-{n}", author_id=bot_id, published=1,
+                    created_at=now, updated_at=now)
+        began = time.perf_counter()
+        db.add(post)
+        db.flush()
+        fan_out_post(db, post)
+        db.commit()
+        forced.append(time.perf_counter() - began)
+        db.query(TimelineEntry).filter(TimelineEntry.post_id == post.id).delete(synchronize_session=False)
+        db.delete(post)
+        db.commit()
+    settings.FEED_FANOUT_MAX_FOLLOWERS = original
+    print(f"publish, {'bot if fanned out':<24} {ms(forced)}  ({bot.follower_count} rows per post)")
+
+    readers = [db.get(User, user_id) for user_id in rng.sample(range(args.authors + 2, args.users + 1), args.reads)]
+    first_page, deep_page, naive = [], [], []
+    for reader in readers:
+        began = time.perf_counter()
+        posts, cursor = read_timeline(db, reader, 20)
+        first_page.append(time.perf_counter() - began)
+        for _ in range(4):
+            posts, cursor = read_timeline(db, reader, 20, _cursor(cursor))
+        began = time.perf_counter()
+        read_timeline(db, reader, 20, _cursor(cursor))
+        deep_page.append(time.perf_counter() - began)
+
+        followed = select(Follow.followee_id).where(Follow.follower_id == reader.id)
+        began = time.perf_counter()
+        db.query(Post).options(joinedload(Post.author)).filter(
+            Post.author_id.in_(followed), Post.published == 1
+        ).order_by(Post.created_at.desc()).limit(20).all()
+        naive.append(time.perf_counter() - began)
+        db.expunge_all()
+    print(f"read, first page               {ms(first_page)}")
+    print(f"read, 6th page (cursor)        {ms(deep_page)}")
+    print(f"read, naive IN (...) query     {ms(naive)}")
+    db.close()
+
+
+def _cursor(cursor):
+    from app.core.timeline import decode_cursor
+
+    return decode_cursor(cursor) if cursor else None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Indexes for the hot read paths
+
+- comments.post_id: comments of a post
+- comments.author_id and posts.author_id: a user's posts, and the cascades
+  when a user is deleted
+- posts (published, created_at): the feed, sitemap and RSS, which filter on
+  published and order by created_at
+
+On PostgreSQL the indexes are built CONCURRENTLY so writes to the tables are
+not blocked while they build; that cannot run inside a transaction, hence
+the autocommit block.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_comments_post_id", "comments", ["post_id"]),
+    ("ix_comments_author_id", "comments", ["author_id"]),
+    ("ix_posts_author_id", "posts", ["author_id"]),
+    ("ix_posts_published_created_at", "posts", ["published", "created_at"]),
+)
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                # if_not_exists tolerates indexes an operator created by hand
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, _ in INDEXES:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table)
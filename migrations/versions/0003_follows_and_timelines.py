@@ -0,0 +1,65 @@
+"""Follows and materialized timelines for the following feed
+
+Also replaces ix_posts_author_id with (author_id, created_at), so reading an
+author's newest posts is an ordered index scan rather than a sort; built
+concurrently on PostgreSQL like 0002.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("follower_count", sa.Integer(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", sa.Integer(), nullable=False),
+        sa.Column("followee_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["follower_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["followee_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("follower_id", "followee_id"),
+    )
+    op.create_index("ix_follows_followee_id", "follows", ["followee_id"])
+
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "post_id"),
+    )
+    op.create_index("ix_timeline_entries_user_created", "timeline_entries", ["user_id", "created_at", "post_id"])
+    op.create_index("ix_timeline_entries_post_id", "timeline_entries", ["post_id"])
+
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_posts_author_id_created_at", "posts", ["author_id", "created_at"],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index("ix_posts_author_id", table_name="posts", postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index("ix_posts_author_id_created_at", "posts", ["author_id", "created_at"])
+        op.drop_index("ix_posts_author_id", table_name="posts")
+
+
+def downgrade() -> None:
+    op.create_index("ix_posts_author_id", "posts", ["author_id"])
+    op.drop_index("ix_posts_author_id_created_at", table_name="posts")
+    op.drop_table("timeline_entries")
+    op.drop_table("follows")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("follower_count")
@@ -0,0 +1,48 @@
+"""Uploaded images and post cover variants
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "images",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=True),
+        sa.Column("height", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("variants", sa.JSON(), nullable=True),
+        sa.Column("uploaded_by", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["uploaded_by"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_images_id", "images", ["id"])
+    op.create_index("ix_images_sha256", "images", ["sha256"], unique=True)
+
+    with op.batch_alter_table("posts") as batch:
+        batch.add_column(sa.Column("cover_image_id", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("cover_images", sa.JSON(), nullable=True))
+        batch.create_foreign_key("fk_posts_cover_image_id", "images", ["cover_image_id"], ["id"], ondelete="SET NULL")
+        batch.create_index("ix_posts_cover_image_id", ["cover_image_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("posts") as batch:
+        batch.drop_index("ix_posts_cover_image_id")
+        batch.drop_constraint("fk_posts_cover_image_id", type_="foreignkey")
+        batch.drop_column("cover_images")
+        batch.drop_column("cover_image_id")
+    op.drop_table("images")
@@ -0,0 +1,51 @@
+"""ON DELETE CASCADE for posts and comments, account deletion marker
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# The baseline foreign keys are unnamed; on SQLite batch mode names the
+# reflected ones with this convention so they can be dropped
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+FOREIGN_KEYS = {
+    "posts": [("author_id", "users")],
+    "comments": [("post_id", "posts"), ("author_id", "users")],
+}
+
+
+def _existing_name(table: str, column: str, referred: str) -> str:
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if fk["constrained_columns"] == [column] and fk["name"]:
+            return fk["name"]
+    return f"fk_{table}_{column}_{referred}"
+
+
+def _replace_foreign_keys(ondelete) -> None:
+    for table, keys in FOREIGN_KEYS.items():
+        names = [_existing_name(table, column, referred) for column, referred in keys]
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch:
+            for (column, referred), name in zip(keys, names):
+                batch.drop_constraint(name, type_="foreignkey")
+                batch.create_foreign_key(
+                    f"fk_{table}_{column}_{referred}", referred, [column], ["id"], ondelete=ondelete
+                )
+
+
+def upgrade() -> None:
+    _replace_foreign_keys("CASCADE")
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("deletion_requested_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("deletion_requested_at")
+    _replace_foreign_keys(None)
@@ -0,0 +1,52 @@
+"""Related posts, post vectors and the TF-IDF index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "related_posts",
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("related_post_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["related_post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("post_id", "rank"),
+    )
+    # Deleting a post cascades into the lists it appears in
+    op.create_index("ix_related_posts_related_post_id", "related_posts", ["related_post_id"])
+    op.create_table(
+        "post_vectors",
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("features", sa.LargeBinary(), nullable=False),
+        sa.Column("weights", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("post_id"),
+    )
+    op.create_table(
+        "related_index",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("built_at", sa.DateTime(), nullable=False),
+        sa.Column("documents", sa.Integer(), nullable=False),
+        sa.Column("idf", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("related_index")
+    op.drop_table("post_vectors")
+    op.drop_index("ix_related_posts_related_post_id", table_name="related_posts")
+    op.drop_table("related_posts")
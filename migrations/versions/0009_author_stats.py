@@ -0,0 +1,36 @@
+"""Author profile aggregates on users
+
+Adds published_post_count, comments_received_count and last_published_at
+and fills them in from the existing posts and comments.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("published_post_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("users", sa.Column("comments_received_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("users", sa.Column("last_published_at", sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE users SET "
+        "published_post_count = (SELECT count(*) FROM posts WHERE posts.author_id = users.id AND posts.published = 1), "
+        "comments_received_count = (SELECT count(*) FROM comments JOIN posts ON comments.post_id = posts.id "
+        "WHERE posts.author_id = users.id), "
+        "last_published_at = (SELECT max(created_at) FROM posts WHERE posts.author_id = users.id AND posts.published = 1)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("last_published_at")
+        batch.drop_column("comments_received_count")
+        batch.drop_column("published_post_count")
@@ -0,0 +1,28 @@
+"""Scheduled publishing: posts.publish_at with a partial index
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("publish_at", sa.DateTime(), nullable=True))
+    # Only scheduled drafts carry a publish_at
+    op.create_index(
+        "ix_posts_publish_at", "posts", ["publish_at"],
+        sqlite_where=sa.text("publish_at IS NOT NULL"), postgresql_where=sa.text("publish_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_publish_at", table_name="posts")
+    with op.batch_alter_table("posts") as batch:
+        batch.drop_column("publish_at")
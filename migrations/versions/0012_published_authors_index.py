@@ -0,0 +1,20 @@
+"""Published authors: index on users.published_post_count
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_published_post_count", "users", ["published_post_count"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_published_post_count", table_name="users")
@@ -1,7 +1,27 @@
+import os
+import tempfile
 import pytest
+from unittest.mock import patch
+
+# Settings are read at import time: point the app at a throwaway database and
+# the client id the Google mock below reports before importing it.
+GOOGLE_CLIENT_ID = "985235744714-ei8qmafq1ah3ktk61ntg8jhoqg26nn9h.apps.googleusercontent.com"
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("GOOGLE_CLIENT_ID", GOOGLE_CLIENT_ID)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("MEDIA_ROOT", tempfile.mkdtemp())
+# Tests share users across many writes; test_rate_limit turns it back on
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Refreshes write from a background thread; test_related turns it back on
+os.environ.setdefault("RELATED_POSTS_ENABLED", "false")
+# Tests release scheduled posts by calling the publisher directly
+os.environ.setdefault("PUBLISHER_ENABLED", "false")
+
 from fastapi.testclient import TestClient
 from app.main import app
-from unittest.mock import patch
+from app.core.security import create_access_token
+from app.database import SessionLocal
+from app.models.user import User
 
 @pytest.fixture(scope="module")
 def test_client():
@@ -11,7 +31,26 @@ def test_client():
             "email": "testuser@example.com",
             "name": "Test User",
             "picture": "http://example.com/avatar.png",
-            "aud": "985235744714-ei8qmafq1ah3ktk61ntg8jhoqg26nn9h.apps.googleusercontent.com"
+            "aud": GOOGLE_CLIENT_ID
         }
-        client = TestClient(app)
-        yield client
\ No newline at end of file
+        # Entering the client runs the lifespan, which creates the tables
+        with TestClient(app) as client:
+            yield client
+
+@pytest.fixture
+def make_user():
+    """Create (or reuse) a user and return (user_id, auth headers)"""
+    def _make_user(username: str):
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.username == username).first()
+            if user is None:
+                user = User(email=f"{username}@example.com", username=username, hashed_password="!")
+                db.add(user)
+                db.commit()
+            token = create_access_token({"sub": str(user.id)})
+            return user.id, {"Authorization": f"Bearer {token}"}
+        finally:
+            db.close()
+
+    return _make_user
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import event
+from app.core.accounts import claim_account_deletions, resume_account_deletions, wait_for_deletions
+from app.core.config import settings
+from app.database import SessionLocal, engine
+from app.models import Comment, Follow, Post, TimelineEntry, User
+
+
+def _post(test_client, headers, title):
+    response = test_client.post("/api/posts", json={"title": title, "content": "…", "published": 1}, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _comment(test_client, headers, post_id):
+    response = test_client.post("/api/comments", json={"content": "!", "post_id": post_id}, headers=headers)
+    assert response.status_code == 201
+
+
+def test_deleting_a_post_leaves_comments_to_the_database(test_client, make_user):
+    _, headers = make_user("cascade_author")
+    post_id = _post(test_client, headers, "Soon gone")
+    for _ in range(5):
+        _comment(test_client, headers, post_id)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert test_client.delete(f"/api/posts/{post_id}", headers=headers).status_code == 204
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # No comment rows loaded or deleted one by one (the author's
+    # comments_received_count only needs their number)
+    assert not [s for s in statements if "SELECT comments." in s or "DELETE FROM comments" in s]
+    db = SessionLocal()
+    try:
+        assert db.query(Comment).filter(Comment.post_id == post_id).count() == 0
+    finally:
+        db.close()
+
+
+def test_account_deletion_runs_in_batches_in_the_background(test_client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "ACCOUNT_DELETION_BATCH_SIZE", 2)
+    leaving_id, leaving = make_user("leaving_user")
+    staying_id, staying = make_user("staying_user")
+    followed_id, followed = make_user("followed_by_leaver")
+
+    own_posts = [_post(test_client, leaving, f"Leaving {n}") for n in range(5)]
+    other_post = _post(test_client, staying, "Staying")
+    for post_id in own_posts[:3]:
+        _comment(test_client, staying, post_id)
+    for _ in range(3):
+        _comment(test_client, leaving, other_post)
+    _comment(test_client, staying, other_post)
+    assert test_client.post(f"/api/users/{leaving_id}/follow", headers=staying).status_code == 204
+    assert test_client.post(f"/api/users/{followed_id}/follow", headers=leaving).status_code == 204
+
+    response = test_client.delete("/api/users/me", headers=leaving)
+    assert response.status_code == 202
+    # Locked out straight away
+    assert test_client.get("/api/auth/me", headers=leaving).status_code == 401
+    wait_for_deletions(timeout=30)
+
+    db = SessionLocal()
+    try:
+        assert db.get(User, leaving_id) is None
+        assert db.query(Post).filter(Post.author_id == leaving_id).count() == 0
+        assert db.query(Comment).filter(Comment.author_id == leaving_id).count() == 0
+        assert db.query(Comment).filter(Comment.post_id.in_(own_posts)).count() == 0
+        assert db.query(Follow).filter((Follow.follower_id == leaving_id) | (Follow.followee_id == leaving_id)).count() == 0
+        assert db.query(TimelineEntry).filter(TimelineEntry.post_id.in_(own_posts)).count() == 0
+        assert db.get(User, followed_id).follower_count == 0
+        # Everyone else's data is untouched
+        assert db.query(Comment).filter(Comment.post_id == other_post).count() == 1
+        assert db.get(User, staying_id) is not None
+    finally:
+        db.close()
+
+
+def test_each_pending_deletion_is_claimed_by_one_worker(test_client, make_user):
+    user_id, _ = make_user("claimed_leaver")
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        user.deletion_requested_at = datetime.utcnow()
+        db.commit()
+        assert claim_account_deletions(db) == [user_id]
+        # A second worker starting up finds it taken
+        assert resume_account_deletions() == 0
+
+        # A claim left by a dead process expires
+        user = db.get(User, user_id)
+        user.deletion_started_at = datetime.utcnow() - timedelta(minutes=settings.ACCOUNT_DELETION_LEASE_MINUTES + 1)
+        db.commit()
+        with patch("app.core.accounts.delete_account", side_effect=RuntimeError("disk full")):
+            assert resume_account_deletions() == 1
+            wait_for_deletions(timeout=30)
+        # A failed job gives its claim back for the next startup
+        db.expire_all()
+        assert db.get(User, user_id).deletion_started_at is None
+        assert resume_account_deletions() == 1
+        wait_for_deletions(timeout=30)
+        db.expire_all()
+        assert db.get(User, user_id) is None
+    finally:
+        db.close()
@@ -1,3 +1,19 @@
+import asyncio
+import threading
+from unittest.mock import patch
+from app.core.config import settings
+from app.core.security import (
+    UNUSABLE_PASSWORD,
+    get_password_hash,
+    get_password_hash_async,
+    pwd_context,
+    verify_password,
+    verify_password_async,
+)
+from app.database import SessionLocal
+from app.models.user import User
+
+
 def test_google_login(test_client):
     payload = {
         "token": "mock_google_token"
@@ -5,4 +21,48 @@ def test_google_login(test_client):
     response = test_client.post("/api/auth/google-login", json=payload)
     assert response.status_code == 200
     assert "access_token" in response.json()
-    assert "user" in response.json()
\ No newline at end of file
+    assert "user" in response.json()
+
+
+def test_google_signup_does_not_hash(test_client):
+    with patch("app.api.endpoints.auth.requests.get") as get, patch("app.core.security.pwd_context.hash") as hash_:
+        get.return_value.status_code = 200
+        get.return_value.json.return_value = {
+            "email": "newcomer@example.com", "name": "newcomer", "picture": None, "aud": settings.GOOGLE_CLIENT_ID
+        }
+        response = test_client.post("/api/auth/google-login", json={"token": "newcomer@example.com"})
+    assert response.status_code == 200
+    hash_.assert_not_called()
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == "newcomer@example.com").one()
+        assert user.hashed_password == UNUSABLE_PASSWORD
+    finally:
+        db.close()
+    assert not verify_password(UNUSABLE_PASSWORD, UNUSABLE_PASSWORD)
+
+
+def test_password_hashing_off_the_event_loop():
+    async def roundtrip():
+        hashed = await get_password_hash_async("correct horse")
+        return hashed, await verify_password_async("correct horse", hashed), await verify_password_async("wrong", hashed)
+
+    hashed, good, bad = asyncio.run(roundtrip())
+    assert good and not bad
+    # Rounds come from BCRYPT_ROUNDS (4 in tests)
+    assert hashed.startswith("$2b$04$")
+    assert pwd_context.verify("correct horse", hashed)
+
+
+def test_blocking_helpers_hash_on_the_bounded_pool():
+    threads = []
+    real_hash = pwd_context.hash
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return real_hash(password)
+
+    with patch("app.core.security.pwd_context.hash", recording_hash):
+        hashed = get_password_hash("correct horse")
+    assert verify_password("correct horse", hashed) and not verify_password("wrong", hashed)
+    assert threads[0].startswith("password-hash")
@@ -0,0 +1,63 @@
+from sqlalchemy import event
+from app.core.config import settings
+from app.database import engine
+
+
+def _count_selects():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", capture)
+
+
+def test_posts_batch_in_one_query_and_request_order(test_client, make_user):
+    _, headers = make_user("batch_author")
+    posts = [
+        test_client.post("/api/posts", json={"title": f"Batch {i}", "content": "…", "published": 1}, headers=headers).json()
+        for i in range(3)
+    ]
+    statements, stop = _count_selects()
+    try:
+        response = test_client.get(
+            "/api/posts/batch",
+            params={"ids": f"{posts[2]['id']},999999,{posts[0]['id']}", "slugs": [posts[1]["slug"], "no-such-post"]},
+        )
+    finally:
+        stop()
+    assert response.status_code == 200
+    body = response.json()
+    assert [post["id"] for post in body["posts"]] == [posts[2]["id"], posts[0]["id"], posts[1]["id"]]
+    assert body["posts"][0]["author"]["username"] == "batch_author"
+    assert body["missing_ids"] == [999999]
+    assert body["missing_slugs"] == ["no-such-post"]
+    assert len(statements) == 1
+
+    # Asked for twice, listed once
+    twice = test_client.get("/api/posts/batch", params={"ids": posts[0]["id"], "slugs": posts[0]["slug"]}).json()
+    assert [post["id"] for post in twice["posts"]] == [posts[0]["id"]]
+    assert test_client.get("/api/posts/batch").json() == {"posts": [], "missing_ids": [], "missing_slugs": []}
+
+
+def test_batch_size_is_capped_and_keys_validated(test_client):
+    too_many = ",".join(str(i) for i in range(settings.BATCH_MAX_ITEMS + 1))
+    assert test_client.get("/api/posts/batch", params={"ids": too_many}).status_code == 422
+    assert test_client.get("/api/users/batch", params={"usernames": too_many}).status_code == 422
+    assert test_client.get("/api/posts/batch", params={"ids": "1,two"}).status_code == 422
+
+
+def test_users_batch_returns_public_cards(test_client, make_user):
+    alice, _ = make_user("card_alice")
+    bob, _ = make_user("card_bob")
+    statements, stop = _count_selects()
+    try:
+        body = test_client.get("/api/users/batch", params={"ids": f"{bob},424242", "usernames": "card_alice,nobody"}).json()
+    finally:
+        stop()
+    assert [user["username"] for user in body["users"]] == ["card_bob", "card_alice"]
+    assert "email" not in body["users"][0]
+    assert body["missing_ids"] == [424242] and body["missing_usernames"] == ["nobody"]
+    assert len(statements) == 1
@@ -0,0 +1,48 @@
+import gzip
+from app.core.compression import CompressedArtifact, artifact_cache, choose_encoding
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+    assert choose_encoding("*") == "br"
+
+
+def test_artifact_cache_versions():
+    artifact = CompressedArtifact.build(b"x" * 2000, "text/plain")
+    artifact_cache.set("demo", 1, artifact)
+    assert artifact_cache.get("demo", 1) is artifact
+    assert artifact_cache.get("demo", 2) is None
+    assert gzip.decompress(artifact.encoded["gzip"]) == b"x" * 2000
+
+
+def test_rss_served_precompressed(test_client, make_user):
+    _, headers = make_user("rss_author")
+    for i in range(3):
+        post = {"title": f"RSS post {i}", "subtitle": "", "content": "कहानी " * 300, "published": 1}
+        assert test_client.post("/api/posts", json=post, headers=headers).status_code == 201
+
+    identity = test_client.get("/api/rss.xml", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+
+    # Raw bytes: the precompressed artifact is sent as-is
+    with test_client.stream("GET", "/api/rss.xml", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == identity.headers["ETag"]
+    assert gzip.decompress(raw) == identity.content
+
+    cached = test_client.get("/api/rss.xml", headers={"If-None-Match": identity.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_large_json_compressed_by_middleware(test_client):
+    response = test_client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.json()["paths"]
+
+    small = test_client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
@@ -0,0 +1,46 @@
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.database import create_db_engine, POOL_CHECKOUT_WAIT, POOL_IN_USE, POOL_OVERFLOW, POOL_SIZE, POOL_IN_USE_PEAK
+from app.core.metrics import REGISTRY
+
+
+def test_pool_settings_and_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", name="test_pool")
+    assert engine.pool.size() == 1
+    assert POOL_SIZE.value(pool="test_pool") == 1
+
+    first = engine.connect()
+    second = engine.connect()
+    second.execute(text("SELECT 1"))
+    assert POOL_IN_USE.value(pool="test_pool") == 2
+    assert POOL_OVERFLOW.value(pool="test_pool") == 1
+    second.close()
+    first.close()
+    assert POOL_IN_USE.value(pool="test_pool") == 0
+    assert POOL_IN_USE_PEAK.value(pool="test_pool") == 2
+    assert POOL_CHECKOUT_WAIT.count(pool="test_pool") == 2
+    assert 'db_pool_checkout_wait_seconds_count{pool="test_pool"} 2' in REGISTRY.render()
+    engine.dispose()
+
+
+def test_idle_pre_ping_strategy(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_PRE_PING", "idle")
+    monkeypatch.setattr(settings, "DB_PRE_PING_IDLE_SECONDS", 0)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'ping.db'}", name="test_ping")
+    assert engine.pool._pre_ping is False
+    for _ in range(2):
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+    engine.dispose()
+
+
+def test_null_pool_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_MODE", "null")
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'null.db'}", name="test_null")
+    assert isinstance(engine.pool, NullPool)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    engine.dispose()
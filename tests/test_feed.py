@@ -0,0 +1,69 @@
+from unittest.mock import patch
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import TimelineEntry, User
+
+
+def _publish(test_client, headers, title):
+    response = test_client.post("/api/posts", json={"title": title, "content": "…", "published": 1}, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_following_feed_merges_fanned_out_and_big_authors(test_client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "FEED_FANOUT_MAX_FOLLOWERS", 1)
+    reader_id, reader = make_user("feed_reader")
+    author_id, author = make_user("feed_author")
+    big_id, big = make_user("feed_big_author")
+    _, stranger = make_user("feed_stranger")
+    _, other_reader = make_user("feed_other_reader")
+
+    backfilled = _publish(test_client, author, "Before the follow")
+    for user_id, headers in ((author_id, reader), (big_id, reader), (big_id, other_reader)):
+        assert test_client.post(f"/api/users/{user_id}/follow", headers=headers).status_code == 204
+    assert test_client.post(f"/api/users/{reader_id}/follow", headers=reader).status_code == 400
+
+    expected = [backfilled]
+    for n in range(2):
+        expected.append(_publish(test_client, author, f"Author {n}"))
+        expected.append(_publish(test_client, big, f"Big {n}"))
+    _publish(test_client, stranger, "Not followed")
+    expected.reverse()
+
+    db = SessionLocal()
+    try:
+        materialized = {row.post_id for row in db.query(TimelineEntry).filter(TimelineEntry.user_id == reader_id)}
+    finally:
+        db.close()
+    # The big author (2 followers > 1) is merged in at read time
+    assert materialized == {expected[1], expected[3], backfilled}
+
+    first = test_client.get("/api/feed?limit=3", headers=reader).json()
+    assert [post["id"] for post in first["items"]] == expected[:3]
+    second = test_client.get(f"/api/feed?limit=3&cursor={first['next_cursor']}", headers=reader).json()
+    assert [post["id"] for post in second["items"]] == expected[3:]
+    assert second["next_cursor"] is None
+    assert second["items"][-1]["author"]["username"] == "feed_author"
+
+    assert test_client.delete(f"/api/users/{author_id}/follow", headers=reader).status_code == 204
+    remaining = test_client.get("/api/feed", headers=reader).json()["items"]
+    assert {post["author_id"] for post in remaining} == {big_id}
+    assert test_client.get("/api/feed?cursor=bogus", headers=reader).status_code == 400
+
+
+def test_follow_is_idempotent_and_leaves_updated_at_alone(test_client, make_user):
+    author_id, _ = make_user("followed_author")
+    _, reader = make_user("racing_reader")
+    db = SessionLocal()
+    before = db.get(User, author_id).updated_at
+    assert test_client.post(f"/api/users/{author_id}/follow", headers=reader).status_code == 204
+    # The second request of a double click misses the first one's row
+    with patch("app.core.timeline.Session.get", return_value=None):
+        assert test_client.post(f"/api/users/{author_id}/follow", headers=reader).status_code == 204
+    db.expire_all()
+    author = db.get(User, author_id)
+    assert (author.follower_count, author.updated_at) == (1, before)
+    assert test_client.delete(f"/api/users/{author_id}/follow", headers=reader).status_code == 204
+    db.expire_all()
+    assert db.get(User, author_id).updated_at == before
+    db.close()
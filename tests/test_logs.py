@@ -0,0 +1,92 @@
+import io
+import json
+import logging
+import threading
+import pytest
+from app.core import logs
+from app.core.logs import LOGS_DROPPED, configure_logging, parse_sample_rates, stop_logging
+
+
+@pytest.fixture
+def log_output():
+    """Configure queued logging into a buffer, restoring the root logger afterwards."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    stream = io.StringIO()
+
+    def read():
+        # Stopping the listener writes out everything queued
+        stop_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield stream, read
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_records_are_written_as_json_with_extras(log_output):
+    stream, read = log_output
+    configure_logging(level="INFO", fmt="json", sample_rates="", stream=stream)
+    logger = logging.getLogger("app.test")
+    logger.info("Created post %s", 7, extra={"user_id": 3})
+    logger.debug("not written")
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Failed")
+
+    created, failed = read()
+    assert created["message"] == "Created post 7"
+    assert created["level"] == "INFO" and created["logger"] == "app.test"
+    assert created["user_id"] == 3
+    assert failed["level"] == "ERROR" and "ZeroDivisionError" in failed["exception"]
+
+
+def test_formatting_happens_on_the_listener_thread(log_output):
+    stream, read = log_output
+    configure_logging(level="INFO", fmt="json", sample_rates="app.sampled:0", stream=stream)
+    formatted_on = []
+
+    class Arg:
+        def __str__(self):
+            formatted_on.append(threading.current_thread().name)
+            return "arg"
+
+    logging.getLogger("app.test").info("value %s", Arg())
+    # Sampled away: never formatted at all
+    logging.getLogger("app.sampled.child").info("value %s", Arg())
+    assert [entry["message"] for entry in read()] == ["value arg"]
+    assert formatted_on and formatted_on[0] != threading.current_thread().name
+
+
+def test_sampling_keeps_warnings_and_matches_the_nearest_logger(log_output):
+    stream, read = log_output
+    configure_logging(level="INFO", fmt="json", sample_rates="app.noisy:0, app.noisy.kept:1", stream=stream)
+    logging.getLogger("app.noisy").info("dropped")
+    logging.getLogger("app.noisy.child").info("dropped")
+    logging.getLogger("app.noisy.child").warning("warned")
+    logging.getLogger("app.noisy.kept").info("kept")
+    logging.getLogger("app.noisier").info("unrelated")
+    assert [entry["message"] for entry in read()] == ["warned", "kept", "unrelated"]
+
+
+def test_full_queue_drops_instead_of_blocking(log_output, monkeypatch):
+    stream, read = log_output
+    monkeypatch.setattr(logs.settings, "LOG_QUEUE_SIZE", 1)
+    configure_logging(level="INFO", fmt="json", sample_rates="", stream=stream)
+    # Hold the listener so the queue fills up
+    logs._listener.stop()
+    before = LOGS_DROPPED.value()
+    for i in range(5):
+        logging.getLogger("app.test").info("line %s", i)
+    assert LOGS_DROPPED.value() - before == 4
+    logs._listener.start()
+    assert [entry["message"] for entry in read()] == ["line 0"]
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("") == {}
+    assert parse_sample_rates("app.api:0.1, ai_content_bot:0.5") == {"app.api": 0.1, "ai_content_bot": 0.5}
+    with pytest.raises(ValueError):
+        parse_sample_rates("0.1")
@@ -0,0 +1,27 @@
+from app.core.metrics import Registry
+from app.core.middleware import REQUEST_DB_STATEMENTS, REQUEST_DURATION
+
+
+def test_histogram_rendering():
+    registry = Registry()
+    histogram = registry.histogram("demo_seconds", "Demo", ["route"], buckets=(0.1, 1))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    rendered = registry.render()
+    assert '# TYPE demo_seconds histogram' in rendered
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in rendered
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 2' in rendered
+    assert 'demo_seconds_count{route="/a"} 2' in rendered
+
+
+def test_metrics_endpoint_records_route_templates(test_client):
+    before = REQUEST_DURATION.count(method="GET", route="/api/posts/slug/{slug}", status="404")
+    test_client.get("/api/posts/slug/does-not-exist")
+    assert REQUEST_DURATION.count(method="GET", route="/api/posts/slug/{slug}", status="404") == before + 1
+    assert REQUEST_DB_STATEMENTS.sum(route="/api/posts/slug/{slug}") >= 1
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert 'route="/api/posts/slug/{slug}"' in response.text
+    assert "http_requests_in_flight" in response.text
+    assert "db_statement_duration_seconds_bucket" in response.text
@@ -0,0 +1,17 @@
+def test_coop_header_on_every_response(test_client):
+    response = test_client.get("/")
+    assert response.headers["Cross-Origin-Opener-Policy"] == "same-origin-allow-popups"
+    assert "Access-Control-Allow-Private-Network" not in response.headers
+
+
+def test_private_network_preflight(test_client):
+    response = test_client.options(
+        "/api/posts",
+        headers={
+            "Origin": "http://localhost:3000",
+            "Access-Control-Request-Method": "GET",
+            "Access-Control-Request-Private-Network": "true",
+        },
+    )
+    assert response.headers["Access-Control-Allow-Private-Network"] == "true"
+    assert response.headers["Cross-Origin-Opener-Policy"] == "same-origin-allow-popups"
@@ -0,0 +1,187 @@
+import re
+import threading
+from datetime import datetime, timedelta
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, inspect, text
+from sqlalchemy.orm import sessionmaker
+from app.core.migrations import alembic_config, upgrade_database
+from app.core.security import create_access_token
+from app.database import Base, create_db_engine, get_db, get_read_db
+from app.main import app
+from app.models import Comment, Post, User
+
+ROWS = 100_000
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def test_migrations_match_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    upgrade_database(engine)
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+    engine.dispose()
+
+
+def test_create_all_database_is_stamped_and_upgraded(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # The baseline revision is what create_all used to produce, minus the
+    # version table
+    upgrade_database(engine, "0001")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+    upgrade_database(engine)
+    indexes = {index["name"] for table in ("posts", "comments") for index in inspect(engine).get_indexes(table)}
+    assert {"ix_comments_post_id", "ix_posts_author_id_created_at", "ix_posts_published_created_at"} <= indexes
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == ScriptDirectory.from_config(
+            alembic_config()
+        ).get_current_head()
+    engine.dispose()
+
+
+def seed_rows(engine) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"u{i}@example.com", "username": f"u{i}", "hashed_password": "!",
+             "created_at": now, "updated_at": now}
+            for i in range(1, 1001)
+        ])
+        conn.execute(insert(Post), [
+            {"id": i, "title": f"Post {i}", "content": "x", "slug": f"post-{i}", "author_id": i % 1000 + 1,
+             "published": i % 2, "created_at": now - timedelta(minutes=i), "updated_at": now}
+            for i in range(1, ROWS + 1)
+        ])
+        conn.execute(insert(Comment), [
+            {"content": "y", "post_id": i % ROWS + 1, "author_id": i % 1000 + 1, "created_at": now, "updated_at": now}
+            for i in range(ROWS)
+        ])
+        conn.execute(text("ANALYZE"))
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'explain.db'}")
+    upgrade_database(engine)
+    seed_rows(engine)
+    Session = sessionmaker(bind=engine)
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_read_db] = override
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': '7'})}"}
+        for path in (
+            "/api/posts?limit=20",
+            "/api/posts/user/7",
+            "/api/posts/4242",
+            "/api/posts/slug/post-4242",
+            "/api/posts/batch?ids=4242,4243&slugs=post-4244",
+            "/api/users/batch?ids=7&usernames=u8",
+            "/api/users/u7",
+            "/api/comments/post/4242",
+            "/api/rss.xml",
+            "/api/sitemap.xml",
+            "/api/posts/user/7?limit=20",
+            "/api/feed?limit=20",
+        ):
+            assert client.get(path, headers=headers).status_code == 200, path
+    finally:
+        app.dependency_overrides.clear()
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert statements
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            scans = [detail for detail in plan if FULL_SCAN.match(detail)]
+            assert not scans, f"{statement}\n{plan}"
+            # Post lists read the newest rows straight off a composite index
+            if "ORDER BY posts.created_at" in statement:
+                assert not any("TEMP B-TREE" in detail for detail in plan), f"{statement}\n{plan}"
+    engine.dispose()
+
+
+def test_cascade_migration_keeps_rows_and_cascades(tmp_path):
+    # The application engine enforces foreign keys on SQLite; the table
+    # rebuilds in batch migrations must not cascade into existing rows
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'cascade.db'}", name="cascade")
+    upgrade_database(engine, "0005")
+    with engine.begin() as conn:
+        # Plain SQL: the models describe the newest schema, not revision 0005
+        conn.execute(text(
+            "INSERT INTO users (id, email, username, hashed_password, follower_count, created_at, updated_at) "
+            "VALUES (1, 'c@example.com', 'c', '!', 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text("INSERT INTO posts (id, title, content, slug, author_id) VALUES (1, 'T', 'x', 't', 1)"))
+        conn.execute(text("INSERT INTO comments (content, post_id, author_id) VALUES ('y', 1, 1)"))
+    upgrade_database(engine)
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM comments")).scalar() == 1
+        conn.execute(text("DELETE FROM users WHERE id = 1"))
+        assert conn.execute(text("SELECT COUNT(*) FROM posts")).scalar() == 0
+        assert conn.execute(text("SELECT COUNT(*) FROM comments")).scalar() == 0
+    engine.dispose()
+
+
+def test_author_stats_migration_backfills_counts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    upgrade_database(engine, "0008")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, email, username, hashed_password, follower_count, created_at, updated_at) "
+            "VALUES (1, 'a@example.com', 'a', '!', 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP), "
+            "(2, 'b@example.com', 'b', '!', 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text(
+            "INSERT INTO posts (id, title, content, slug, author_id, published, created_at) VALUES "
+            "(1, 'T', 'x', 't1', 1, 1, '2026-01-01 00:00:00'), (2, 'T', 'x', 't2', 1, 1, '2026-02-01 00:00:00'), "
+            "(3, 'T', 'x', 't3', 1, 0, '2026-03-01 00:00:00')"
+        ))
+        conn.execute(text("INSERT INTO comments (content, post_id, author_id) VALUES ('y', 1, 2), ('y', 3, 2)"))
+    upgrade_database(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT id, published_post_count, comments_received_count, last_published_at FROM users ORDER BY id"
+        )).all()
+    assert [tuple(row) for row in rows] == [(1, 2, 2, "2026-02-01 00:00:00"), (2, 0, 0, None)]
+    engine.dispose()
+
+
+def test_concurrent_upgrades_are_serialized(tmp_path):
+    # Workers starting together must not race on the same migration
+    engines = [create_engine(f"sqlite:///{tmp_path / 'shared.db'}") for _ in range(3)]
+    errors = []
+
+    def upgrade(engine):
+        try:
+            upgrade_database(engine)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=upgrade, args=(engine,)) for engine in engines]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with engines[0].connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM alembic_version")).scalar() == 1
+    for engine in engines:
+        engine.dispose()
@@ -1,4 +1,36 @@
 def test_get_posts(test_client):
     response = test_client.get("/api/posts?limit=10")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
\ No newline at end of file
+    assert isinstance(response.json(), list)
+
+def test_post_list_serialization(test_client, make_user):
+    user_id, headers = make_user("list_author")
+    created = test_client.post(
+        "/api/posts", json={"title": "सूची Post", "content": "नमस्ते world", "published": 1}, headers=headers
+    ).json()
+    listed = test_client.get(f"/api/posts/user/{user_id}").json()
+    assert listed[0] == created
+    assert listed[0]["author"]["username"] == "list_author"
+    assert listed[0]["content"] == "नमस्ते world"
+
+def test_user_posts_paging(test_client, make_user):
+    user_id, headers = make_user("paged_author")
+    ids = [
+        test_client.post("/api/posts", json={"title": f"Paged {i}", "content": "…", "published": 1}, headers=headers).json()["id"]
+        for i in range(3)
+    ]
+    assert [post["id"] for post in test_client.get(f"/api/posts/user/{user_id}").json()] == ids[::-1]
+    page = test_client.get(f"/api/posts/user/{user_id}?skip=1&limit=1").json()
+    assert [post["id"] for post in page] == [ids[1]]
+
+
+def test_post_lists_load_authors_in_the_same_query(test_client, make_user):
+    for n in range(4):
+        _, headers = make_user(f"list_author_{n}")
+        test_client.post("/api/posts", json={"title": f"List {n}", "content": "…", "published": 1}, headers=headers)
+    response = test_client.get("/api/posts?limit=4", headers={"X-SQL-Profile": "1"})
+    assert [post["author"]["username"] for post in response.json()] == [f"list_author_{n}" for n in (3, 2, 1, 0)]
+    assert response.headers["X-SQL-Profile"].startswith("statements=1;")
+    author_id, _ = make_user("list_author_0")
+    response = test_client.get(f"/api/posts/user/{author_id}", headers={"X-SQL-Profile": "1"})
+    assert response.headers["X-SQL-Profile"].startswith("statements=1;")
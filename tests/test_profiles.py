@@ -0,0 +1,103 @@
+from sqlalchemy import event
+from app.core.accounts import delete_account
+from app.core.author_stats import refresh_author_stats
+from app.core.compression import artifact_cache
+from app.database import SessionLocal, engine
+from app.models import User
+
+
+def _profile(client, username):
+    response = client.get(f"/api/users/{username}")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _recounted(username):
+    """The aggregates recomputed from scratch, to compare with the maintained ones"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == username).one()
+        refresh_author_stats(db, [user.id])
+        db.flush()
+        db.refresh(user)
+        return user.published_post_count, user.comments_received_count, user.last_published_at
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _stats(profile):
+    return profile["published_post_count"], profile["comments_received_count"], profile["last_published_at"]
+
+
+def test_profile_aggregates_follow_post_and_comment_writes(test_client, make_user):
+    _, author = make_user("profile_author")
+    _, commenter = make_user("profile_commenter")
+    assert _stats(_profile(test_client, "profile_author")) == (0, 0, None)
+
+    def publish(title, published=1):
+        return test_client.post(
+            "/api/posts", json={"title": title, "content": "…", "published": published}, headers=author
+        ).json()
+
+    first, second, draft = publish("Profile one"), publish("Profile two"), publish("Profile draft", 0)
+    for post in (first, second, second):
+        test_client.post("/api/comments", json={"post_id": post["id"], "content": "वाह"}, headers=commenter)
+    profile = _profile(test_client, "profile_author")
+    assert profile["published_post_count"] == 2
+    assert profile["comments_received_count"] == 3
+    assert profile["last_published_at"] == second["created_at"]
+    assert "email" not in profile
+
+    # Unpublishing the latest post moves last_published_at back
+    test_client.put(f"/api/posts/{second['id']}", json={"published": 0}, headers=author)
+    profile = _profile(test_client, "profile_author")
+    assert (profile["published_post_count"], profile["last_published_at"]) == (1, first["created_at"])
+    test_client.put(f"/api/posts/{draft['id']}", json={"published": 1}, headers=author)
+    # Deleting a post takes its comments with it
+    test_client.delete(f"/api/posts/{second['id']}", headers=author)
+    comment = test_client.get(f"/api/comments/post/{first['id']}").json()[0]
+    test_client.delete(f"/api/comments/{comment['id']}", headers=commenter)
+    assert _stats(_profile(test_client, "profile_author")) == (2, 0, draft["created_at"])
+
+    maintained = _profile(test_client, "profile_author")
+    recounted = _recounted("profile_author")
+    assert (maintained["published_post_count"], maintained["comments_received_count"]) == recounted[:2]
+
+
+def test_profile_is_one_query_and_follows_account_deletion(test_client, make_user):
+    _, author = make_user("profile_host")
+    leaver_id, leaver = make_user("profile_leaver")
+    post = test_client.post("/api/posts", json={"title": "Hosted", "content": "…", "published": 1}, headers=author).json()
+    test_client.post("/api/comments", json={"post_id": post["id"], "content": "bye"}, headers=leaver)
+    assert _profile(test_client, "profile_host")["comments_received_count"] == 1
+
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        _profile(test_client, "profile_host")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert len(statements) == 1
+
+    delete_account(leaver_id)
+    assert _profile(test_client, "profile_host")["comments_received_count"] == 0
+    assert test_client.get("/api/users/profile_leaver").status_code == 404
+
+
+def test_counters_leave_the_authors_post_artifacts_cached(test_client, make_user):
+    _, author = make_user("cached_author")
+    _, commenter = make_user("cached_commenter")
+    posts = [
+        test_client.post("/api/posts", json={"title": title, "content": "…", "published": 1}, headers=author).json()
+        for title in ("Cached one", "Cached two")
+    ]
+    assert test_client.get(f"/api/posts/{posts[1]['id']}").status_code == 200
+    cached = artifact_cache._entries[("post", posts[1]["id"])]
+
+    test_client.post("/api/comments", json={"post_id": posts[0]["id"], "content": "वाह"}, headers=commenter)
+    test_client.put(f"/api/posts/{posts[0]['id']}", json={"published": 0}, headers=author)
+    assert test_client.get(f"/api/posts/{posts[1]['id']}").status_code == 200
+    # Same version, so the same artifact was served rather than rebuilt
+    assert artifact_cache._entries[("post", posts[1]["id"])] is cached
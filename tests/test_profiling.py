@@ -0,0 +1,27 @@
+from app.core.profiling import QueryProfile, parameters_shape
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape({"email": "a@b.c", "id": 3}) == "{email: str, id: int}"
+    assert parameters_shape(("secret", 1)) == "(str, int)"
+    assert parameters_shape([{"id": 1}, {"id": 2}]) == "2 x {id: int}"
+
+
+def test_repeated_statements_flagged_as_n_plus_one():
+    profile = QueryProfile("GET", "/api/posts")
+    profile.record("SELECT posts", (), 0.001)
+    for user_id in range(4):
+        profile.record("SELECT users WHERE users.id = ?", (user_id,), 0.001)
+    assert profile.repeated_statements(threshold=3) == {"SELECT users WHERE users.id = ?": 4}
+    assert profile.to_dict()["statements"] == 5
+
+
+def test_profile_header_and_debug_endpoint(test_client):
+    response = test_client.get("/api/posts/slug/missing", headers={"X-SQL-Profile": "1"})
+    assert response.headers["X-SQL-Profile"].startswith("statements=1;")
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert "X-SQL-Profile" not in test_client.get("/api/posts/slug/missing").headers
+
+    profiles = test_client.get("/api/debug/sql-profiles").json()
+    assert profiles[0]["path"] == "/api/posts/slug/missing"
+    assert profiles[0]["queries"][0]["parameters"].startswith("(str")
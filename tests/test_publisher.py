@@ -0,0 +1,124 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.core import publisher
+from app.core.config import settings
+from app.core.publisher import publish_due_posts
+from app.database import SessionLocal, engine
+from app.models import Post
+
+
+def _schedule(client, headers, title, publish_at):
+    response = client.post(
+        "/api/posts", json={"title": title, "content": "…", "publish_at": publish_at.isoformat()}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _publish_due(now):
+    db = SessionLocal()
+    try:
+        return publish_due_posts(db, now=now)
+    finally:
+        db.close()
+
+
+def test_publisher_releases_exactly_the_due_posts(test_client, make_user):
+    author_id, author = make_user("scheduled_author")
+    _, reader = make_user("scheduled_reader")
+    assert test_client.post(f"/api/users/{author_id}/follow", headers=reader).status_code == 204
+    start = datetime.utcnow().replace(microsecond=0)
+    soon = _schedule(test_client, author, "Scheduled soon", start + timedelta(hours=1))
+    later = _schedule(test_client, author, "Scheduled later", start + timedelta(hours=2))
+    assert soon["published"] == 0 and soon["publish_at"] == (start + timedelta(hours=1)).isoformat()
+    # Cache the draft's artifact, which publishing must replace
+    assert test_client.get(f"/api/posts/{soon['id']}").json()["published"] == 0
+
+    assert _publish_due(start + timedelta(minutes=30)) == []
+    assert _publish_due(start + timedelta(hours=1, minutes=30)) == [soon["id"]]
+    # Another tick (or another worker) finds nothing left to do
+    assert _publish_due(start + timedelta(hours=1, minutes=30)) == []
+
+    released = test_client.get(f"/api/posts/{soon['id']}").json()
+    assert (released["published"], released["publish_at"]) == (1, None)
+    # Listed by when it was released, not when it was written
+    assert released["created_at"] == (start + timedelta(hours=1)).isoformat()
+    assert test_client.get(f"/api/posts/{later['id']}").json()["published"] == 0
+    assert [post["id"] for post in test_client.get("/api/feed", headers=reader).json()["items"]] == [soon["id"]]
+    profile = test_client.get("/api/users/scheduled_author").json()
+    assert (profile["published_post_count"], profile["last_published_at"]) == (1, released["created_at"])
+
+    # Cancelling a schedule leaves an ordinary draft
+    test_client.put(f"/api/posts/{later['id']}", json={"publish_at": None}, headers=author)
+    assert _publish_due(start + timedelta(days=1)) == []
+
+
+def test_schedule_validation_and_past_times(test_client, make_user):
+    _, author = make_user("scheduled_validator")
+    past = _schedule(test_client, author, "Already due", datetime.utcnow() - timedelta(minutes=1))
+    assert (past["published"], past["publish_at"]) == (1, None)
+
+    response = test_client.post(
+        "/api/posts",
+        json={"title": "Both", "content": "…", "published": 1, "publish_at": "2100-01-01T00:00:00"},
+        headers=author,
+    )
+    assert response.status_code == 400
+    assert test_client.put(
+        f"/api/posts/{past['id']}", json={"publish_at": "2100-01-01T00:00:00"}, headers=author
+    ).status_code == 400
+
+    # Times with an offset are stored as UTC
+    draft = _schedule(test_client, author, "Offset", datetime(2100, 1, 1, 5, 30))
+    updated = test_client.put(
+        f"/api/posts/{draft['id']}", json={"publish_at": "2100-01-01T05:30:00+05:30"}, headers=author
+    ).json()
+    assert updated["publish_at"] == "2100-01-01T00:00:00"
+
+
+def test_due_posts_are_found_through_the_partial_index(test_client):
+    statements = []
+    capture = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        _publish_due(datetime(2000, 1, 1))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = next(item for item in statements if item[0].startswith("UPDATE posts"))
+    with engine.connect() as conn:
+        plan = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    assert any("ix_posts_publish_at" in detail for detail in plan), plan
+    engine.dispose()
+
+
+@pytest.mark.parametrize("count", [0, -3])
+def test_queue_posts_rejects_empty_and_negative_counts(count, monkeypatch):
+    import ai_content_bot
+
+    generated = []
+    monkeypatch.setattr(ai_content_bot, "run_ai_content_generator", lambda publish_at=None: generated.append(publish_at))
+    with pytest.raises(ValueError):
+        ai_content_bot.queue_posts(count)
+    assert generated == []
+
+
+def test_start_publisher_catches_up_off_the_calling_thread(monkeypatch):
+    ticked = threading.Event()
+    threads = []
+
+    def tick():
+        threads.append(threading.current_thread())
+        ticked.set()
+        return 0
+
+    monkeypatch.setattr(settings, "PUBLISHER_ENABLED", True)
+    monkeypatch.setattr(publisher, "run_publisher_tick", tick)
+    publisher.start_publisher()
+    try:
+        assert ticked.wait(5)
+    finally:
+        publisher.stop_publisher()
+    # Not in lifespan startup, which runs on the event loop
+    assert threads[0] is not threading.current_thread()
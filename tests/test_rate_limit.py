@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import pytest
+from app.core.config import settings
+from app.core.rate_limit import MemoryBackend, parse_rate
+
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == (10.0, 10 / 60)
+    assert parse_rate("2/hours") == (2.0, 2 / 3600)
+    with pytest.raises(ValueError):
+        parse_rate("ten/minute")
+
+
+def test_token_bucket_bursts_then_refills(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: clock[0])
+    backend = MemoryBackend(max_keys=2)
+    rate = parse_rate("3/minute")
+
+    async def take(key="a"):
+        return await backend.take(key, rate)
+
+    results = [asyncio.run(take()) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(20.0)
+    clock[0] += 20
+    assert asyncio.run(take())[0]
+    # Bounded: the least recently used bucket is forgotten
+    asyncio.run(take("b"))
+    asyncio.run(take("c"))
+    assert list(backend._buckets) == ["b", "c"]
+
+
+def test_write_endpoints_return_429_with_retry_after(test_client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_CREATE_COMMENT", "2/minute")
+    _, alice = make_user("limited_alice")
+    _, bob = make_user("limited_bob")
+    post = test_client.post("/api/posts", json={"title": "Limited", "content": "…", "published": 1}, headers=alice).json()
+    comment = {"post_id": post["id"], "content": "hi"}
+
+    assert [test_client.post("/api/comments", json=comment, headers=alice).status_code for _ in range(3)] == [201, 201, 429]
+    limited = test_client.post("/api/comments", json=comment, headers=alice)
+    assert limited.status_code == 429 and int(limited.headers["retry-after"]) >= 1
+    # Buckets are per user
+    assert test_client.post("/api/comments", json=comment, headers=bob).status_code == 201
+
+
+def test_login_buckets_follow_the_forwarded_client(test_client, monkeypatch):
+    from fastapi.testclient import TestClient
+    from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+    from app.main import app
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN", "1/minute")
+    # As deployed: uvicorn --proxy-headers --forwarded-allow-ips='*'
+    proxied = TestClient(ProxyHeadersMiddleware(app, trusted_hosts="*"))
+
+    def login(address):
+        return proxied.post("/api/auth/google-login", headers={"X-Forwarded-For": address}).status_code
+
+    # The empty body fails after the limit is checked
+    assert [login("203.0.113.7"), login("203.0.113.7"), login("198.51.100.4")] == [400, 429, 400]
+
+
+def test_ai_bot_limit_applies_after_the_token_check(test_client, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_AI_BOT", "1/hour")
+    for _ in range(3):
+        assert test_client.post("/api/trigger-ai-bot").status_code == 401
+
+
+def test_ai_bot_run_is_cut_off_after_its_budget(test_client, monkeypatch):
+    import time
+    import ai_content_bot
+    import app.main
+
+    release = threading.Event()
+    monkeypatch.setattr(app.main, "AI_BOT_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(ai_content_bot, "run_ai_content_generator", lambda: release.wait(5))
+    headers = {"X-KAHANI-BACKGROUND-BOT-TOKEN": "e547365bae0244f3afd6b511581e99eb5a4c6246e83e464fafd784c52e832e93"}
+    try:
+        response = test_client.post("/api/trigger-ai-bot", headers=headers)
+        assert response.json() == {"status": "error", "message": "AI bot did not finish within 0.1 seconds"}
+        # The timed-out run is still going, so a second one is refused
+        assert test_client.post("/api/trigger-ai-bot", headers=headers).status_code == 409
+    finally:
+        release.set()
+    deadline = time.monotonic() + 5
+    while app.main._ai_bot_running.locked() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not app.main._ai_bot_running.locked()
@@ -0,0 +1,64 @@
+from sqlalchemy import create_engine, text
+from app.database import ReplicaRouter, SessionLocal, read_router, STICKY_KEY
+
+
+def _engine(path):
+    return create_engine(f"sqlite:///{path}")
+
+
+def test_round_robin_and_fallback(tmp_path):
+    primary = _engine(tmp_path / "primary.db")
+    replicas = [_engine(tmp_path / "replica1.db"), _engine(tmp_path / "replica2.db")]
+    router = ReplicaRouter(primary, replicas, sticky_seconds=5, retry_seconds=60)
+
+    picked = [router.engine_for() for _ in range(4)]
+    assert picked == replicas * 2
+
+    router.mark_down(replicas[0])
+    assert {router.engine_for() for _ in range(4)} == {replicas[1]}
+
+    router.mark_down(replicas[1])
+    assert router.engine_for() is primary
+
+
+def test_failed_replica_is_marked_down(tmp_path):
+    primary = _engine(tmp_path / "primary.db")
+    broken = _engine(tmp_path / "missing" / "replica.db")
+    healthy = _engine(tmp_path / "replica.db")
+    router = ReplicaRouter(primary, [broken, healthy], sticky_seconds=5, retry_seconds=0)
+
+    router.mark_down(broken)
+    # retry_seconds=0 means the broken replica is probed again, fails, and is skipped
+    assert router.engine_for() is healthy
+    assert broken in router._down_until
+
+
+def test_read_your_writes(tmp_path):
+    primary = _engine(tmp_path / "primary.db")
+    replica = _engine(tmp_path / "replica.db")
+    router = ReplicaRouter(primary, [replica], sticky_seconds=5, retry_seconds=60)
+
+    router.mark_write("42")
+    assert router.engine_for("42") is primary
+    assert router.engine_for("7") is replica
+    assert router.engine_for(None) is replica
+
+    router.sticky_seconds = 0
+    router.mark_write("42")
+    assert router.engine_for("42") is replica
+
+
+def test_commit_pins_writer(monkeypatch):
+    marked = []
+    monkeypatch.setattr(read_router, "mark_write", marked.append)
+    db = SessionLocal()
+    try:
+        db.info[STICKY_KEY] = "99"
+        db.commit()
+        assert marked == []  # nothing was written
+        db.execute(text("SELECT 1"))
+        db.info["has_writes"] = True
+        db.commit()
+        assert marked == ["99"]
+    finally:
+        db.close()
@@ -0,0 +1,122 @@
+import pytest
+from app.core.config import settings
+from app.core.related import ngram_counts, post_document, rebuild_related, refresh_related, wait_for_related
+from app.database import SessionLocal
+from app.models import RelatedIndex, RelatedPost
+
+CRICKET = [
+    "भारत ने आखिरी ओवर में मैच जीत लिया। कप्तान की batting ने stadium में जोश भर दिया और गेंदबाज़ों ने विकेट लिए।",
+    "आखिरी ओवर के रोमांच में गेंदबाज़ ने तीन विकेट लिए, फिर भी कप्तान की batting ने भारत को मैच जिता दिया।",
+]
+ELECTION = [
+    "चुनाव से पहले नेताजी ने हर गांव में मुफ्त बिजली, पानी और wifi का वादा किया, रैली में भीड़ जुटी।",
+    "रैली में नेताजी का नया वादा: चुनाव जीते तो मुफ्त wifi, बिजली और हर गांव में पानी।",
+]
+COOKING = "दाल मखनी बनाने के लिए रात भर भिगोई उड़द, मक्खन, क्रीम और धीमी आंच पर घंटों पकाना ज़रूरी है।"
+
+
+@pytest.fixture
+def related_enabled(monkeypatch):
+    # Refreshes need an index, which only the offline rebuild creates
+    db = SessionLocal()
+    try:
+        rebuild_related(db)
+    finally:
+        db.close()
+    monkeypatch.setattr(settings, "RELATED_POSTS_ENABLED", True)
+    yield
+    wait_for_related(timeout=30)
+
+
+def _publish(client, headers, title, content, published=1):
+    post = client.post("/api/posts", json={"title": title, "content": content, "published": published}, headers=headers)
+    wait_for_related(timeout=30)
+    return post.json()
+
+
+def _related_ids(client, post_id):
+    response = client.get(f"/api/posts/{post_id}/related?limit=20")
+    assert response.status_code == 200
+    return [post["id"] for post in response.json()]
+
+
+def test_ngram_counts_hash_devanagari_and_latin():
+    features, counts = ngram_counts(post_document("मैच", None, "match मैच"))
+    assert len(features) == len(counts) > 0
+    assert features.min() >= 0 and features.max() < 1 << settings.RELATED_HASH_BITS
+    # " मै", "मैच", "ैच " and the rest all recur once the title is repeated
+    assert counts.max() >= 3
+
+
+def test_publishing_updates_related_lists(test_client, make_user, related_enabled):
+    _, headers = make_user("related_author")
+    first = _publish(test_client, headers, "आखिरी ओवर का रोमांच", CRICKET[0])
+    _publish(test_client, headers, "दाल मखनी की विधि", COOKING)
+    draft = _publish(test_client, headers, "आखिरी ओवर, कप्तान और विकेट", CRICKET[0], published=0)
+    second = _publish(test_client, headers, "कप्तान की batting से मैच जीता", CRICKET[1])
+
+    related = test_client.get(f"/api/posts/{second['id']}/related").json()
+    assert related[0]["id"] == first["id"]
+    assert related[0]["author"]["username"] == "related_author"
+    assert "content" not in related[0]
+    assert all(a["score"] >= b["score"] for a, b in zip(related, related[1:]))
+    # The earlier post's list picked up the new one without a rebuild
+    first_related = _related_ids(test_client, first["id"])
+    assert first_related[0] == second["id"]
+    assert draft["id"] not in first_related
+
+    # Unpublished posts drop out of every list
+    test_client.put(f"/api/posts/{second['id']}", json={"published": 0}, headers=headers)
+    wait_for_related(timeout=30)
+    assert second["id"] not in _related_ids(test_client, first["id"])
+    assert _related_ids(test_client, second["id"]) == []
+
+
+def test_rebuild_agrees_with_incremental_refresh(test_client, make_user, related_enabled):
+    _, headers = make_user("related_author")
+    first = _publish(test_client, headers, "नेताजी की रैली", ELECTION[0])
+    second = _publish(test_client, headers, "चुनावी वादे", ELECTION[1])
+    assert _related_ids(test_client, second["id"])[0] == first["id"]
+
+    db = SessionLocal()
+    try:
+        assert rebuild_related(db) >= 2
+    finally:
+        db.close()
+    assert _related_ids(test_client, second["id"])[0] == first["id"]
+    assert test_client.get("/api/posts/999999/related").json() == []
+
+
+def test_refresh_is_bounded_and_never_rebuilds(test_client, make_user, related_enabled, monkeypatch):
+    _, headers = make_user("related_author")
+    first = _publish(test_client, headers, "नेताजी की रैली", ELECTION[0])
+    _publish(test_client, headers, "दाल मखनी की विधि", COOKING)
+    # Only the newest stored vector is a candidate
+    monkeypatch.setattr(settings, "RELATED_REFRESH_WINDOW", 1)
+    second = _publish(test_client, headers, "चुनावी वादे", ELECTION[1])
+    assert first["id"] not in _related_ids(test_client, second["id"])
+
+    db = SessionLocal()
+    try:
+        db.query(RelatedIndex).delete()
+        db.commit()
+        refresh_related(db, [first["id"]])
+        # Without an index the refresh leaves everything to the offline rebuild
+        assert db.query(RelatedIndex).count() == 0
+        assert db.query(RelatedPost).filter(RelatedPost.post_id == first["id"]).count() > 0
+    finally:
+        db.close()
+
+
+def test_lists_are_backfilled_when_a_neighbour_is_unpublished(test_client, make_user, related_enabled, monkeypatch):
+    monkeypatch.setattr(settings, "RELATED_POSTS_K", 1)
+    _, headers = make_user("related_author")
+    monsoon = "मानसून की पहली बारिश में मुंबई की सड़कें नदी बन गईं, लोकल ट्रेनें रुकीं और दफ़्तर वाले नाव ढूंढने लगे।"
+    first = _publish(test_client, headers, "मानसून", monsoon)
+    second = _publish(test_client, headers, "बारिश में मुंबई", monsoon + " फिर भी chai की टपरी खुली रही।")
+    third = _publish(test_client, headers, "लोकल ट्रेनें रुकीं", "मुंबई की सड़कें नदी बन गईं, " + monsoon)
+    [top] = _related_ids(test_client, first["id"])
+    test_client.put(f"/api/posts/{top}", json={"published": 0}, headers=headers)
+    wait_for_related(timeout=30)
+    # Not dropped to an empty list: the next best post takes its place
+    assert _related_ids(test_client, first["id"]) == [({second["id"], third["id"]} - {top}).pop()]
@@ -0,0 +1,96 @@
+import pytest
+from app.core.config import settings
+from app.core.revisions import InvalidDelta, apply_delta, make_delta
+from app.database import SessionLocal
+from app.models import Post, PostRevision
+
+BASE = "आज की खबर पढ़कर हंसी भी आई। Seriously, news और comedy में कोई फर्क नहीं बचा।\n\nTraffic में फंसे लोग।"
+
+
+def test_delta_round_trip_and_validation():
+    new = BASE.replace("हंसी", "बहुत हंसी").replace("Traffic", "Signal पर traffic") + "\n\nनया paragraph."
+    delta = make_delta(BASE, new)
+    assert apply_delta(BASE, delta) == new
+    # Only the changed words travel, not the whole body
+    assert sum(len(op) for op in delta if isinstance(op, str)) < 40
+    assert make_delta(BASE, BASE) == [len(BASE)]
+    for bad in ([len(BASE) - 1], [len(BASE) + 1], [0, len(BASE)], [True, len(BASE) - 1], [1.5]):
+        with pytest.raises(InvalidDelta):
+            apply_delta(BASE, bad)
+
+
+def test_revisions_store_snapshots_and_deltas(test_client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "REVISION_SNAPSHOT_INTERVAL", 4)
+    _, headers = make_user("reviser")
+    post = test_client.post("/api/posts", json={"title": "Draft", "content": BASE}, headers=headers).json()
+    assert post["revision"] == 1
+
+    contents = [BASE]
+    for n in range(1, 10):
+        new = contents[-1] + f" Edit {n}."
+        if n % 2:
+            response = test_client.put(f"/api/posts/{post['id']}", json={"content": new}, headers=headers)
+            assert response.json()["revision"] == n + 1
+        else:
+            patch = {"base_revision": n, "delta": make_delta(contents[-1], new)}
+            response = test_client.patch(f"/api/posts/{post['id']}/content", json=patch, headers=headers)
+            body = response.json()
+            assert (body["revision"], body["content_length"]) == (n + 1, len(new))
+        contents.append(new)
+    # Edits that don't touch the text record nothing
+    test_client.put(f"/api/posts/{post['id']}", json={"cover_image": "http://example.com/c.png"}, headers=headers)
+
+    db = SessionLocal()
+    try:
+        rows = db.query(PostRevision).filter(PostRevision.post_id == post["id"]).order_by(PostRevision.number).all()
+        assert [row.snapshot is not None for row in rows] == [n % 4 == 1 for n in range(1, 11)]
+    finally:
+        db.close()
+
+    listed = test_client.get(f"/api/posts/{post['id']}/revisions?limit=3", headers=headers).json()
+    assert [r["number"] for r in listed] == [10, 9, 8]
+    for number, content in enumerate(contents, start=1):
+        revision = test_client.get(f"/api/posts/{post['id']}/revisions/{number}", headers=headers).json()
+        assert revision["content"] == content and revision["content_length"] == len(content)
+
+    restored = test_client.post(f"/api/posts/{post['id']}/revisions/3/restore", headers=headers).json()
+    assert restored["content"] == contents[2] and restored["revision"] == 11
+    assert test_client.get(f"/api/posts/{post['id']}/revisions/11", headers=headers).json()["content"] == contents[2]
+
+
+def test_patch_conflicts_errors_and_access(test_client, make_user):
+    _, headers = make_user("reviser")
+    _, stranger = make_user("revision_stranger")
+    post = test_client.post("/api/posts", json={"title": "Patched", "content": BASE}, headers=headers).json()
+    url = f"/api/posts/{post['id']}/content"
+
+    stale = test_client.patch(url, json={"base_revision": 0, "delta": [len(BASE)]}, headers=headers)
+    assert stale.status_code == 409
+    bad = test_client.patch(url, json={"base_revision": 1, "delta": [len(BASE), -1]}, headers=headers)
+    assert bad.status_code == 422
+    assert test_client.patch(url, json={"base_revision": 1, "delta": [len(BASE)]}, headers=stranger).status_code == 403
+    assert test_client.get(f"/api/posts/{post['id']}/revisions", headers=stranger).status_code == 403
+    assert test_client.get(f"/api/posts/{post['id']}/revisions/7", headers=headers).status_code == 404
+
+    renamed = test_client.patch(
+        url, json={"base_revision": 1, "delta": [len(BASE), "!"], "title": "Renamed"}, headers=headers
+    )
+    assert renamed.json()["revision"] == 2
+    current = test_client.get(f"/api/posts/{post['id']}").json()
+    assert current["title"] == "Renamed" and current["slug"] == "renamed" and current["content"] == BASE + "!"
+
+
+def test_posts_from_before_revisions_keep_their_original_text(test_client, make_user):
+    user_id, headers = make_user("reviser")
+    db = SessionLocal()
+    try:
+        legacy = Post(title="Legacy", content="Old text", slug="legacy-post", author_id=user_id, published=1)
+        db.add(legacy)
+        db.commit()
+        post_id = legacy.id
+    finally:
+        db.close()
+
+    assert test_client.put(f"/api/posts/{post_id}", json={"content": "New text"}, headers=headers).json()["revision"] == 2
+    assert test_client.get(f"/api/posts/{post_id}/revisions/1", headers=headers).json()["content"] == "Old text"
+    assert test_client.get(f"/api/posts/{post_id}/revisions/2", headers=headers).json()["content"] == "New text"
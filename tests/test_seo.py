@@ -0,0 +1,58 @@
+import re
+from datetime import datetime
+from app.api.endpoints import seo
+from app.core.compression import artifact_cache
+from app.database import SessionLocal
+from app.models import Post
+
+
+def _locs(response):
+    assert response.status_code == 200
+    return re.findall(r"<loc>([^<]+)</loc>", response.text)
+
+
+def _backdate(post_id, created_at):
+    db = SessionLocal()
+    try:
+        db.query(Post).filter(Post.id == post_id).update({"created_at": created_at, "updated_at": created_at})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_sitemap_lists_the_newest_posts_that_fit(test_client, make_user, monkeypatch):
+    _, headers = make_user("sitemap_author")
+
+    def publish(title):
+        return test_client.post("/api/posts", json={"title": title, "content": "…", "published": 1}, headers=headers).json()
+
+    old, recent = publish("Sitemap March"), publish("Sitemap recent")
+    _backdate(old["id"], datetime(2001, 3, 1))
+    artifact_cache.invalidate("sitemap.xml")
+
+    sitemap = test_client.get("/api/sitemap.xml")
+    assert "<urlset" in sitemap.text
+    locs = _locs(sitemap)
+    # Homepage, posts newest first, then profiles
+    assert locs[0] == "https://kahanighargharki.vercel.app/"
+    assert f"https://kahanighargharki.vercel.app/post/{recent['slug']}" in locs
+    assert locs.index(f"https://kahanighargharki.vercel.app/post/{recent['slug']}") < locs.index(
+        f"https://kahanighargharki.vercel.app/post/{old['slug']}"
+    )
+    assert locs[-1].startswith("https://kahanighargharki.vercel.app/profile/")
+    assert "https://kahanighargharki.vercel.app/profile/sitemap_author" in locs
+
+    # Unpublishing a post this month rebuilds it
+    test_client.put(f"/api/posts/{recent['id']}", json={"published": 0}, headers=headers)
+    assert f"https://kahanighargharki.vercel.app/post/{recent['slug']}" not in _locs(
+        test_client.get("/api/sitemap.xml")
+    )
+
+    # Past the limit the oldest posts are left out, never the pages
+    artifact_cache.invalidate("sitemap.xml")
+    pages = sum("/profile/" in loc for loc in locs) + 1
+    monkeypatch.setattr(seo, "SITEMAP_MAX_URLS", pages + 1)
+    locs = _locs(test_client.get("/api/sitemap.xml"))
+    assert len(locs) == pages + 1
+    assert f"https://kahanighargharki.vercel.app/post/{old['slug']}" not in locs
+    artifact_cache.invalidate("sitemap.xml")
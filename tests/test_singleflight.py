@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from sqlalchemy import event
+from app.core.singleflight import SingleFlight
+from app.database import engine
+from app.main import app
+
+
+def test_concurrent_identical_requests_share_one_query(test_client, make_user):
+    _, headers = make_user("viral_author")
+    post = test_client.post("/api/posts", json={"title": "Viral post", "content": "…", "published": 1}, headers=headers).json()
+    queries = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def slow_lookup(conn, cursor, statement, parameters, context, executemany):
+        if "FROM posts" in statement and "posts.slug = ?" in statement:
+            queries.append(statement)
+            # Keep the lookup in flight while the other requests arrive
+            time.sleep(0.5)
+
+    async def burst():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(f"/api/posts/slug/{post['slug']}") for _ in range(500)))
+
+    try:
+        responses = asyncio.run(burst())
+    finally:
+        event.remove(engine, "before_cursor_execute", slow_lookup)
+    assert len(queries) == 1
+    assert {response.status_code for response in responses} == {200}
+    assert {response.content for response in responses} == {responses[0].content}
+    assert responses[0].json()["id"] == post["id"]
+
+    # Nothing is cached: the next lookup, and the author's read after an edit, query again
+    test_client.put(f"/api/posts/{post['id']}", json={"content": "Edited"}, headers=headers)
+    assert test_client.get(f"/api/posts/slug/{post['slug']}").json()["content"] == "Edited"
+
+
+def test_threads_share_the_leaders_result_and_errors():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def lookup(value):
+        calls.append(value)
+        release.wait(5)
+        if value == "boom":
+            raise LookupError(value)
+        return value.upper()
+
+    def run_many(value, count):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(_outcome(flight.do, "key", lookup, value)))
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        release.clear()
+        return results
+
+    assert run_many("post", 20) == ["POST"] * 20
+    assert calls == ["post"]
+    results = run_many("boom", 5)
+    assert calls == ["post", "boom"]
+    assert all(isinstance(result, LookupError) for result in results)
+
+
+def test_forget_starts_a_new_lookup_while_one_is_in_flight():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        release.wait(5)
+        return len(calls)
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do_async("key", lookup))
+        await asyncio.sleep(0.1)
+        flight.forget()
+        second = asyncio.ensure_future(flight.do_async("key", lookup))
+        await asyncio.sleep(0.1)
+        release.set()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == (2, 2)
+    assert len(calls) == 2
+
+
+def test_a_cancelled_waiter_leaves_the_others_their_result():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def lookup():
+        release.wait(5)
+        return "POST"
+
+    async def scenario():
+        waiters = [asyncio.ensure_future(flight.do_async("key", lookup)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        # A follower's client disconnects
+        waiters[1].cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    leader, cancelled, follower = asyncio.run(scenario())
+    assert (leader, follower) == ("POST", "POST")
+    assert isinstance(cancelled, asyncio.CancelledError)
+
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as exc:
+        return exc
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _modules_after_import(target: str) -> set:
+    code = f"import sys, {target}; print('\\n'.join(sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+def test_gemini_sdk_is_imported_lazily():
+    assert "google.generativeai" not in _modules_after_import("app.main")
+    assert "google.generativeai" not in _modules_after_import("ai_content_bot")
+
+
+def test_related_posts_maths_is_imported_lazily():
+    modules = _modules_after_import("app.main")
+    assert "numpy" not in modules and "scipy" not in modules
+
+
+def test_bot_leaves_logging_configuration_alone():
+    code = "import logging, ai_content_bot; print(len(logging.getLogger().handlers))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "0"
+
+
+def test_bot_does_not_import_fastapi():
+    assert "fastapi" not in _modules_after_import("ai_content_bot")
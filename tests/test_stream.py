@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from unittest.mock import patch
+from app.api.endpoints.stream import stream
+from app.core.events import FEED_TOPIC, Broker, broker, post_topic
+from app.main import app
+
+
+def test_broker_delivers_across_threads_and_reports_lag():
+    async def scenario():
+        local = Broker()
+        feed = local.subscribe([FEED_TOPIC], buffer_size=2)
+        other = local.subscribe([post_topic(1)], buffer_size=2)
+        # Publishers run in threadpool threads
+        thread = threading.Thread(target=lambda: [local.publish(FEED_TOPIC, "post", {"n": n}) for n in range(5)])
+        thread.start()
+        thread.join()
+        first = await feed.next_frame(1)
+        second = await feed.next_frame(1)
+        third = await feed.next_frame(1)
+        idle = await other.next_frame(0.01)
+        feed.close()
+        other.close()
+        return first, second, third, idle, local.subscriber_count()
+
+    first, second, third, idle, remaining = asyncio.run(scenario())
+    assert first.startswith(b"event: lagged") and b'"dropped":3' in first
+    assert b'"n":3' in second and b'"n":4' in third
+    assert idle is None
+    assert remaining == 0
+
+
+async def _read_stream(path: str, publish) -> bytes:
+    """Drive the ASGI app directly: EventSource responses never end."""
+    disconnect = asyncio.Event()
+    body = b""
+    got_event = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal body
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+            assert (b"content-type", b"text/event-stream; charset=utf-8") in message["headers"]
+        elif message["type"] == "http.response.body":
+            body += message.get("body", b"")
+            if b"event:" in body:
+                got_event.set()
+
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"test"), (b"accept-encoding", b"gzip, br")],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    while broker.subscriber_count() == 0:
+        await asyncio.sleep(0.01)
+    await asyncio.get_running_loop().run_in_executor(None, publish)
+    await asyncio.wait_for(got_event.wait(), 5)
+    disconnect.set()
+    await asyncio.wait_for(task, 5)
+    return body
+
+
+def test_stream_endpoint_pushes_comments_for_one_post(test_client):
+    body = asyncio.run(_read_stream(
+        "/api/stream?post_id=7", lambda: broker.publish(post_topic(7), "comment", {"content": "नमस्ते"})
+    ))
+    # Not compressed, so frames reach the client as they are sent
+    assert body.startswith(b"retry: 5000")
+    assert "event: comment\ndata: {\"content\":\"नमस्ते\"}".encode() in body
+    assert broker.subscriber_count() == 0
+
+
+def test_stream_holds_no_slot_until_the_response_starts():
+    async def abandoned():
+        response = await stream(post_id=7)
+        # The client disconnected before the body was ever iterated
+        await response.body_iterator.aclose()
+        return broker.subscriber_count()
+
+    assert asyncio.run(abandoned()) == 0
+
+
+def test_writes_publish_events(test_client, make_user):
+    _, headers = make_user("streamer")
+    with patch("app.core.events.broker.publish") as publish:
+        post = test_client.post(
+            "/api/posts", json={"title": "Live", "content": "Body", "published": 1}, headers=headers
+        ).json()
+        test_client.post("/api/comments", json={"post_id": post["id"], "content": "First!"}, headers=headers)
+    (feed_call, comment_call) = publish.call_args_list
+    assert feed_call.args[:2] == (FEED_TOPIC, "post") and feed_call.args[2]["slug"] == post["slug"]
+    assert comment_call.args[:2] == (post_topic(post["id"]), "comment")
+    assert comment_call.args[2]["author"]["username"] == "streamer"
@@ -0,0 +1,106 @@
+import pytest
+from app.core import tts
+from app.core.config import settings
+from app.core.tts import split_chunks, wait_for_audio
+from app.database import SessionLocal
+from app.models import Post
+
+PARAGRAPHS = [
+    "आज की खबर पढ़कर हंसी भी आई। Seriously, news और comedy में कोई फर्क नहीं बचा।",
+    "Traffic में फंसे लोग अब meditation सीख रहे हैं।",
+    "Politicians ने फिर से वादा किया है कि सब कुछ free मिलेगा।",
+]
+
+
+@pytest.fixture
+def stub_provider(monkeypatch):
+    monkeypatch.setattr(settings, "TTS_PROVIDER", "stub")
+    monkeypatch.setattr(tts, "_provider", None)
+    yield tts.get_provider()
+    wait_for_audio(timeout=30)
+
+
+def test_split_chunks_packs_long_paragraphs_by_sentence():
+    text = "First paragraph.\n\n  \n\nOne. Two three. Four five six.\nSeven?"
+    assert split_chunks(text, 100) == ["First paragraph.", "One. Two three. Four five six. Seven?"]
+    assert split_chunks(text, 16) == ["First paragraph.", "One. Two three.", "Four five six.", "Seven?"]
+    # A sentence longer than the limit is cut at spaces
+    assert split_chunks("aaaa bbbb cccc", 9) == ["aaaa bbbb", "cccc"]
+
+
+def test_publishing_renders_audio_served_with_ranges(test_client, make_user, stub_provider):
+    _, headers = make_user("narrator")
+    post = test_client.post(
+        "/api/posts",
+        json={"title": "Audio post", "content": "\n\n".join(PARAGRAPHS), "published": 1},
+        headers=headers,
+    ).json()
+    assert post["audio_status"] == "pending"
+    wait_for_audio(timeout=30)
+
+    ready = test_client.get(f"/api/posts/{post['id']}").json()
+    assert ready["audio_status"] == "ready"
+    # Title plus three paragraphs
+    assert stub_provider.calls == 4
+
+    redirect = test_client.get(f"/api/posts/{post['id']}/audio", follow_redirects=False)
+    assert redirect.status_code == 307 and redirect.headers["location"] == ready["audio_url"]
+    full = test_client.get(ready["audio_url"])
+    assert full.status_code == 200 and full.content[:4] == b"RIFF"
+    partial = test_client.get(ready["audio_url"], headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 100-199/{len(full.content)}"
+    assert partial.content == full.content[100:200]
+
+    # Editing one paragraph synthesizes only that paragraph
+    edited = PARAGRAPHS[:2] + ["Social media पर आज का outrage किसी ने पढ़ा भी नहीं।"]
+    test_client.put(f"/api/posts/{post['id']}", json={"content": "\n\n".join(edited)}, headers=headers)
+    wait_for_audio(timeout=30)
+    assert stub_provider.calls == 5
+    assert test_client.get(f"/api/posts/{post['id']}").json()["audio_url"] != ready["audio_url"]
+
+    # Unrelated edits don't re-render
+    test_client.put(f"/api/posts/{post['id']}", json={"cover_image": "http://example.com/c.png"}, headers=headers)
+    wait_for_audio(timeout=30)
+    assert stub_provider.calls == 5
+
+
+def test_drafts_get_no_audio_and_failures_are_recorded(test_client, make_user, stub_provider, monkeypatch):
+    _, headers = make_user("narrator")
+    draft = test_client.post(
+        "/api/posts", json={"title": "Draft", "content": PARAGRAPHS[0], "published": 0}, headers=headers
+    ).json()
+    assert draft["audio_status"] is None
+    assert test_client.get(f"/api/posts/{draft['id']}/audio").status_code == 404
+
+    def broken(text):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(stub_provider, "synthesize", broken)
+    test_client.put(f"/api/posts/{draft['id']}", json={"published": 1, "content": "Never voiced before."}, headers=headers)
+    wait_for_audio(timeout=30)
+    assert test_client.get(f"/api/posts/{draft['id']}").json()["audio_status"] == "failed"
+    assert test_client.get(f"/api/posts/{draft['id']}/audio").status_code == 404
+
+
+def test_a_failed_render_leaves_a_newer_edit_pending(test_client, make_user, stub_provider, monkeypatch):
+    _, headers = make_user("narrator")
+
+    def edited_then_broken(text):
+        # The author edits while this render runs; the edit's own render is
+        # queued behind it, so the post is pending again
+        db = SessionLocal()
+        try:
+            db.query(Post).filter(Post.id == post["id"]).update({"content": "Edited meanwhile.", "audio_status": "pending"})
+            db.commit()
+        finally:
+            db.close()
+        raise RuntimeError("provider down")
+
+    post = test_client.post(
+        "/api/posts", json={"title": "Edited", "content": PARAGRAPHS[1], "published": 0}, headers=headers
+    ).json()
+    monkeypatch.setattr(stub_provider, "synthesize", edited_then_broken)
+    test_client.put(f"/api/posts/{post['id']}", json={"published": 1}, headers=headers)
+    wait_for_audio(timeout=30)
+    assert test_client.get(f"/api/posts/{post['id']}").json()["audio_status"] == "pending"
@@ -0,0 +1,70 @@
+import io
+import os
+from PIL import Image as PILImage
+from app.core.config import settings
+from app.core.images import wait_for_variants
+from app.core.storage import storage
+
+
+def _png(width: int, height: int, color=(200, 40, 40)) -> bytes:
+    buffer = io.BytesIO()
+    PILImage.new("RGB", (width, height), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_upload_dedupes_and_generates_variants(test_client, make_user):
+    _, headers = make_user("uploader")
+    body = _png(2400, 1200)
+    upload_headers = {**headers, "Content-Type": "image/png"}
+
+    first = test_client.post("/api/uploads/images", content=body, headers=upload_headers)
+    assert first.status_code == 201
+    image = first.json()
+    assert image["content_type"] == "image/png" and image["size_bytes"] == len(body)
+
+    # Attach before the variants exist; the worker fills the post in later
+    post = test_client.post(
+        "/api/posts",
+        json={"title": "With cover", "content": "…", "published": 1, "cover_image_id": image["id"]},
+        headers=headers,
+    ).json()
+    wait_for_variants(timeout=30)
+
+    ready = test_client.get(f"/api/uploads/images/{image['id']}").json()
+    assert ready["status"] == "ready" and (ready["width"], ready["height"]) == (2400, 1200)
+    for name, (box, _) in (("thumbnail", (320, 320)), ("card", (800, 800)), ("full", (1600, 1600))):
+        response = test_client.get(ready["variants"][name])
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+        variant = PILImage.open(io.BytesIO(response.content))
+        assert variant.format == "WEBP" and variant.size == (box, box // 2)
+
+    cover = test_client.get(f"/api/posts/{post['id']}").json()
+    assert cover["cover_images"] == ready["variants"]
+    assert cover["cover_image"] == ready["variants"]["full"]
+
+    again = test_client.post("/api/uploads/images", content=body, headers=upload_headers)
+    assert again.status_code == 200 and again.json()["id"] == image["id"]
+
+
+def test_upload_rejects_non_images_and_oversized_bodies(test_client, make_user, monkeypatch):
+    _, headers = make_user("uploader")
+    response = test_client.post(
+        "/api/uploads/images", content=b"<?php echo 1; ?>", headers={**headers, "Content-Type": "image/png"}
+    )
+    assert response.status_code == 415
+
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024)
+
+    def chunks():
+        # No Content-Length: the cap is enforced while streaming
+        body = _png(400, 400, (1, 2, 3)) + b"\0" * 4096
+        for start in range(0, len(body), 512):
+            yield body[start:start + 512]
+
+    response = test_client.post("/api/uploads/images", content=chunks(), headers={**headers, "Content-Type": "image/png"})
+    assert response.status_code == 413
+    # Rejected uploads leave no spooled files behind
+    assert not [name for name in os.listdir(storage.temp_dir()) if name.endswith(".upload")]
+    # ...and spool outside the publicly served media root
+    assert not os.path.abspath(storage.temp_dir()).startswith(storage.root + os.sep)